@@ -4,10 +4,13 @@ Analyzes the scraped room timetable data and generates insights
 """
 
 import json
+import os
 import pandas as pd
 from datetime import datetime
 from collections import defaultdict
 
+from storage import read_ndjson
+
 
 class RoomDataAnalyzer:
     def __init__(self, data_file='rooms_complete_data.json'):
@@ -16,10 +19,22 @@ class RoomDataAnalyzer:
         self.load_data()
     
     def load_data(self):
-        """Load the scraped JSON data"""
+        """
+        Load the scraped JSON data.
+        A .ndjson file (the scraper's live record stream) can be read while
+        the scrape is still running.
+        """
         try:
-            with open(self.data_file, 'r') as f:
-                self.data = json.load(f)
+            if self.data_file.endswith('.ndjson'):
+                rooms = list(read_ndjson(self.data_file))
+                self.data = {
+                    'timestamp': datetime.fromtimestamp(os.path.getmtime(self.data_file)).isoformat(),
+                    'total_rooms': len(rooms),
+                    'rooms': rooms
+                }
+            else:
+                with open(self.data_file, 'r') as f:
+                    self.data = json.load(f)
             print(f"✅ Loaded data for {self.data['total_rooms']} rooms")
         except FileNotFoundError:
             print(f"❌ File not found: {self.data_file}")
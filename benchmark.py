@@ -0,0 +1,224 @@
+"""
+benchmark.py  ─  End-to-end throughput benchmark against the local mock portal.
+
+Starts mock_portal.MockPortal, then drives the real RoomTimetableScraper,
+ClassTimetableScraper and FacultyTimetableScraper against it. Only the steps
+that need a human on the real portal (captcha login, menu navigation) are
+replaced; everything from the first Go onwards is the production code path.
+
+Reports rooms/min, combos/min and faculties/min, measured from the moment the
+timetable page is open until run() returns.
+
+    python benchmark.py                                   # all three, defaults
+    python benchmark.py --only room --rooms 80 --concurrency 4
+    python benchmark.py --only room --engine http --concurrency 8
+    python benchmark.py --only class --sems 2,4,6,8 --concurrency 4
+    python benchmark.py --latency-ms 800 --jitter-ms 300  # a slow portal
+
+All scraper outputs go to a throw-away directory (HOME is pointed there), so
+~/ims_scraper_outputs is never touched. The report is written to
+~/ims_scraper_outputs/benchmarks/benchmark_<timestamp>.json.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from mock_portal import MockPortal
+
+_REPORT_DIR = os.path.expanduser("~/ims_scraper_outputs/benchmarks")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1.  Mock-portal login / navigation (replaces captcha + manual steps)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class MockPortalMixin:
+    """Automatic login + menu navigation for the mock portal; stamps the start time."""
+
+    menu_link = None        # text of the menu entry to open
+    ready_selector = None   # element that proves the form is loaded
+
+    async def login(self, page):
+        await page.goto(self.base_url, wait_until="domcontentloaded")
+        await page.click('input[value="Student Login"]')
+        handle = await page.wait_for_selector('frame[name="banner"]')
+        frame = await handle.content_frame()
+        await frame.wait_for_selector('input[name="txtuserid"]')
+        await frame.fill('input[name="txtuserid"]', str(self.user_id))
+        await frame.fill('input[name="txtpassword"]', str(self.password))
+        await frame.select_option('select[name="cmbfinyear"]', self.fin_year)
+        await frame.click('input[value="Login"]')
+        await page.wait_for_selector('frame[name="menu"]')
+        return True
+
+    async def _open_menu(self, page):
+        menu = page.frame(name="menu")
+        await menu.click(f'a:has-text("{self.menu_link}")')
+        data = page.frame(name="data")
+        await data.wait_for_selector(self.ready_selector)
+        self.bench_started = time.perf_counter()
+        return True
+
+
+def _build_scrapers():
+    """Imported lazily so the scrapers see the benchmark's HOME."""
+    from class_timetable_scraper import ClassTimetableScraper
+    from faculty_scraper import FacultyTimetableScraper
+    from room_scraper import RoomTimetableScraper
+
+    class BenchRoomScraper(MockPortalMixin, RoomTimetableScraper):
+        menu_link = "RoomTimetable"
+        ready_selector = "#txtroom"
+
+        async def navigate_to_room_timetable(self, page):
+            return await self._open_menu(page)
+
+    class BenchClassScraper(MockPortalMixin, ClassTimetableScraper):
+        menu_link = "ClassTimetable"
+        ready_selector = 'select[name="degree"]'
+
+        async def navigate_to_class_timetable(self, page):
+            return await self._open_menu(page)
+
+        async def _scrape_all(self, page, frame, **kwargs):
+            self.bench_stats = await super()._scrape_all(page, frame, **kwargs)
+            return self.bench_stats
+
+    class BenchFacultyScraper(MockPortalMixin, FacultyTimetableScraper):
+        menu_link = "Faculty Timetable"
+        ready_selector = 'img[title="Picker"]'
+
+        def load_faculties_from_excel(self, file_path):
+            return []   # set from the mock portal instead
+
+        async def navigate_to_faculty_timetable(self, page):
+            return await self._open_menu(page)
+
+    return BenchRoomScraper, BenchClassScraper, BenchFacultyScraper
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2.  Runners
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _result(name: str, unit: str, items: int, scraper, portal: MockPortal) -> dict:
+    elapsed = time.perf_counter() - getattr(scraper, "bench_started", time.perf_counter())
+    return {
+        "scraper":   name,
+        "items":     items,
+        "unit":      unit,
+        "seconds":   round(elapsed, 2),
+        "per_min":   round(items / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        "phases":    scraper.timing.summary(),
+        "pacing":    scraper.pacing.stats(),
+        "portal_requests": portal.stats(),
+    }
+
+
+async def bench_rooms(portal: MockPortal, args) -> dict:
+    BenchRoomScraper, _, _ = _build_scrapers()
+    scraper = BenchRoomScraper(user_id="bench", password="bench", fin_year=portal.fin_year)
+    scraper.base_url = portal.base_url
+    portal.requests.clear()
+    await scraper.run(mode="all", headless=True, concurrency=args.concurrency,
+                      engine=args.engine, resume=False, refresh_rooms=True)
+    return _result("room", "rooms", len(scraper.timing.samples.get("room_total", [])), scraper, portal)
+
+
+async def bench_classes(portal: MockPortal, args) -> dict:
+    _, BenchClassScraper, _ = _build_scrapers()
+    scraper = BenchClassScraper(user_id="bench", password="bench", fin_year=portal.fin_year)
+    scraper.base_url = portal.base_url
+    scraper.target_sems = args.sems
+    scraper.target_sections = args.sections
+    portal.requests.clear()
+    await scraper.run(headless=True, concurrency=args.concurrency)
+    stats = getattr(scraper, "bench_stats", {"total": 0, "skipped": 0})
+    return _result("class", "combos", stats["total"] - stats["skipped"], scraper, portal)
+
+
+async def bench_faculties(portal: MockPortal, args) -> dict:
+    _, _, BenchFacultyScraper = _build_scrapers()
+    scraper = BenchFacultyScraper(user_id="bench", password="bench", fin_year=portal.fin_year)
+    scraper.base_url = portal.base_url
+    scraper.faculty_names = [f["name"] for f in portal.faculties]
+    portal.requests.clear()
+    await scraper.run(headless=True, concurrency=args.concurrency)
+    return _result("faculty", "faculties", len(scraper.timing.samples.get("faculty_total", [])), scraper, portal)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+
+def print_report(results: list[dict]):
+    print("\n" + "=" * 60)
+    print("🏁 BENCHMARK (mock portal)")
+    print("=" * 60)
+    for r in results:
+        print(f"   {r['scraper']:<8} {r['items']:>5} {r['unit']:<10} in {r['seconds']:>7.1f}s"
+              f"  →  {r['per_min']:>7.1f} {r['unit']}/min")
+    print("=" * 60 + "\n")
+
+
+async def main_async(args):
+    report_dir = _REPORT_DIR   # resolved before HOME is redirected
+    work_dir = tempfile.mkdtemp(prefix="ims_bench_")
+    # Playwright looks for its browsers under HOME; pin the real location first
+    if "PLAYWRIGHT_BROWSERS_PATH" not in os.environ and sys.platform != "win32":
+        cache = "~/Library/Caches/ms-playwright" if sys.platform == "darwin" else "~/.cache/ms-playwright"
+        os.environ["PLAYWRIGHT_BROWSERS_PATH"] = os.path.expanduser(cache)
+    os.environ["HOME"] = work_dir
+    print(f"🧪 Scraper outputs → {work_dir}")
+
+    portal = MockPortal(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        option_latency_ms=args.option_latency_ms, empty_ratio=args.empty_ratio,
+                        rooms=args.rooms, faculties=args.faculties).start()
+    print(f"🧪 Mock IMS portal on {portal.base_url}")
+
+    runners = {"room": bench_rooms, "class": bench_classes, "faculty": bench_faculties}
+    results = []
+    try:
+        for name in args.only:
+            results.append(await runners[name](portal, args))
+    finally:
+        portal.stop()
+
+    print_report(results)
+    os.makedirs(report_dir, exist_ok=True)
+    path = os.path.join(report_dir, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "settings":  {k: v for k, v in vars(args).items()},
+            "results":   results,
+        }, f, indent=2)
+    print(f"💾 Report saved to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput benchmark against the mock IMS portal.")
+    parser.add_argument("--only", default="room,class,faculty",
+                        type=lambda s: [x.strip() for x in s.split(",") if x.strip()])
+    parser.add_argument("--rooms", type=int, default=40)
+    parser.add_argument("--faculties", type=int, default=15)
+    parser.add_argument("--sems", default="6", type=lambda s: [int(x) for x in s.split(",")])
+    parser.add_argument("--sections", default="1", type=lambda s: [int(x) for x in s.split(",")])
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--engine", choices=("browser", "http"), default="browser")
+    parser.add_argument("--latency-ms", type=int, default=300)
+    parser.add_argument("--jitter-ms", type=int, default=100)
+    parser.add_argument("--option-latency-ms", type=int, default=150)
+    parser.add_argument("--empty-ratio", type=float, default=0.15)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
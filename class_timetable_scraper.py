@@ -14,26 +14,67 @@ Changes from the brute-force version
 • filter_depts_for_degree() and filter_specs_for_dept() are called
   each iteration to skip impossible combos.
 • On every successful timetable save the cache is updated + written.
-• Resume support preserved (file-existence check unchanged).
+• Resume support: finished combinations are looked up in storage.ClassManifest
+  (SQLite, loaded once) instead of one file-existence check per combination.
+• Timetable HTML is parsed in Python (timetable_parser.parse_class_timetable).
+• Dropdown settle times, the Go timeout and the pause between combinations
+  follow pacing.PacingController instead of fixed values.
+• Dropdowns are only changed when their live value differs from the wanted one,
+  and only changes that cascade (sem → degree → dept → spec) wait to settle.
+• Cascade waits are event-driven: they end when the dependent dropdown's
+  options change or its request completes, bounded by cascade_timeout_ms.
+• The sem → degree → dept → spec options are cached per fin_year
+  (heuristics.OptionTreeCache); the live cascade is only read for branches
+  that are missing or that the live form rejects. run(refresh_options=True)
+  rebuilds the tree.
+• Each scraped timetable is fingerprinted; when a dept × degree pair keeps
+  returning the same timetable for every section (or every spec), the
+  HeuristicsCache learns a collapse rule and the repeats are saved as copies
+  (marked "collapsed_from") without a request.
+• run(store="sqlite") writes one row per slot into a single SQLite table
+  (storage.ClassSlotStore) instead of one JSON file per combination.
+• Go results are detected in the page: an init-script MutationObserver in every
+  frame calls an exposed binding the moment a fresh T1/T2 table appears, so
+  _click_go_and_wait awaits one future instead of polling every frame.
+  The portal's "No Record Found" answer resolves it too, so empty combinations
+  fail fast instead of running into the Go timeout.
+• run(budget=N / time_limit_s=T / dry_run=True), or --budget / --time-limit /
+  --dry-run on the command line, plans every combination first, scores it with
+  heuristics.score_combination() and scrapes by descending expected yield.
+• run(concurrency=N) splits the crawl into shards (per semester, or per
+  semester × section) and runs them on N pages of the same logged-in context.
 """
 
+import argparse
 import asyncio
+import copy
 from playwright.async_api import async_playwright
 import json
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 import re
+import time
+from typing import Optional
 
 # ── Import constraint helpers ────────────────────────────────────────────────
 from heuristics import (
     HeuristicsCache,
     Blacklist,
+    OptionTreeCache,
     filter_depts_for_degree,
     filter_specs_for_dept,
+    score_combination,
+    rescore_combinations,
     normalize,
     match_degree,
 )
+from pacing import PacingController
+from phase_timing import PhaseTimer
+from resource_policy import ResourcePolicy
+from storage import ClassManifest, ClassSlotStore, content_hash
+from timetable_parser import EMPTY_RESULT_PATTERN, parse_class_timetable
+from worker_pages import open_worker_pages
 
 load_dotenv()
 
@@ -46,6 +87,178 @@ def safe_filename(text: str) -> str:
     return re.sub(r'[\\/:*?"<>|]+', '_', str(text)).strip('_')
 
 
+# Result state of one document: 'table' for a fresh (not stale-marked) class
+# timetable (T1 and T2 headers, more than 3 rows), 'empty' when a document the
+# Go produced shows the portal's no-record message, else null
+_RESULT_STATE_JS = """
+    (emptyPattern) => {
+        for (const t of document.querySelectorAll('table')) {
+            if (t.getAttribute('data-stale') === '1') continue;  // skip old table
+            const txt = t.innerText || '';
+            if (txt.includes('T1') && txt.includes('T2')
+                && t.querySelectorAll('tr').length > 3)
+                return 'table';
+        }
+        const root = document.documentElement;
+        if (root && root.getAttribute('data-stale') !== '1'
+            && new RegExp(emptyPattern, 'i').test(document.body ? document.body.innerText : ''))
+            return 'empty';
+        return null;
+    }
+"""
+
+# Run in every frame before a Go: marks the old T1/T2 tables and the document
+# stale, so neither an old table nor an old "No Record Found" is read as this
+# Go's answer, and re-arms that frame's table watch for the no-record message
+_STALE_MARK_JS = """
+    () => {
+        document.querySelectorAll('table').forEach(t => {
+            if ((t.innerText || '').includes('T1'))
+                t.setAttribute('data-stale', '1');
+        });
+        document.documentElement.setAttribute('data-stale', '1');
+        if (window.__imsTableWatchReset) window.__imsTableWatchReset();
+    }
+"""
+
+# Init script for every document: report each fresh T1/T2 table once, and the
+# portal's no-record message once per Go, through the __imsTableReady binding
+# as soon as they appear. Only inserted nodes and changed text are tested for
+# the message, so text left over from the previous Go never counts;
+# _click_go_and_wait re-arms the message report (__imsTableWatchReset) when it
+# marks the page stale.
+_TABLE_WATCH_JS = """
+(() => {
+    if (window.__imsTableWatch) return;
+    window.__imsTableWatch = true;
+    const emptyRe = new RegExp(__EMPTY_PATTERN__, 'i');
+    const reported = new WeakSet();
+    let emptyReported = false;
+    window.__imsTableWatchReset = () => { emptyReported = false; };
+    const skipped = ['SCRIPT', 'STYLE', 'SELECT', 'OPTION'];
+    const saysEmpty = (node) => {
+        if (node.nodeType === Node.TEXT_NODE)
+            return !!node.parentNode && !skipped.includes(node.parentNode.nodeName) && emptyRe.test(node.data);
+        return node.nodeType === Node.ELEMENT_NODE && !skipped.includes(node.nodeName)
+            && emptyRe.test(node.textContent || '');
+    };
+    const check = (records) => {
+        if (typeof window.__imsTableReady !== 'function') return;
+        for (const t of document.querySelectorAll('table')) {
+            if (reported.has(t) || t.getAttribute('data-stale') === '1') continue;
+            const txt = t.textContent || '';
+            if (txt.includes('T1') && txt.includes('T2') && t.querySelectorAll('tr').length > 3) {
+                reported.add(t);
+                window.__imsTableReady({ kind: 'table' });
+                return;
+            }
+        }
+        if (emptyReported || !records) return;
+        for (const r of records) {
+            const nodes = r.type === 'characterData' ? [r.target] : r.addedNodes;
+            for (const node of nodes) {
+                if (saysEmpty(node)) {
+                    emptyReported = true;
+                    window.__imsTableReady({ kind: 'empty' });
+                    return;
+                }
+            }
+        }
+    };
+    new MutationObserver(check).observe(document, { childList: true, subtree: true, characterData: true });
+    document.addEventListener('DOMContentLoaded', () => check(null));
+})();
+""".replace("__EMPTY_PATTERN__", json.dumps(EMPTY_RESULT_PATTERN))
+
+
+class _StaleOptionTree(Exception):
+    """A cached dropdown option was not accepted by the live form."""
+
+    def __init__(self, key: str, path: tuple):
+        super().__init__(f"stale {key} options below {path}")
+        self.key  = key
+        self.path = path
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Cascade wait  (used by ClassTimetableScraper._select)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Armed before select_option: watches the dependent <select> for a new option
+# list and counts XHR / fetch requests started by the change handler.
+_CASCADE_ARM_JS = """
+(name) => {
+    const find = () => document.querySelector(`select[name="${name}"]`)
+                    || document.querySelector(`select[id="${name}"]`);
+    const sig = (s) => s ? Array.from(s.options).map(o => o.value + '\\u0001' + o.text).join('\\u0002') : '';
+    const before = sig(find());
+    if (window.__imsCascade && window.__imsCascade.observer) window.__imsCascade.observer.disconnect();
+    const st = window.__imsCascade = {
+        changed: false, requests: 0, inflight: 0, lastDone: 0, armedAt: performance.now(),
+    };
+    st.observer = new MutationObserver(() => {
+        if (sig(find()) !== before) st.changed = true;
+    });
+    st.observer.observe(document.body, {childList: true, subtree: true, attributes: true});
+
+    if (!window.__imsNetHooked) {
+        window.__imsNetHooked = true;
+        const started = () => {
+            const c = window.__imsCascade;
+            if (c) { c.requests++; c.inflight++; }
+            return c;
+        };
+        const ended = (c) => {
+            if (c) { c.inflight = Math.max(0, c.inflight - 1); c.lastDone = performance.now(); }
+        };
+        const send = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function (...args) {
+            const c = started();
+            this.addEventListener('loadend', () => ended(c));
+            return send.apply(this, args);
+        };
+        if (window.fetch) {
+            const fetch_ = window.fetch;
+            window.fetch = function (...args) {
+                const c = started();
+                return fetch_.apply(this, args).finally(() => ended(c));
+            };
+        }
+    }
+    return true;
+}
+"""
+
+# Resolves with how the cascade settled: 'options' (the dependent list changed),
+# 'request' (the request finished without changing it), 'idle' (no request was
+# started), 'timeout', or 'unarmed' (the armed state is gone: a new document).
+# Polls with setTimeout against a wall-clock deadline; requestAnimationFrame
+# stops firing in a hidden or throttled page.
+_CASCADE_WAIT_JS = """
+({timeoutMs, idleMs}) => new Promise(resolve => {
+    const st = window.__imsCascade;
+    if (!st) return resolve('unarmed');
+    const deadline = Date.now() + timeoutMs;
+    const settled = () => {
+        const now = performance.now();
+        if (st.changed) return 'options';
+        if (st.requests > 0 && st.inflight === 0 && now - st.lastDone > 50) return 'request';
+        if (st.requests === 0 && now - st.armedAt > idleMs) return 'idle';
+        if (Date.now() >= deadline) return 'timeout';
+        return null;
+    };
+    const poll = () => {
+        const how = settled();
+        if (!how) return setTimeout(poll, 20);
+        st.observer.disconnect();
+        window.__imsCascade = null;
+        resolve(how);
+    };
+    poll();
+})
+"""
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Scraper
 # ─────────────────────────────────────────────────────────────────────────────
@@ -74,6 +287,31 @@ class ClassTimetableScraper:
         # Heuristic helpers (shared across the whole run)
         self.cache     = HeuristicsCache()
         self.blacklist = Blacklist(persist_threshold=3, skip_threshold=6)
+        # sem → degree → dept → spec options from earlier runs of this fin_year
+        self.option_tree = OptionTreeCache(fin_year)
+        # First timetable scraped per section group / spec group (see _learn_duplicates)
+        self._representatives: dict[str, dict] = {"section": {}, "spec": {}}
+
+        # Finished combinations (see storage.ClassManifest), set up in run()
+        self.manifest = None
+        # "json" (one file per combination), "sqlite" (storage.ClassSlotStore) or "both"
+        self.store      = "json"
+        self.slot_store = None
+
+        # Adaptive settle times / Go timeout / inter-combo delay (see pacing.py)
+        self.pacing = PacingController(timeout_s=15.0, min_timeout_s=5.0)
+
+        # Per-phase durations of every combination (see phase_timing.py)
+        self.timing = PhaseTimer("class")
+
+        # Upper bound for a cascading dropdown to refill, and how long to wait
+        # for a change handler to start a request before calling it settled
+        self.cascade_timeout_ms = 5000
+        self.cascade_idle_ms    = 300
+
+        # Result-table watch (see _install_table_watch): one pending Go per page
+        self._table_watch = False
+        self._table_waiters: dict = {}
 
         # Maps logical key → actual HTML name attribute (filled by _discover_select_names)
         self.sel = {
@@ -279,10 +517,16 @@ class ClassTimetableScraper:
 
     # ── Select one value ─────────────────────────────────────────────────────
     async def _select(self, frame, logical_key: str, value: str, wait_ms: int = 500):
+        """
+        Select `value` in a dropdown. When wait_ms > 0 and the dropdown cascades,
+        wait until the dependent dropdown has been refilled (see _wait_for_cascade);
+        wait_ms is only slept (pacing-scaled) when that cannot be observed.
+        """
         name = self.sel.get(logical_key)
         if not name:
             return
         selector = f'select[name="{name}"]'
+        dependent = next((self.sel[d] for d in self._CASCADE.get(logical_key, ()) if self.sel.get(d)), None)
 
         selected_value = value
         if value.lower() == 'all':
@@ -294,38 +538,169 @@ class ClassTimetableScraper:
             except Exception:
                 pass
 
+        armed = False
+        if wait_ms > 0 and dependent:
+            try:
+                armed = await frame.evaluate(_CASCADE_ARM_JS, dependent)
+            except Exception:
+                armed = False
+
         try:
-            await frame.select_option(selector, selected_value)
+            await frame.select_option(selector, selected_value, timeout=self.cascade_timeout_ms)
             if wait_ms > 0:
-                await frame.wait_for_timeout(wait_ms)
+                if armed:
+                    await self._wait_for_cascade(frame, logical_key)
+                else:
+                    await frame.wait_for_timeout(self.pacing.settle_ms(wait_ms))
         except Exception as e:
             print(f"            ⚠️  select({logical_key}={selected_value}): {e}")
 
+    async def _wait_for_cascade(self, frame, logical_key: str) -> str:
+        """
+        Wait, at most cascade_timeout_ms, for the dropdown after `logical_key` to be
+        refilled: resolves as soon as its option list changes or the request the
+        change fired completes. A change that reloads the frame waits for the new
+        document instead.
+        """
+        start = time.perf_counter()
+        try:
+            # The page-side wait is bounded by its own deadline; this one also
+            # covers a page whose timers never fire
+            how = await asyncio.wait_for(frame.evaluate(_CASCADE_WAIT_JS, {
+                "timeoutMs": self.cascade_timeout_ms,
+                "idleMs":    self.cascade_idle_ms,
+            }), timeout=self.cascade_timeout_ms / 1000 + 1.0)
+        except asyncio.TimeoutError:
+            how = "timeout"
+        except Exception:
+            how = "navigation"   # onchange submitted the form: the old document is gone
+        if how == "unarmed":
+            how = "navigation"   # the armed state went with the document it was set on
+        if how == "navigation":
+            try:
+                await frame.wait_for_load_state("domcontentloaded", timeout=self.cascade_timeout_ms)
+            except Exception:
+                pass
+        self.timing.record("cascade_wait", time.perf_counter() - start)
+        if how == "timeout":
+            print(f"            ⏱️  {logical_key}: dependent dropdown did not refresh "
+                  f"within {self.cascade_timeout_ms} ms")
+        return how
+
+    # ── State-aware selection ────────────────────────────────────────────────
+    # Changing one of these makes the portal refill the dropdowns listed after it
+    _CASCADE = {
+        "sem":    ("degree", "dept", "spec"),
+        "degree": ("dept", "spec"),
+        "dept":   ("spec",),
+    }
+
+    async def _read_form_state(self, frame) -> dict:
+        """Current {logical_key: {value, text}} of every mapped select, in one round trip."""
+        names = {k: v for k, v in self.sel.items() if v}
+        try:
+            return await frame.evaluate("""
+                (names) => {
+                    const out = {};
+                    for (const [key, name] of Object.entries(names)) {
+                        const sel = document.querySelector(`select[name="${name}"]`)
+                                 || document.querySelector(`select[id="${name}"]`);
+                        if (!sel) continue;
+                        const opt = sel.options[sel.selectedIndex];
+                        out[key] = { value: sel.value.trim(), text: opt ? opt.text.trim() : '' };
+                    }
+                    return out;
+                }
+            """, names)
+        except Exception:
+            return {}
+
+    @staticmethod
+    def _state_matches(current: dict, value: str) -> bool:
+        if value.lower() == "all":
+            return current["text"].lower() == "all"
+        return value in (current["value"], current["text"])
+
+    async def _ensure_selected(self, frame, wanted: list, stats: dict = None,
+                               verify: bool = False) -> Optional[str]:
+        """
+        Bring the form to `wanted` = [(logical_key, value, wait_ms), ...], in order.
+        Dropdowns already showing the value are left alone; wait_ms is only spent
+        when the change cascades into dependent dropdowns, and every dropdown
+        downstream of a change is re-selected because the portal refills it.
+
+        With verify=True the form is read back after any change and the first
+        degree / dept / spec that did not take the wanted value is returned.
+        """
+        state = await self._read_form_state(frame)
+        issued = False
+        for key, value, wait_ms in wanted:
+            current = state.get(key)
+            if current and self._state_matches(current, value):
+                if stats is not None:
+                    stats["selects_skipped"] += 1
+                continue
+            await self._select(frame, key, value, wait_ms=wait_ms if key in self._CASCADE else 0)
+            issued = True
+            if stats is not None:
+                stats["selects_issued"] += 1
+            for dependent in self._CASCADE.get(key, ()):
+                state.pop(dependent, None)
+
+        if not (verify and issued):
+            return None
+        state = await self._read_form_state(frame)
+        for key, value, _ in wanted:
+            if key in ("degree", "dept", "spec") and key in state \
+                    and not self._state_matches(state[key], value):
+                return key
+        return None
+
+    async def _branch_options(self, frame, path: tuple, prime: list, stats: dict) -> tuple[list, bool]:
+        """
+        Options of the dropdown below `path` = (sem[, degree[, dept]]) and whether
+        they came from the option-tree cache. On a miss the form is primed with
+        `prime` and the live options are read and cached.
+        """
+        cached = self.option_tree.get(path)
+        if cached is not None:
+            return cached, True
+        key = ("degree", "dept", "spec")[len(path) - 1]
+        await self._ensure_selected(frame, prime, stats)
+        opts = await self._get_options(frame, key)
+        # An empty spec list is a real answer ("N_A"); empty degree / dept lists
+        # are more likely a slow cascade, so they are not cached
+        if opts or key == "spec":
+            self.option_tree.put(path, opts)
+        return opts, False
+
     # ── Click Go, poll all frames for timetable ──────────────────────────────
-    async def _click_go_and_wait(self, page, form_frame, timeout_s: int = 15):
+    async def _click_go_and_wait(self, page, form_frame, timeout_s: float = None):
         """
         Click the Go button exactly the way the working room scraper does:
           1. Stamp a sentinel on the DOM so we can detect a genuine refresh.
           2. Find Go with the two selectors that are known to work on IMS.
           3. Plain await el.click() — no JS fallback, no try/except swallowing.
-          4. Poll every live page frame for the T1/T2 result table.
-
-        Returns (True, result_frame) on success, (False, None) on timeout.
+          4. Wait for the T1/T2 result table: the in-page watch (see
+             _install_table_watch) reports it from whichever frame it appears
+             in; without the watch, every frame is polled.
+
+        timeout_s defaults to the pacing controller's current Go timeout; the
+        Go-to-table latency (or the timeout) is reported back to it.
+        Returns (True, result_frame) on success, (False, None) on timeout or when
+        the portal answers with its no-record message.
         """
+        if timeout_s is None:
+            timeout_s = self.pacing.timeout_s
+        laps = self.timing.laps()
         # ── Step 1: stamp a sentinel value so we know when DOM has refreshed ─
         # This is the same trick the room scraper uses to avoid reading stale data.
-        try:
-            await form_frame.evaluate("""
-                () => {
-                    // Mark any existing timetable tables as stale
-                    document.querySelectorAll('table').forEach(t => {
-                        if ((t.innerText || '').includes('T1'))
-                            t.setAttribute('data-stale', '1');
-                    });
-                }
-            """)
-        except Exception:
-            pass
+        # Every frame is marked, since the answer is looked for in every frame
+        frames = self._frames_of(page) if page is not None else []
+        if form_frame not in frames:
+            frames.append(form_frame)
+        await asyncio.gather(*(f.evaluate(_STALE_MARK_JS) for f in frames), return_exceptions=True)
+        laps.lap("stale_mark")
 
         # ── Step 2: find Go button — same two selectors the room scraper uses ─
         go_btn = (
@@ -340,155 +715,89 @@ class ClassTimetableScraper:
         print(f"            🖱️   Clicking Go  [{val}]")
 
         # ── Step 3: plain Playwright click — identical to room scraper ─────────
+        # The waiter is registered first so a table that renders during the
+        # click is not missed
+        waiter = None
+        if self._table_watch:
+            waiter = asyncio.get_running_loop().create_future()
+            self._table_waiters[page] = waiter
+        go_time = time.monotonic()
         await go_btn.click()
+        laps.lap("go_click")
 
-        # ── Step 4: poll all live frames for a fresh (non-stale) T1/T2 table ──
-        _FRESH_TABLE_JS = """
-            () => {
-                for (const t of document.querySelectorAll('table')) {
-                    if (t.getAttribute('data-stale') === '1') continue;  // skip old table
-                    const txt = t.innerText || '';
-                    if (txt.includes('T1') && txt.includes('T2')
-                        && t.querySelectorAll('tr').length > 3)
-                        return true;
-                }
-                return false;
-            }
+        # ── Step 4: wait for a fresh (non-stale) T1/T2 table in any frame ─────
+        # ...or for the portal's explicit no-record answer, which ends the wait early
+        if waiter is not None:
+            try:
+                result_frame, kind = await asyncio.wait_for(waiter, timeout_s)
+            except asyncio.TimeoutError:
+                result_frame, kind = None, None
+            finally:
+                self._table_waiters.pop(page, None)
+        else:
+            result_frame, kind = await self._poll_for_table(page, go_time, timeout_s)
+
+        laps.lap("wait")
+        if kind is None:
+            self.pacing.record_timeout()
+            print(f"            ⏱️  Timed out after {timeout_s:.0f}s — no timetable table found.")
+            return False, None
+        latency = time.monotonic() - go_time
+        self.pacing.record_success(latency)
+        if kind == "empty":
+            print(f"            📭  Portal answered 'no record' after {latency:.1f}s")
+            return False, None
+        print(f"            ✅  Table found in frame "
+              f"'{getattr(result_frame, 'name', '?')}' after {latency:.1f}s")
+        return True, result_frame
+
+    @staticmethod
+    def _frames_of(page) -> list:
+        """Every frame of `page`, nested frames included."""
+        seen, stack = [], list(page.frames)
+        while stack:
+            f = stack.pop()
+            if f not in seen:
+                seen.append(f)
+                stack.extend(f.child_frames)
+        return seen
+
+    async def _poll_for_table(self, page, go_time: float, timeout_s: float) -> tuple:
         """
-
-        def _all_frames():
-            seen, stack = [], list(page.frames)
-            while stack:
-                f = stack.pop()
-                if f not in seen:
-                    seen.append(f)
-                    stack.extend(f.child_frames)
-            return seen
-
-        for elapsed in range(timeout_s):
-            await asyncio.sleep(1)
-            for f in _all_frames():
+        Fallback when the table watch is not installed: poll every frame twice a
+        second. Returns (frame, "table" | "empty"), or (None, None) on timeout.
+        """
+        while time.monotonic() - go_time < timeout_s:
+            await asyncio.sleep(0.5)
+            for f in self._frames_of(page):
                 try:
-                    if await f.evaluate(_FRESH_TABLE_JS):
-                        print(f"            ✅  Table found in frame "
-                              f"'{getattr(f, 'name', '?')}' after {elapsed+1}s")
-                        return True, f
+                    kind = await f.evaluate(_RESULT_STATE_JS, EMPTY_RESULT_PATTERN)
+                    if kind:
+                        return f, kind
                 except Exception:
                     pass  # frame mid-navigation — try next iteration
+        return None, None
 
-        print(f"            ⏱️  Timed out after {timeout_s}s — no timetable table found.")
-        return False, None
+    # ── Result-table watch (init script + binding) ───────────────────────────
+    async def _install_table_watch(self, context):
+        """
+        Every document of `context` gets a MutationObserver that calls the
+        __imsTableReady binding once per fresh T1/T2 table (and once for a
+        no-record message); _click_go_and_wait awaits that call instead of
+        polling the frames.
+        """
+        await context.expose_binding("__imsTableReady", self._on_table_ready)
+        await context.add_init_script(_TABLE_WATCH_JS)
+        self._table_watch = True
+
+    def _on_table_ready(self, source, payload=None):
+        waiter = self._table_waiters.get(source.get("page"))
+        if waiter is not None and not waiter.done():
+            waiter.set_result((source.get("frame"), (payload or {}).get("kind", "table")))
 
     async def _parse_timetable(self, frame) -> dict:
-        return await frame.evaluate("""
-            () => {
-                const result = {};
-                const dayNames = ['Mon','Tue','Wed','Thu','Fri','Sat','Sun'];
-
-                const tables = Array.from(document.querySelectorAll('table'));
-                
-                for (let table of tables) {
-                    const fullText = table.innerText || '';
-                    if (!fullText.includes('T1') && !fullText.includes('T 1') && !fullText.includes('T2')) continue;
-
-                    const rows = Array.from(table.querySelectorAll('tr'));
-                    let headerRowIndices = [];
-                    
-                    for (let i = 0; i < rows.length; i++) {
-                        const row = rows[i];
-                        const cells = Array.from(row.querySelectorAll('td,th'));
-                        const texts = cells.map(c => c.innerText.trim());
-                        if (texts.some(t => /^T\\s*\\d+/.test(t) || t === 'T1' || t === 'T 1' || t.includes('T1') || t.includes('T2'))) {
-                            if (texts.length > 2) {
-                                headerRowIndices.push(i);
-                            }
-                        }
-                    }
-                    
-                    for (let h = 0; h < headerRowIndices.length; h++) {
-                        const hIdx = headerRowIndices[h];
-                        const headerRow = rows[hIdx];
-                        const nextHIdx = (h + 1 < headerRowIndices.length) ? headerRowIndices[h + 1] : rows.length;
-                        
-                        let label = 'CORE';
-                        for (let back = hIdx - 1; back >= 0; back--) {
-                            if (h > 0 && back <= (headerRowIndices[h-1] || -1)) break;
-                            const txt = rows[back].innerText.trim();
-                            if (txt.includes('Time Table')) {
-                                const m = txt.match(/Time Table\\s*\\(([^)]+)\\)/i);
-                                label = m ? m[1].trim() : txt.slice(0,40).replace(/\\s+/g,' ');
-                                break;
-                            }
-                        }
-                        if (result[label]) {
-                            label += '_' + h;
-                        }
-                        
-                        const cells = Array.from(headerRow.querySelectorAll('td,th'));
-                        const texts = cells.map(c => c.innerText.trim());
-                        
-                        let slotMeta = [];
-                        for (let j = 1; j < texts.length; j++) {
-                            const parts = texts[j].split(/[\\n\\r]+/);
-                            const slot = parts[0].trim();
-                            const time_range = parts.length > 1 ? parts.slice(1).join(' ').trim() : null;
-                            slotMeta.push({ slot, time_range });
-                        }
-                        
-                        let blockStart = hIdx + 1;
-                        if (blockStart < nextHIdx && slotMeta.every(s => !s.time_range)) {
-                            const nxtCells = Array.from(rows[blockStart].querySelectorAll('td,th'))
-                                            .map(c => c.innerText.trim());
-                            if (nxtCells.some(t => t.includes(':'))) {
-                                for(let j = 1; j < nxtCells.length && (j-1) < slotMeta.length; j++) {
-                                    slotMeta[j-1].time_range = nxtCells[j];
-                                }
-                                blockStart++;
-                            }
-                        }
-                        
-                        const schedule = {};
-                        const legend = [];
-                        let pastLastDay = false;
-                        
-                        for (let i = blockStart; i < nextHIdx; i++) {
-                            const row = rows[i];
-                            const rCells = Array.from(row.querySelectorAll('td,th'));
-                            if (!rCells.length) continue;
-                            const first = rCells[0].innerText.trim();
-                            
-                            if (pastLastDay) {
-                                const txt = row.innerText.trim().replace(/\\s+/g,' ');
-                                if (txt.includes(' - ') && txt.includes('/')) legend.push(txt);
-                                continue;
-                            }
-                            
-                            if (!dayNames.some(d => first.startsWith(d))) {
-                                continue;
-                            }
-                            
-                            if (first.startsWith('Sat') || first.startsWith('Sun')) pastLastDay = true;
-                            
-                            schedule[first] = [];
-                            for (let j = 1; j < rCells.length && (j-1) < slotMeta.length; j++) {
-                                const content = (rCells[j] ? rCells[j].innerText.trim().replace(/\\s+/g,' ') : '');
-                                schedule[first].push({
-                                    slot: slotMeta[j-1].slot,
-                                    time_range: slotMeta[j-1].time_range,
-                                    content,
-                                    is_free: content.length <= 2
-                                });
-                            }
-                        }
-                        
-                        if (Object.keys(schedule).length > 0) {
-                            result[label] = { time_slots: slotMeta, schedule, legend };
-                        }
-                    }
-                }
-                return result;
-            }
-        """)
+        # One content() round trip; parsing happens in Python (timetable_parser.py)
+        return parse_class_timetable(await frame.content())
 
     # ── Output path + save ───────────────────────────────────────────────────
     def _output_path(self, sem, section, dept, degree, spec) -> str:
@@ -500,185 +809,568 @@ class ClassTimetableScraper:
             record["semester"], record["section"],
             record["department"], record["degree"], record["spec"]
         )
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(record, f, indent=2, ensure_ascii=False)
-        print(f"            💾  {os.path.basename(path)}")
+        if self.store in ("json", "both"):
+            # Write-then-rename, then the manifest row: a crash never leaves a
+            # manifest entry pointing at a half-written file
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        if self.slot_store is not None:
+            rows = self.slot_store.write(record)
+            if self.store == "sqlite":
+                path = self.slot_store.path
+                print(f"            💾  {rows} slots → {os.path.basename(path)}")
+        if self.manifest is not None:
+            self.manifest.record(record, path)
+        if self.store != "sqlite":
+            print(f"            💾  {os.path.basename(path)}")
+
+    def _is_done(self, sem, section, dept, degree, spec) -> bool:
+        """Resume check: the in-memory manifest, or the output file when there is none."""
+        if self.manifest is not None:
+            return self.manifest.is_done(sem, section, dept, degree, spec)
+        return os.path.exists(self._output_path(sem, section, dept, degree, spec))
 
     # ─────────────────────────────────────────────────────────────────────────
     # Main constraint-driven loop
     # ─────────────────────────────────────────────────────────────────────────
-    async def _scrape_all(self, page, frame):
+    # ── Duplicate timetables across sections / specs ─────────────────────────
+    def _learn_duplicates(self, sem, section, degree: str, dept: str, spec: str, timetable: dict):
+        """
+        Compare a scraped timetable with the first one of its group that differs
+        only in section (same sem/degree/dept/spec) or only in spec (same
+        sem/section/degree/dept), and feed the outcome to the collapse rules.
+        """
+        fingerprint = content_hash(timetable)
+        groups = (
+            ("section", (sem, degree, dept, spec),    section),
+            ("spec",    (sem, section, degree, dept), spec),
+        )
+        for dimension, group, member in groups:
+            first = self._representatives[dimension].get(group)
+            if first is None:
+                self._representatives[dimension][group] = (member, fingerprint, timetable)
+            elif first[0] != member:
+                self.cache.record_dimension(dept, degree, dimension, first[1] == fingerprint)
+
+    def _duplicate_of(self, sem, section, degree: str, dept: str, spec: str) -> Optional[tuple]:
+        """
+        (dimension, member, timetable) when a learned collapse rule says this
+        combination repeats one already scraped in this run, else None.
+        """
+        groups = (
+            ("section", (sem, degree, dept, spec),    section),
+            ("spec",    (sem, section, degree, dept), spec),
+        )
+        for dimension, group, member in groups:
+            first = self._representatives[dimension].get(group)
+            if first and first[0] != member and self.cache.is_collapsed(dept, degree, dimension):
+                return dimension, first[0], first[2]
+        return None
+
+    async def _scrape_all(self, page, frame, workers: list = None, shard_by: str = "sem"):
         """
         Traversal order:  sem → section → degree → dept → spec
+        Options come from the option-tree cache when this fin_year has been seen
+        before (no priming selects); a cached value the live form rejects drops
+        that branch from the cache and the semester is retried from the portal.
         Filtering:
-          • degree_opts   — full live list (no filter; degree is the anchor)
+          • degree_opts   — full list (no filter; degree is the anchor)
           • dept_opts     — filtered via filter_depts_for_degree()
           • spec_opts     — filtered via filter_specs_for_dept()
         Learning:
           • On success → cache.record_success() + blacklist.record_success()
           • On failure → blacklist.record_failure()
           • Cache saved every 10 successes (and always at the end)
+        Sharding:
+          • The combination space is cut into shards (one per semester, or per
+            semester × section with shard_by="section"); `workers` =
+            [(scraper, page, frame), ...] pull shards from a shared queue.
+          • With several workers, learned pruning is per shard: every shard
+            decides from the cache and blacklist as they were when the crawl
+            started, plus what it learns itself (duplicate representatives
+            included). Which combinations are requested, skipped or collapsed
+            therefore does not depend on how many workers run or in which order
+            shards finish; everything learned is still recorded for the next run.
+          • A serial run (one worker) shares the live cache and blacklist, so a
+            later semester is pruned with what the earlier ones learned.
+          • A shard whose cached options stay stale after 3 re-reads is reported
+            in stats["failed_shards"] instead of being dropped silently.
         """
-        stats = {
+        stats = self._new_stats()
+        workers = workers or [(self, page, frame)]
+        learned = (self.cache.snapshot(), self.blacklist.snapshot()) if len(workers) > 1 else None
+        if shard_by == "section":
+            shards = [(sem, [sec]) for sem in self.target_sems for sec in self.target_sections]
+        else:
+            shards = [(sem, list(self.target_sections)) for sem in self.target_sems]
+
+        queue = asyncio.Queue()
+        for shard in shards:
+            queue.put_nowait(shard)
+        if len(workers) > 1:
+            self.pacing.max_workers = len(workers)
+            self.pacing.workers = min(max(self.pacing.workers, 1), len(workers))
+            print(f"🧵  {len(shards)} shards over {self.pacing.workers} of {len(workers)} pages")
+
+        async def worker(worker_id, scraper, worker_page, worker_frame):
+            while True:
+                if len(workers) > 1 and not self.pacing.allows(worker_id) and not queue.empty():
+                    await asyncio.sleep(max(self.pacing.delay_s, 0.5))
+                    continue
+                try:
+                    sem, sections = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                tag = f"  (w{worker_id})" if len(workers) > 1 else ""
+                sec_tag = f" · Section {sections[0]}" if shard_by == "section" else ""
+                print(f"\n{'='*60}\n📅  Semester {sem}{sec_tag}{tag}\n{'='*60}")
+                shard = copy.copy(scraper)
+                if learned:
+                    shard.cache     = self.cache.fork(learned[0])
+                    shard.blacklist = self.blacklist.fork(learned[1])
+                else:
+                    shard.cache, shard.blacklist = self.cache, self.blacklist
+                shard._representatives = {"section": {}, "spec": {}}
+                if not await shard._scrape_shard(worker_page, worker_frame, sem, sections, stats):
+                    stats["failed_shards"].append({"sem": sem, "sections": sections})
+
+        await asyncio.gather(*(worker(i, *w) for i, w in enumerate(workers)))
+        return stats
+
+    async def _scrape_shard(self, page, frame, sem, sections: list, stats: dict) -> bool:
+        """One shard, re-read live up to 3 times on stale cached options; False if it never finished."""
+        for _ in range(3):
+            try:
+                await self._scrape_semester(page, frame, sem, sections, stats)
+                return True
+            except _StaleOptionTree as e:
+                # Drop the stale branch; the retry re-reads it live and
+                # combinations already saved are skipped by the resume check
+                self.option_tree.invalidate(e.path)
+                print(f"   ♻️  Cached {e.key} options no longer match the portal — "
+                      f"re-reading that branch live.")
+        print(f"   ❌  Semester {sem}, sections {sections}: options still stale after 3 re-reads — "
+              f"shard abandoned.")
+        return False
+
+    @staticmethod
+    def _new_stats() -> dict:
+        return {
             "total": 0, "saved": 0, "empty": 0,
             "skipped": 0, "pruned_dept": 0, "pruned_spec": 0,
+            "selects_issued": 0, "selects_skipped": 0, "collapsed": 0,
+            "failed_shards": [],
         }
-        save_counter = 0
 
-        for sem in self.target_sems:
-            print(f"\n{'='*60}\n📅  Semester {sem}\n{'='*60}")
+    # ─────────────────────────────────────────────────────────────────────────
+    # Yield-ordered planner  (alternative to the nested traversal)
+    # ─────────────────────────────────────────────────────────────────────────
+    async def _plan(self, frame, stats: dict, exclude: set = frozenset()) -> list[dict]:
+        """
+        Every combination the nested traversal would request (same skip list,
+        filters, blacklist and resume check), scored by score_combination() and
+        sorted by descending score; ties keep the traversal order.
+        """
+        plan = []
+        for i_sem, sem in enumerate(self.target_sems):
+            degree_opts, degrees_cached = await self._branch_options(
+                frame, (sem,), [("sem", str(sem), 800)], stats)
+            seq = 0
+            for degree in degree_opts:
+                deg_key = match_degree(degree["text"]) or normalize(degree["text"])
+                if deg_key in self.skip_degrees:
+                    continue
+                raw_dept_opts, depts_cached = await self._branch_options(
+                    frame, (sem, degree["value"]), [
+                        ("sem",    str(sem),        400),
+                        ("degree", degree["value"], 600),
+                    ], stats)
+                dept_opts = filter_depts_for_degree(raw_dept_opts, degree["text"], self.cache)
+                stats["pruned_dept"] += len(raw_dept_opts) - len(dept_opts)
+                for dept in dept_opts:
+                    if self.blacklist.is_blacklisted(dept["text"], degree["text"]):
+                        continue
+                    raw_spec_opts, specs_cached = await self._branch_options(
+                        frame, (sem, degree["value"], dept["value"]), [
+                            ("sem",    str(sem),        300),
+                            ("degree", degree["value"], 400),
+                            ("dept",   dept["value"],   600),
+                        ], stats)
+                    raw_spec_opts = raw_spec_opts or [{"value": "", "text": "N_A"}]
+                    spec_opts = filter_specs_for_dept(raw_spec_opts, dept["text"], self.cache)
+                    stats["pruned_spec"] += len(raw_spec_opts) - len(spec_opts)
+                    for spec in spec_opts:
+                        seq += 1
+                        score = score_combination(degree["text"], dept["text"], spec["text"],
+                                                  self.cache, self.blacklist)
+                        for i_sec, section in enumerate(self.target_sections):
+                            key = (sem, section, degree["value"], dept["value"], spec["value"])
+                            if key in exclude or self._is_done(
+                                    sem, section, dept["text"], degree["text"], spec["text"]):
+                                continue
+                            plan.append({
+                                "key": key, "sem": sem, "section": section,
+                                "degree": degree, "dept": dept, "spec": spec,
+                                "score": score, "order": (i_sem, i_sec, seq),
+                                "cached": degrees_cached or depts_cached or specs_cached,
+                            })
+        plan.sort(key=lambda c: (-c["score"], c["order"]))
+        return plan
+
+    def _estimate_combo_seconds(self) -> float:
+        """Typical seconds per combination: p50 of the last run's timings, else a guess."""
+        try:
+            with open(os.path.join(self.timing.directory, "class_phases.json"), encoding="utf-8") as f:
+                seconds = json.load(f)["phases"]["saved_combo_total"]["p50"]
+        except Exception:
+            seconds = 4.0
+        return seconds + self.pacing.delay_s
+
+    def _print_plan(self, plan: list[dict], workers: int, budget: int = None, time_limit_s: float = None):
+        count = len(plan) if budget is None else min(budget, len(plan))
+        per_combo = self._estimate_combo_seconds()
+        if time_limit_s is not None:
+            count = min(count, int(time_limit_s / per_combo * workers))
+        eta_s = count * per_combo / max(1, workers)
+        expected = sum(c["score"] for c in plan[:count])
+        print(f"\n📋  Plan: {count} of {len(plan)} candidate requests, "
+              f"~{expected:.0f} timetables expected, ETA ~{eta_s / 60:.1f} min "
+              f"({per_combo:.1f}s per request over {workers} page(s))")
+        for c in plan[:min(count, 15)]:
+            print(f"      {c['score']:.2f}  Sem{c['sem']} Sec{c['section']} | "
+                  f"{c['dept']['text']} / {c['degree']['text']} / {c['spec']['text']}")
+        if count > 15:
+            print(f"      … {count - 15} more")
+
+    async def _scrape_planned(self, workers: list, budget: int = None,
+                              time_limit_s: float = None) -> dict:
+        """
+        Plan, then scrape in descending-yield order on `workers` =
+        [(scraper, page, frame), ...] until the plan, the request budget or the
+        time limit runs out. Resumed and collapsed combinations cost no budget;
+        a worker that finds the budget held by in-flight reservations waits for
+        them to settle instead of stopping, since they may be handed back.
+        After every result the rest of that degree × dept pair is re-scored
+        (rescore_combinations), so a pair that keeps failing sinks in the order.
+        """
+        stats = self._new_stats()
+        _, page, frame = workers[0]
+        deadline = time.monotonic() + time_limit_s if time_limit_s is not None else None
+        requests = {"used": 0, "reserved": 0}
+        attempted: set = set()
+
+        for _ in range(3):
+            plan = await self._plan(frame, stats, exclude=attempted)
+            pending = list(plan)   # kept sorted by (-score, order)
+            stale = []
+
+            async def worker(worker_id, scraper, worker_page, worker_frame):
+                while True:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        return
+                    if len(workers) > 1 and not self.pacing.allows(worker_id) and pending:
+                        await asyncio.sleep(max(self.pacing.delay_s, 0.5))
+                        continue
+                    if not pending:
+                        return
+                    if budget is not None and requests["used"] >= budget:
+                        return
+                    if budget is not None and requests["used"] + requests["reserved"] >= budget:
+                        await asyncio.sleep(0.1)   # a reservation in flight may be handed back
+                        continue
+                    combo = pending.pop(0)
+                    if self.blacklist.is_blacklisted(combo["dept"]["text"], combo["degree"]["text"]):
+                        continue
+                    attempted.add(combo["key"])
+                    requests["reserved"] += 1   # spent only if a request was made
+                    try:
+                        outcome = await scraper._scrape_combo(
+                            worker_page, worker_frame, combo["sem"], combo["section"],
+                            combo["degree"], combo["dept"], combo["spec"], stats,
+                            verify=combo["cached"],
+                        )
+                    except _StaleOptionTree as e:
+                        self.option_tree.invalidate(e.path)
+                        attempted.discard(combo["key"])
+                        stale.append(e)
+                        outcome = "stale"
+                    finally:
+                        requests["reserved"] -= 1
+                    if outcome not in ("done", "collapsed", "stale"):
+                        requests["used"] += 1
+                    if outcome in ("saved", "empty", "stop"):
+                        rescore_combinations(pending, combo["degree"]["text"], combo["dept"]["text"],
+                                             self.cache, self.blacklist)
+
+            print(f"\n📋  Scraping {len(plan)} planned combinations by expected yield"
+                  + (f"  (budget {budget - requests['used']} requests)" if budget is not None else ""))
+            await asyncio.gather(*(worker(i, *w) for i, w in enumerate(workers)))
+            if not stale:
+                break
+            print(f"   ♻️  {len(stale)} cached branch(es) no longer match the portal — re-planning.")
+
+        if budget is not None and requests["used"] >= budget:
+            print(f"\n⏹️   Request budget of {budget} used up.")
+        if deadline is not None and time.monotonic() >= deadline:
+            print(f"\n⏹️   Time limit of {time_limit_s / 60:.1f} min reached.")
+        return stats
+
+    async def _open_shard_workers(self, page, frame, count: int) -> list:
+        """
+        [(scraper, page, frame), ...] for `count` shard workers, starting with the
+        main page. Extra pages are opened on the form URL in the logged-in context;
+        each gets a shallow copy of the scraper with its own select-name map, and
+        shares the caches, blacklist, pacing and timings.
+        """
+        async def ready(worker_page):
+            await self._bypass(worker_page)
+            worker_frame = await self._find_form_frame(worker_page)
+            if not worker_frame:
+                return None
+            shard = copy.copy(self)
+            shard.sel = dict.fromkeys(self.sel)
+            await shard._discover_select_names(worker_frame)
+            if shard.sel["sem"] and shard.sel["degree"]:
+                return shard, worker_frame
+            return None
+
+        extra = await open_worker_pages(page, frame.url, count, ready, form="class form", noun="shard page")
+        return [(self, page, frame)] + [(shard, worker_page, worker_frame)
+                                        for worker_page, (shard, worker_frame) in extra]
+
+    async def _scrape_semester(self, page, frame, sem, sections: list, stats: dict):
+        """One shard of the traversal in _scrape_all: `sections` of semester `sem`."""
+
+        # Degrees for this semester (option-tree cache, else prime the dropdown)
+        degree_opts, degrees_cached = await self._branch_options(
+            frame, (sem,), [("sem", str(sem), 800)], stats
+        )
 
-            # Prime the degree dropdown for this semester
-            await self._select(frame, "sem", str(sem), wait_ms=800)
-            degree_opts = await self._get_options(frame, "degree")
+        if not degree_opts:
+            print(f"   ⚠️  No degrees found for sem={sem}.")
+            return
 
-            if not degree_opts:
-                print(f"   ⚠️  No degrees found for sem={sem}.")
-                continue
+        print(f"   Degrees ({len(degree_opts)}{', cached' if degrees_cached else ''}): "
+              f"{[o['text'] for o in degree_opts]}")
 
-            print(f"   Degrees ({len(degree_opts)}): {[o['text'] for o in degree_opts]}")
+        for section in sections:
+            print(f"\n   🗂️  Section {section}")
 
-            for section in self.target_sections:
-                print(f"\n   🗂️  Section {section}")
+            for degree in degree_opts:
+                # ── Skip degrees configured in self.skip_degrees ──────────
+                # Use match_degree() so "B.E. (Full Time)" → "BE" etc.
+                deg_key = match_degree(degree["text"]) or normalize(degree["text"])
+                if deg_key in self.skip_degrees:
+                    print(f"\n      ⏭️   Skipping degree: {degree['text']}  (in skip list)")
+                    continue
 
-                for degree in degree_opts:
-                    # ── Skip degrees configured in self.skip_degrees ──────────
-                    # Use match_degree() so "B.E. (Full Time)" → "BE" etc.
-                    deg_key = match_degree(degree["text"]) or normalize(degree["text"])
-                    if deg_key in self.skip_degrees:
-                        print(f"\n      ⏭️   Skipping degree: {degree['text']}  (in skip list)")
-                        continue
+                print(f"\n      🎓  Degree: {degree['text']}")
 
-                    print(f"\n      🎓  Degree: {degree['text']}")
+                # ── Get full dept list for this sem+degree ─────────────
+                raw_dept_opts, depts_cached = await self._branch_options(
+                    frame, (sem, degree["value"]), [
+                        ("sem",    str(sem),        400),
+                        ("degree", degree["value"], 600),
+                    ], stats)
 
-                    # ── Get full dept list for this sem+degree ─────────────
-                    await self._select(frame, "sem",    str(sem),         wait_ms=400)
-                    await self._select(frame, "degree", degree["value"],  wait_ms=600)
-                    raw_dept_opts = await self._get_options(frame, "dept")
+                if not raw_dept_opts:
+                    print(f"         ⚠️  No departments — skipping degree.")
+                    continue
 
-                    if not raw_dept_opts:
-                        print(f"         ⚠️  No departments — skipping degree.")
+                # ── Apply heuristic dept filter ────────────────────────
+                dept_opts = filter_depts_for_degree(
+                    raw_dept_opts, degree["text"], self.cache
+                )
+                pruned_d = len(raw_dept_opts) - len(dept_opts)
+                if pruned_d:
+                    stats["pruned_dept"] += pruned_d
+                    print(f"         ✂️   Dept filter: {len(raw_dept_opts)} → {len(dept_opts)} "
+                          f"({pruned_d} pruned)")
+                print(f"         Departments: {[o['text'] for o in dept_opts]}")
+
+                for dept in dept_opts:
+                    # Skip entire dept×degree pair if blacklisted
+                    if self.blacklist.is_blacklisted(dept["text"], degree["text"]):
+                        print(f"            🚫  Skipping blacklisted: "
+                              f"{dept['text']} × {degree['text']}")
                         continue
 
-                    # ── Apply heuristic dept filter ────────────────────────
-                    dept_opts = filter_depts_for_degree(
-                        raw_dept_opts, degree["text"], self.cache
-                    )
-                    pruned_d = len(raw_dept_opts) - len(dept_opts)
-                    if pruned_d:
-                        stats["pruned_dept"] += pruned_d
-                        print(f"         ✂️   Dept filter: {len(raw_dept_opts)} → {len(dept_opts)} "
-                              f"({pruned_d} pruned)")
-                    print(f"         Departments: {[o['text'] for o in dept_opts]}")
-
-                    for dept in dept_opts:
-                        # Skip entire dept×degree pair if blacklisted
-                        if self.blacklist.is_blacklisted(dept["text"], degree["text"]):
-                            print(f"            🚫  Skipping blacklisted: "
-                                  f"{dept['text']} × {degree['text']}")
-                            continue
-
-                        print(f"\n         🏛️  Dept: {dept['text']}")
-
-                        # ── Seed spec dropdown ─────────────────────────────
-                        await self._select(frame, "sem",    str(sem),         wait_ms=300)
-                        await self._select(frame, "degree", degree["value"],  wait_ms=400)
-                        await self._select(frame, "dept",   dept["value"],    wait_ms=600)
-                        raw_spec_opts = await self._get_options(frame, "spec")
-
-                        # Treat "no specs" as a single N/A placeholder
-                        if not raw_spec_opts:
-                            raw_spec_opts = [{"value": "", "text": "N_A"}]
-
-                        # ── Apply heuristic spec filter ────────────────────
-                        spec_opts = filter_specs_for_dept(
-                            raw_spec_opts, dept["text"], self.cache
-                        )
-                        pruned_s = len(raw_spec_opts) - len(spec_opts)
-                        if pruned_s:
-                            stats["pruned_spec"] += pruned_s
-                            print(f"            ✂️   Spec filter: {len(raw_spec_opts)} → {len(spec_opts)} "
-                                  f"({pruned_s} pruned)")
-                        else:
-                            print(f"            Specs: {[o['text'] for o in spec_opts]}")
-
-                        for spec in spec_opts:
-                            stats["total"] += 1
-                            tag = (f"Sem{sem} Sec{section} | "
-                                   f"{dept['text']} / {degree['text']} / {spec['text']}")
-
-                            # Resume support
-                            if os.path.exists(self._output_path(
-                                    sem, section,
-                                    dept["text"], degree["text"], spec["text"])):
-                                print(f"            ⏭️  Cached: {tag}")
-                                stats["skipped"] += 1
-                                continue
+                    print(f"\n         🏛️  Dept: {dept['text']}")
 
-                            print(f"            🔄  {tag}")
-
-                            # ── Full explicit selection ────────────────────
-                            await self._select(frame, "sem",     str(sem),         wait_ms=400)
-                            await self._select(frame, "section", str(section),     wait_ms=300)
-                            await self._select(frame, "degree",  degree["value"],  wait_ms=400)
-                            await self._select(frame, "dept",    dept["value"],    wait_ms=500)
-                            if spec["value"]:
-                                await self._select(frame, "spec", spec["value"],   wait_ms=400)
-                            await self._select(frame, "day", "All", wait_ms=150)
-
-                            # ── Go ─────────────────────────────────────────
-                            loaded, result_frame = await self._click_go_and_wait(
-                                page, frame, timeout_s=15
-                            )
-
-                            if not loaded:
-                                print(f"            ⚠️  No timetable loaded.")
-                                stats["empty"] += 1
-                                if self.blacklist.record_failure(dept["text"], degree["text"]):
-                                    break   # ← stop remaining specs for this dept immediately
-                                continue
+                    # ── Seed spec dropdown ─────────────────────────────
+                    raw_spec_opts, specs_cached = await self._branch_options(
+                        frame, (sem, degree["value"], dept["value"]), [
+                            ("sem",    str(sem),        300),
+                            ("degree", degree["value"], 400),
+                            ("dept",   dept["value"],   600),
+                        ], stats)
 
-                            await self._bypass(page)
-                            # Parse from whichever frame the table appeared in
-                            timetable = await self._parse_timetable(result_frame)
+                    # Treat "no specs" as a single N/A placeholder
+                    if not raw_spec_opts:
+                        raw_spec_opts = [{"value": "", "text": "N_A"}]
 
-                            if not timetable:
-                                print(f"            ⚠️  Parser found nothing.")
-                                stats["empty"] += 1
-                                if self.blacklist.record_failure(dept["text"], degree["text"]):
-                                    break   # ← stop remaining specs for this dept immediately
-                                continue
+                    # ── Apply heuristic spec filter ────────────────────
+                    spec_opts = filter_specs_for_dept(
+                        raw_spec_opts, dept["text"], self.cache
+                    )
+                    pruned_s = len(raw_spec_opts) - len(spec_opts)
+                    if pruned_s:
+                        stats["pruned_spec"] += pruned_s
+                        print(f"            ✂️   Spec filter: {len(raw_spec_opts)} → {len(spec_opts)} "
+                              f"({pruned_s} pruned)")
+                    else:
+                        print(f"            Specs: {[o['text'] for o in spec_opts]}")
+
+                    for spec in spec_opts:
+                        outcome = await self._scrape_combo(
+                            page, frame, sem, section, degree, dept, spec, stats,
+                            verify=degrees_cached or depts_cached or specs_cached,
+                        )
+                        if outcome == "stop":
+                            break   # ← stop remaining specs for this dept immediately
 
-                            # ── Success ────────────────────────────────────
-                            self._save({
-                                "scraped_at": datetime.now().isoformat(),
-                                "fin_year":   self.fin_year,
-                                "semester":   sem,
-                                "section":    section,
-                                "department": dept["text"],
-                                "degree":     degree["text"],
-                                "spec":       spec["text"],
-                                "timetable":  timetable,
-                            })
-                            stats["saved"] += 1
-                            save_counter  += 1
+    async def _scrape_combo(self, page, frame, sem, section, degree: dict, dept: dict, spec: dict,
+                            stats: dict, verify: bool = False) -> str:
+        """
+        Scrape and save one combination. Returns "done" (resumed), "collapsed",
+        "saved", "empty", or "stop" when the blacklist says to give up on this
+        dept × degree. verify=True checks the selection against the live form
+        and raises _StaleOptionTree when a cached option was rejected.
+        """
+        stats["total"] += 1
+        tag = (f"Sem{sem} Sec{section} | "
+               f"{dept['text']} / {degree['text']} / {spec['text']}")
+
+        # Resume support
+        if self._is_done(sem, section,
+                         dept["text"], degree["text"], spec["text"]):
+            print(f"            ⏭️  Cached: {tag}")
+            stats["skipped"] += 1
+            return "done"
+
+        # Learned: this section / spec returns the same timetable
+        duplicate = self._duplicate_of(sem, section, degree["text"], dept["text"], spec["text"])
+        if duplicate:
+            dimension, member, timetable = duplicate
+            print(f"            🪞  Same as {dimension} {member}: {tag}")
+            self._save({
+                "scraped_at":     datetime.now().isoformat(),
+                "fin_year":       self.fin_year,
+                "semester":       sem,
+                "section":        section,
+                "department":     dept["text"],
+                "degree":         degree["text"],
+                "spec":           spec["text"],
+                "timetable":      timetable,
+                "collapsed_from": {dimension: member},
+            })
+            stats["collapsed"] += 1
+            return "collapsed"
+
+        print(f"            🔄  {tag}")
+        combo_start = time.perf_counter()
+        laps = self.timing.laps()
+
+        # ── Selection: only dropdowns that differ ──────
+        wanted = [
+            ("sem",     str(sem),        400),
+            ("section", str(section),    0),
+            ("degree",  degree["value"], 400),
+            ("dept",    dept["value"],   500),
+        ]
+        if spec["value"]:
+            wanted.append(("spec", spec["value"], 0))
+        wanted.append(("day", "All", 0))
+        # Options planned from the cache are checked against the live form
+        stale = await self._ensure_selected(frame, wanted, stats, verify=verify)
+        laps.lap("select")
+        if stale:
+            stats["total"] -= 1   # re-attempted after the live re-read
+            raise _StaleOptionTree(stale, {
+                "degree": (sem,),
+                "dept":   (sem, degree["value"]),
+                "spec":   (sem, degree["value"], dept["value"]),
+            }[stale])
+
+        # ── Go ─────────────────────────────────────────
+        loaded, result_frame = await self._click_go_and_wait(page, frame)
+        laps.skip()   # phases recorded inside _click_go_and_wait
+
+        if not loaded:
+            print(f"            ⚠️  No timetable loaded.")
+            stats["empty"] += 1
+            if self.blacklist.record_failure(dept["text"], degree["text"]):
+                return "stop"   # ← caller stops remaining specs for this dept
+            return "empty"
 
-                            # Update heuristics
-                            self.cache.record_success(
-                                dept["text"], degree["text"], spec["text"]
-                            )
-                            self.blacklist.record_success(dept["text"], degree["text"])
+        await self._bypass(page)
+        laps.lap("bypass")
+        # Parse from whichever frame the table appeared in
+        timetable = await self._parse_timetable(result_frame)
+        laps.lap("extract")
+
+        if not timetable:
+            print(f"            ⚠️  Parser found nothing.")
+            stats["empty"] += 1
+            if self.blacklist.record_failure(dept["text"], degree["text"]):
+                return "stop"   # ← caller stops remaining specs for this dept
+            return "empty"
+
+        # ── Success ────────────────────────────────────
+        self._save({
+            "scraped_at": datetime.now().isoformat(),
+            "fin_year":   self.fin_year,
+            "semester":   sem,
+            "section":    section,
+            "department": dept["text"],
+            "degree":     degree["text"],
+            "spec":       spec["text"],
+            "timetable":  timetable,
+        })
+        stats["saved"] += 1
+        self.timing.record("saved_combo_total", time.perf_counter() - combo_start)
+
+        # Update heuristics
+        self.cache.record_success(
+            dept["text"], degree["text"], spec["text"]
+        )
+        self._learn_duplicates(sem, section, degree["text"], dept["text"],
+                               spec["text"], timetable)
+        self.blacklist.record_success(dept["text"], degree["text"])
 
-                            # Periodic cache flush (every 10 successes)
-                            if save_counter % 10 == 0:
-                                self.cache.save()
+        # Periodic cache flush (every 10 successes)
+        if stats["saved"] % 10 == 0:
+            self.cache.save()
 
-                            await page.wait_for_timeout(200)
-
-        return stats
+        await self.pacing.pause()
+        return "saved"
 
     # ── Public entry point ───────────────────────────────────────────────────
-    async def run(self, headless=False):
+    async def run(self, headless=False, block_resources=True, refresh_options=False,
+                  concurrency=1, shard_by="sem", rescrape_older_than_hours=None, store="json",
+                  planned=False, budget=None, time_limit_s=None, dry_run=False):
+        """
+        concurrency: number of pages (same logged-in context) crawling shards in parallel
+        shard_by:    "sem" (one shard per semester) or "section" (per semester × section)
+        rescrape_older_than_hours: re-scrape combinations saved longer ago than this
+                                   (None = every saved combination is kept)
+        store:       "json" (one file per combination), "sqlite" (one row per slot in
+                     ~/ims_scraper_outputs/classes.sqlite) or "both"
+        planned:     plan every combination first and scrape them by expected yield
+                     (implied by budget / time_limit_s / dry_run)
+        budget:      stop after this many portal requests
+        time_limit_s: stop taking new combinations after this many seconds
+        dry_run:     print the plan (request count, expected timetables, ETA) and stop
+        """
+        planned = planned or dry_run or budget is not None or time_limit_s is not None
+        self.store = store
+        self.slot_store = ClassSlotStore() if store in ("sqlite", "both") else None
+        self.manifest = ClassManifest(self.fin_year, max_age_hours=rescrape_older_than_hours)
+        if not len(self.manifest):
+            self.manifest.import_directory(self.output_dir)
+
         print("\n" + "=" * 60)
         print("🚀  IMS CLASS TIMETABLE SCRAPER  (constraint-driven)")
         print("=" * 60 + "\n")
@@ -702,6 +1394,11 @@ class ClassTimetableScraper:
             await context.add_init_script(
                 "Object.defineProperty(navigator,'webdriver',{get:()=>undefined});"
             )
+            await self._install_table_watch(context)
+            # Skip images / CSS / fonts / analytics on every Go
+            self.resource_policy = ResourcePolicy() if block_resources else None
+            if self.resource_policy:
+                await self.resource_policy.install(context)
             page = await context.new_page()
 
             try:
@@ -721,10 +1418,27 @@ class ClassTimetableScraper:
                     print("❌  Cannot find sem or degree dropdown. Exiting.")
                     return
 
-                stats = await self._scrape_all(page, frame)
+                if refresh_options:
+                    self.option_tree.clear()
+                shard_count = len(self.target_sems) * (len(self.target_sections) if shard_by == "section" else 1)
+                if dry_run:
+                    plan = await self._plan(frame, self._new_stats())
+                    self._print_plan(plan, concurrency, budget, time_limit_s)
+                    self.option_tree.save()
+                    return
+                if planned:
+                    workers = await self._open_shard_workers(page, frame, concurrency)
+                    self.pacing.max_workers = len(workers)
+                    self.pacing.workers = len(workers)
+                    stats = await self._scrape_planned(workers, budget, time_limit_s)
+                else:
+                    workers = await self._open_shard_workers(page, frame, min(concurrency, shard_count))
+                    self.pacing.workers = len(workers)
+                    stats = await self._scrape_all(page, frame, workers=workers, shard_by=shard_by)
 
                 # Final cache flush
                 self.cache.save(force=True)
+                self.option_tree.save()
 
                 # ── Summary ──────────────────────────────────────────────
                 print("\n" + "=" * 60)
@@ -735,22 +1449,51 @@ class ClassTimetableScraper:
                 print(f"    Resumed from cache     : {stats['skipped']}")
                 print(f"    Dept combos pruned     : {stats['pruned_dept']}")
                 print(f"    Spec combos pruned     : {stats['pruned_spec']}")
+                print(f"    Duplicates collapsed   : {stats['collapsed']}  (section / spec made no difference)")
+                if stats.get("failed_shards"):
+                    failed = ", ".join(f"Sem{f['sem']} Sec{'/'.join(map(str, f['sections']))}"
+                                       for f in stats["failed_shards"])
+                    print(f"    Failed shards          : {len(stats['failed_shards'])}  ({failed}; re-run to retry)")
+                print(f"    Dropdown changes       : {stats['selects_issued']} issued, "
+                      f"{stats['selects_skipped']} skipped (already set)")
                 total_pruned = stats["pruned_dept"] + stats["pruned_spec"]
                 total_attempted = stats["total"] + total_pruned
                 if total_attempted:
                     pct = 100 * total_pruned / total_attempted
                     print(f"    Reduction              : {pct:.1f}%  "
                           f"({total_pruned} of {total_attempted} skipped before request)")
-                print(f"    Output dir             : {self.output_dir}")
+                if self.store != "sqlite":
+                    print(f"    Output dir             : {self.output_dir}")
+                if self.slot_store is not None:
+                    print(f"    Slot store             : {self.slot_store.path}")
+                print(f"    Manifest               : {len(self.manifest)} combinations ({self.manifest.path})")
                 print(f"    Heuristics cache       : {self.cache.path}")
+                print(f"    Option-tree cache      : {self.option_tree.hits} branches cached, "
+                      f"{self.option_tree.misses} read live  ({self.option_tree.path})")
+                if self.resource_policy:
+                    await self.resource_policy.flush()
+                    net = self.resource_policy.stats()
+                    saved = f"  (~{net['bytes_saved'] / 1024:.0f} KB saved)" if net["bytes_saved"] is not None else ""
+                    print(f"    Requests blocked       : {net['blocked_requests']} "
+                          f"of {net['blocked_requests'] + net['allowed_requests']}" + saved)
+                pace = self.pacing.stats()
+                print(f"    Pacing                 : latency~{pace['latency_ewma_s']}s  "
+                      f"timeouts {pace['counts'].get('timeout', 0)}  "
+                      f"delay {pace['delay_s'] * 1000:.0f} ms  Go timeout {pace['timeout_s']}s")
                 print("=" * 60 + "\n")
+                self.timing.print_summary()
 
             except Exception as e:
                 print(f"\n❌  FATAL: {e}")
                 import traceback
                 traceback.print_exc()
                 self.cache.save(force=True)   # Always persist learning on crash
+                self.option_tree.save()
             finally:
+                self.timing.write()
+                self.manifest.close()
+                if self.slot_store is not None:
+                    self.slot_store.close()
                 if not headless:
                     print("🔍  Browser open. Close window or Ctrl+C to exit.")
                     await page.pause()
@@ -761,12 +1504,29 @@ class ClassTimetableScraper:
 # ─────────────────────────────────────────────────────────────────────────────
 
 async def main():
+    parser = argparse.ArgumentParser(description="IMS NSIT class timetable scraper.")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="pages crawling in parallel")
+    parser.add_argument("--budget", type=int, default=None,
+                        help="scrape by expected yield and stop after N portal requests")
+    parser.add_argument("--time-limit", type=float, default=None, metavar="MINUTES",
+                        help="scrape by expected yield and stop after this many minutes")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the planned request count and ETA, then exit")
+    args = parser.parse_args()
+
     scraper = ClassTimetableScraper(
         user_id="2022UIT3042",
         password="vogsue-7",
         fin_year="2025-26",
     )
-    await scraper.run(headless=False)
+    await scraper.run(
+        headless=False,
+        concurrency=args.concurrency,
+        budget=args.budget,
+        time_limit_s=args.time_limit * 60 if args.time_limit is not None else None,
+        dry_run=args.dry_run,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+"""
+faculty_resolver.py  ─  Offline fuzzy resolution of faculty names to catalog codes.
+
+The Excel list spells faculty names its own way ("Anita Sharma", "Dr Sharma
+Anita", "PROF. A. SHARMA") while the Pick Faculty popup lists "DR. ANITA
+SHARMA; F001". Instead of `in` substring checks on popup links (and a silent
+click on the first link when they fail), FacultyResolver indexes the crawled
+faculty catalog (storage.CatalogCache) once:
+
+  • names are normalised (heuristics.normalize) and titles such as DR / PROF /
+    MS are dropped;
+  • every word is cut into padded character trigrams ("$AN", "ANI", ...,
+    "TA$"), so word order and small spelling differences cost little;
+  • an inverted index maps each trigram to the catalog entries containing it,
+    and a query only scores entries that share at least one trigram
+    (Dice coefficient over the two trigram sets).
+
+A resolution is confident when its score reaches `threshold` and beats the
+best entry with another code by at least `margin` (or is the only perfect
+score, e.g. the same words in another order). Everything else is listed
+before any browser work starts and left to the Picker popup.
+
+Usage
+─────
+    resolver = FacultyResolver(catalog)           # [{code, name}, ...]
+    results = resolver.resolve_all(excel_names)
+    resolver.print_report(results)
+    codes = {r["query"]: r for r in results if r["confident"]}
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from heuristics import normalize
+
+# Titles and honorifics that say nothing about who the faculty is
+_TITLES = frozenset({"DR", "PROF", "PROFESSOR", "MR", "MRS", "MS", "MISS", "SH", "SHRI", "SMT", "ER"})
+
+
+def name_key(name: str) -> str:
+    """Comparable form of a faculty name: normalised, without titles or the '; CODE' suffix."""
+    name = name.split(";")[0]
+    return " ".join(w for w in normalize(name).split() if w not in _TITLES)
+
+
+def trigrams(key: str) -> set[str]:
+    """Padded character trigrams of every word of `key` ("ANITA" → $AN ANI NIT ITA TA$)."""
+    grams = set()
+    for word in key.split():
+        padded = f"${word}$"
+        if len(padded) < 3:
+            continue
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class FacultyResolver:
+    """Character-trigram inverted index over the faculty catalog, with Dice scoring."""
+
+    def __init__(self, catalog: Iterable[dict], threshold: float = 0.6, margin: float = 0.1):
+        self.threshold = threshold
+        self.margin    = margin
+        self.entries: list[dict] = []
+        self._grams:  list[set[str]] = []
+        self._index:  dict[str, list[int]] = defaultdict(list)
+        self._exact:  dict[str, Optional[int]] = {}
+
+        for entry in catalog:
+            key = name_key(entry.get("name", ""))
+            if not key:
+                continue
+            idx = len(self.entries)
+            grams = trigrams(key)
+            self.entries.append(entry)
+            self._grams.append(grams)
+            if key in self._exact and self._exact[key] is not None \
+                    and self.entries[self._exact[key]].get("code") != entry.get("code"):
+                self._exact[key] = None    # namesakes: only scoring can flag the tie
+            else:
+                self._exact.setdefault(key, idx)
+            for gram in grams:
+                self._index[gram].append(idx)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ── Resolution ───────────────────────────────────────────────────────────
+
+    def resolve(self, name: str) -> dict:
+        """
+        Best catalog entry for `name`:
+
+            {"query": name, "code": "F001" | None, "name": "DR. ANITA SHARMA" | None,
+             "score": 0.0-1.0, "runner_up": {"code", "name", "score"} | None,
+             "confident": bool}
+        """
+        key = name_key(name)
+        if self._exact.get(key) is not None:
+            entry = self.entries[self._exact[key]]
+            return {"query": name, "code": entry.get("code"), "name": entry.get("name"),
+                    "score": 1.0, "runner_up": None, "confident": True}
+
+        query = trigrams(key)
+        shared = Counter()
+        for gram in query:
+            for idx in self._index.get(gram, ()):
+                shared[idx] += 1
+
+        scored = sorted(
+            ((2 * n / (len(query) + len(self._grams[idx])), idx) for idx, n in shared.items()),
+            reverse=True,
+        )
+        if not scored:
+            return {"query": name, "code": None, "name": None,
+                    "score": 0.0, "runner_up": None, "confident": False}
+
+        best_score, best_idx = scored[0]
+        best = self.entries[best_idx]
+        runner_up = None
+        for score, idx in scored[1:]:
+            if self.entries[idx].get("code") != best.get("code"):
+                other = self.entries[idx]
+                runner_up = {"code": other.get("code"), "name": other.get("name"), "score": round(score, 3)}
+                break
+        gap = best_score - (runner_up["score"] if runner_up else 0.0)
+        unique_perfect = best_score == 1.0 and gap > 0   # same words, another order
+        return {
+            "query":     name,
+            "code":      best.get("code"),
+            "name":      best.get("name"),
+            "score":     round(best_score, 3),
+            "runner_up": runner_up,
+            "confident": unique_perfect or (best_score >= self.threshold and gap >= self.margin),
+        }
+
+    def resolve_all(self, names: Iterable[str]) -> list[dict]:
+        return [self.resolve(name) for name in names]
+
+    def lookup(self, name: str) -> Optional[dict]:
+        """The catalog entry for `name` when confidently resolved, else None."""
+        result = self.resolve(name)
+        if not result["confident"]:
+            return None
+        return {"code": result["code"], "name": result["name"]}
+
+    # ── Reporting ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def print_report(results: list[dict]):
+        """One summary line, then every low-confidence name with its best guesses."""
+        weak = [r for r in results if not r["confident"]]
+        print(f"🔤 Faculty names resolved: {len(results) - len(weak)}/{len(results)} confident")
+        for r in weak:
+            guess = f"{r['name']} ({r['code']}, {r['score']:.2f})" if r["code"] else "no candidate"
+            line = f"   ⚠️  {r['query']!r} → {guess}"
+            if r["runner_up"]:
+                ru = r["runner_up"]
+                line += f"  vs {ru['name']} ({ru['code']}, {ru['score']:.2f})"
+            print(line)
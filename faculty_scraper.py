@@ -5,15 +5,97 @@ Scrapes availability data for faculties by iterating through names from Excel
 
 import asyncio
 from playwright.async_api import async_playwright
-import json
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 import re
 import pandas as pd
+import time
+
+from faculty_resolver import FacultyResolver, name_key
+from pacing import PacingController
+from phase_timing import PhaseTimer
+from resource_policy import ResourcePolicy
+from storage import CatalogCache, NdjsonWriter, write_json_document
+from timetable_parser import EMPTY_RESULT_PATTERN, parse_faculty_timetable
+from worker_pages import open_worker_pages
 
 load_dotenv()
 
+# Every link of a Picker popup frame in one evaluate
+_PICKER_LINKS_JS = """
+    () => Array.from(document.querySelectorAll('a')).map(a => ({
+        text: (a.innerText || '').trim(),
+        href: a.getAttribute('href') || ''
+    }))
+"""
+
+# What the Picker's SetVal(code, name) does to the faculty form. False when this
+# frame has no faculty form; throws when it has only one of the two fields, so the
+# caller falls back to the Picker instead of submitting a half-filled form.
+_SET_FACULTY_JS = """
+    ({code, name}) => {
+        const hidden = document.getElementById('txtfaccode') || document.querySelector('input[name="faccode"]');
+        const visible = document.getElementById('txtfaculty') || document.querySelector('input[name="faculty"]');
+        if (!hidden && !visible) return false;
+        if (!hidden || !visible)
+            throw new Error('faculty form field not found: ' + (hidden ? 'txtfaculty' : 'txtfaccode'));
+        hidden.value = code;
+        visible.value = name;
+        return true;
+    }
+"""
+
+# Before Proceed: the previous faculty's table and this document's "No Record
+# Found" must not be read as the answer
+_MARK_STALE_JS = """
+    () => {
+        document.querySelectorAll('table').forEach(t => {
+            if (t.querySelector('.plum_fieldbig') || (t.innerText || '').includes('T1'))
+                t.setAttribute('data-stale', '1');
+        });
+        document.documentElement.setAttribute('data-stale', '1');
+    }
+"""
+
+# Same readiness rule as the room scraper's wait: a fresh (non-stale) timetable
+# whose day rows are in, in a fully parsed document. 'empty' for a new document
+# that carries the portal's no-record message.
+_FRESH_FACULTY_TABLE_JS = """
+    (emptyPattern) => {
+        if (document.readyState !== 'complete') return false;
+        for (const table of document.querySelectorAll('table')) {
+            if (table.getAttribute('data-stale') === '1') continue;
+            const text = table.innerText || '';
+            const isGrid = (table.querySelector('.plum_fieldbig') && table.querySelectorAll('tr').length > 2)
+                || (text.includes('T1') && text.includes('T2'));
+            if (isGrid && /Mon|Tue|Wed|Thu|Fri|Sat/i.test(text)) return true;
+        }
+        const root = document.documentElement;
+        if (root && root.getAttribute('data-stale') !== '1' && document.body
+            && new RegExp(emptyPattern, 'i').test(document.body.innerText || ''))
+            return 'empty';
+        return false;
+    }
+"""
+
+# Usually: javascript:SetVal('F001','DR. ANITA SHARMA') with text "DR. ANITA SHARMA; F001"
+_PICKER_ARGS_RE = re.compile(r"['\"]([^'\"]+)['\"]\s*,\s*['\"]([^'\"]+)['\"]")
+
+
+def _parse_picker_link(text: str, href: str):
+    """{code, name} of one Picker popup link, or None for Search / Close / Logout"""
+    text = (text or '').strip()
+    if not text or text.upper() in ('SEARCH', 'CLOSE', 'LOGOUT'):
+        return None
+    match = _PICKER_ARGS_RE.search(href or '')
+    if match:
+        return {'code': match.group(1).strip(), 'name': match.group(2).strip()}
+    name, _, code = text.partition(';')
+    if code.strip():
+        return {'code': code.strip(), 'name': name.strip()}
+    return None
+
 
 class FacultyTimetableScraper:
     def __init__(self, user_id: str = None, password: str = None, fin_year: str = "2025-26"):
@@ -26,6 +108,21 @@ class FacultyTimetableScraper:
         self.excel_path = "/Users/vasugoel/Downloads/Faculty Details.xlsx"
         self.faculty_names = self.load_faculties_from_excel(self.excel_path)
         
+        # Adaptive delay between faculties and Proceed timeout (see pacing.py)
+        self.pacing = PacingController(base_delay_s=0.6, timeout_s=10.0)
+        
+        # Per-phase durations of every faculty scrape (see phase_timing.py)
+        self.timing = PhaseTimer("faculty")
+        
+        # Faculty name → {code, name} crawled once from the Picker popup (see get_faculty_catalog),
+        # keyed by faculty_resolver.name_key of the Excel name for confident resolutions only
+        self.faculty_catalog = CatalogCache(fin_year, "faculties")
+        self.faculty_codes = {}
+        # Cleared when the form lacks the code or name field: every faculty then goes through the Picker
+        self.direct_fill = True
+        # Searches whose hits are merged when the popup lists nothing until searched
+        self.catalog_search_terms = ("A", "E", "I", "O", "U", "Y")
+        
     def load_faculties_from_excel(self, file_path):
         """Load faculty names from the provided Excel file"""
         print(f"📊 Loading faculty details from {file_path}...")
@@ -195,11 +292,210 @@ class FacultyTimetableScraper:
         await self.bypass_all_protections(page)
         return True
 
+    async def _find_faculty_picker(self, page):
+        """Return (frame, picker link) of the faculty form, or (None, None)"""
+        for frame in [page] + page.frames:
+            try:
+                pick_faculty_btn = await frame.query_selector('img[title="Picker"]') or \
+                                  await frame.query_selector('text="Pick Faculty"') or \
+                                  await frame.query_selector('a:has-text("Pick")')
+                if pick_faculty_btn:
+                    if await pick_faculty_btn.evaluate('el => el.tagName === "IMG"'):
+                        parent = await pick_faculty_btn.query_selector('xpath=..')
+                        if parent: pick_faculty_btn = parent
+                    return frame, pick_faculty_btn
+            except: continue
+        return None, None
+    
+    async def _collect_picker_links(self, popup_page, faculties: dict):
+        """Add every faculty link of the popup (all frames, one evaluate each) to faculties[code]"""
+        for p_frame in popup_page.frames:
+            try:
+                links = await p_frame.evaluate(_PICKER_LINKS_JS)
+            except Exception:
+                continue
+            for link in links:
+                entry = _parse_picker_link(link['text'], link['href'])
+                if entry:
+                    faculties.setdefault(entry['code'], entry)
+    
+    async def _search_popup(self, popup_page, term: str):
+        """Submit one search in the Picker popup and wait for its results"""
+        f_target = popup_page
+        for pf in popup_page.frames:
+            if await pf.query_selector('input[name="search"]'):
+                f_target = pf
+                break
+        await f_target.fill('input[name="search"]', term)
+        try:
+            async with f_target.expect_navigation(timeout=self.pacing.timeout_ms):
+                await f_target.click('input[name="proceed"], input[value="Search"]')
+        except Exception:
+            # Results rendered without a page load
+            await f_target.wait_for_timeout(self.pacing.settle_ms(1500))
+    
+    async def get_faculty_catalog(self, page, refresh: bool = False):
+        """
+        Crawl the 'Pick Faculty' popup once into a {code, name} list.
+        The result is cached on disk (see storage.CatalogCache); the popup is
+        only opened when the cache is stale or refresh=True. When the popup lists
+        nothing until searched, the hits of catalog_search_terms are merged.
+        """
+        print("\n🔍 Building the faculty code index...")
+        if not refresh:
+            cached = self.faculty_catalog.load()
+            if cached:
+                return cached
+        
+        _, pick_faculty_btn = await self._find_faculty_picker(page)
+        if not pick_faculty_btn:
+            print("⚠️  Could not find 'Pick Faculty' button; faculties will be picked one by one.")
+            return []
+        
+        faculties = {}
+        popup_page = None
+        try:
+            async with page.expect_popup(timeout=10000) as popup_info:
+                await pick_faculty_btn.click()
+            popup_page = await popup_info.value
+            await popup_page.wait_for_load_state('domcontentloaded')
+            
+            await self._collect_picker_links(popup_page, faculties)
+            if not faculties:
+                for term in self.catalog_search_terms:
+                    before = len(faculties)
+                    await self._search_popup(popup_page, term)
+                    await self._collect_picker_links(popup_page, faculties)
+                    print(f"   🔎 '{term}': {len(faculties) - before} new ({len(faculties)} total)")
+        except Exception as e:
+            print(f"⚠️  Error crawling faculty popup: {e}")
+            return []
+        finally:
+            if popup_page and not popup_page.is_closed():
+                await popup_page.close()
+        
+        faculties = sorted(faculties.values(), key=lambda f: f['name'])
+        print(f"   ✓ Indexed {len(faculties)} faculties.")
+        self.faculty_catalog.save(faculties)
+        return faculties
+    
+    def resolve_faculty_names(self, catalog: list[dict]):
+        """
+        Resolve every Excel name against the catalog offline (see faculty_resolver.py)
+        and report the low-confidence ones; only confident names skip the popup.
+        """
+        started = time.perf_counter()
+        resolver = FacultyResolver(catalog)
+        results = resolver.resolve_all(n.split(';')[0].strip() for n in self.faculty_names)
+        self.faculty_codes = {
+            name_key(r['query']): {'code': r['code'], 'name': r['name']}
+            for r in results if r['confident']
+        }
+        resolver.print_report(results)
+        print(f"   ({len(results)} names against {len(resolver)} faculties in "
+              f"{(time.perf_counter() - started) * 1000:.0f} ms; the rest are picked in the popup)")
+        return results
+    
+    async def _fill_faculty_from_catalog(self, page, entry: dict):
+        """Set the faculty code and name directly; returns the form frame, or None to use the popup"""
+        if not self.direct_fill:
+            return None
+        for frame in [page] + page.frames:
+            try:
+                if await frame.evaluate(_SET_FACULTY_JS, entry):
+                    return frame
+            except Exception as e:
+                if 'faculty form field not found' in str(e):
+                    print(f"      ⚠️  {str(e).splitlines()[0]} — using the Picker popup from now on")
+                    self.direct_fill = False
+                    return None
+                continue  # frame mid-navigation
+        return None
+    
+    async def _popup_of(self, page):
+        """The newest open popup whose opener is `page` (never another worker's popup)"""
+        for other in reversed(page.context.pages):
+            if other is not page and not other.is_closed() and await other.opener() is page:
+                return other
+        return None
+    
+    async def _pick_faculty_in_popup(self, page, pick_faculty_btn, fac_text: str, laps) -> bool:
+        """Open the Picker popup, search for fac_text and click its link; True once picked"""
+        popup_page = None
+        try:
+            # page.expect_popup only sees windows opened by this page, so parallel
+            # workers never pick up each other's popup
+            async with page.expect_popup(timeout=10000) as popup_info:
+                await pick_faculty_btn.click()
+            popup_page = await popup_info.value
+        except Exception as e:
+            popup_page = await self._popup_of(page)
+            if popup_page is None:
+                print(f"      ⚠️  Popup failed to open: {e}")
+                return False
+        
+        await popup_page.wait_for_load_state('networkidle')
+        await popup_page.wait_for_timeout(1000)
+        laps.lap("popup_open")
+        
+        # Input search string into popup
+        try:
+            # Try finding frame inside popup if any
+            f_target = popup_page
+            for pf in popup_page.frames:
+                if await pf.query_selector('input[name="search"]'):
+                    f_target = pf
+                    break
+                    
+            await f_target.fill('input[name="search"]', fac_text)
+            await f_target.click('input[name="proceed"], input[value="Search"]')
+            
+            # Wait for search results
+            await f_target.wait_for_timeout(self.pacing.settle_ms(1500))
+            laps.lap("search")
+            
+            # Click the link the resolver matches confidently — never a substring
+            # hit or the first link, which could save another faculty's timetable
+            candidates = []
+            for link in await f_target.query_selector_all('a'):
+                txt = (await link.inner_text()).strip()
+                if txt and txt.upper() not in ['SEARCH', 'CLOSE', 'LOGOUT']:
+                    candidates.append((link, {'code': len(candidates), 'name': txt}))
+            best = FacultyResolver([entry for _, entry in candidates]).lookup(fac_text) if candidates else None
+            if best is None:
+                if candidates:
+                    print(f"      ⚠️  No confident match for {fac_text} among {len(candidates)} popup links")
+                else:
+                    print(f"      ⚠️  No matching records found for {fac_text} in popup")
+                await popup_page.close()
+                return False
+            await candidates[best['code']][0].click()
+                
+            # Wait for popup to close and main page to receive values
+            for _ in range(10):
+                if popup_page.is_closed():
+                    break
+                await asyncio.sleep(0.5)
+                
+            if not popup_page.is_closed():
+                await popup_page.close()
+            laps.lap("pick_result")
+            return True
+                
+        except Exception as e:
+            print(f"      ⚠️  Error processing popup: {e}")
+            if not popup_page.is_closed():
+                await popup_page.close()
+            return False
+
     async def scrape_faculty_timetable(self, page, faculty_name: str, semester: str = "EVEN"):
         """
-        Scrape timetable for a specific faculty by searching in the popup
+        Scrape timetable for a specific faculty.
+        A faculty found in the code index (see get_faculty_catalog) is filled in
+        directly; any other is searched for in the Picker popup.
         """
         fac_text = faculty_name.upper().strip()
+        laps = self.timing.laps()
         
         try:
             target_frame = page
@@ -211,194 +507,65 @@ class FacultyTimetableScraper:
                     target_frame = frame
                     break
                 except: pass
+            laps.lap("semester_select")
             
-            # Find the pick faculty button and trigger popup
-            pick_faculty_btn = None
-            for frame in [page] + page.frames:
-                try:
-                    pick_faculty_btn = await frame.query_selector('img[title="Picker"]') or \
-                                      await frame.query_selector('text="Pick Faculty"') or \
-                                      await frame.query_selector('a:has-text("Pick")')
-                    if pick_faculty_btn:
-                        if await pick_faculty_btn.evaluate('el => el.tagName === "IMG"'):
-                            parent = await pick_faculty_btn.query_selector('xpath=..')
-                            if parent: pick_faculty_btn = parent
-                        
-                        target_frame = frame
-                        break
-                except: continue
-                
-            if not pick_faculty_btn:
-                print(f"⚠️  Could not find 'Pick Faculty' button for {fac_text}")
-                return None
-                
-            # Trigger popup
-            popup_page = None
-            try:
-                # Wait for any previous popups to close if necessary
-                async with page.context.expect_event("popup", timeout=10000) as popup_info:
-                    await pick_faculty_btn.click()
-                popup_page = await popup_info.value
-            except Exception as e:
-                if len(page.context.pages) > 1:
-                    popup_page = page.context.pages[-1]
-                else:
-                    print(f"      ⚠️  Popup failed to open: {e}")
+            entry = self.faculty_codes.get(name_key(fac_text))
+            form_frame = await self._fill_faculty_from_catalog(page, entry) if entry else None
+            if form_frame is not None:
+                target_frame = form_frame
+                laps.lap("field_fill")
+            else:
+                # Find the pick faculty button and trigger popup
+                frame, pick_faculty_btn = await self._find_faculty_picker(page)
+                if not pick_faculty_btn:
+                    print(f"⚠️  Could not find 'Pick Faculty' button for {fac_text}")
                     return None
-            
-            await popup_page.wait_for_load_state('networkidle')
-            await popup_page.wait_for_timeout(1000)
-            
-            # Input search string into popup
-            try:
-                # Try finding frame inside popup if any
-                f_target = popup_page
-                for pf in popup_page.frames:
-                    if await pf.query_selector('input[name="search"]'):
-                        f_target = pf
-                        break
-                        
-                await f_target.fill('input[name="search"]', fac_text)
-                await f_target.click('input[name="proceed"], input[value="Search"]')
+                target_frame = frame
+                laps.lap("frame_discovery")
                 
-                # Wait for search results
-                await f_target.wait_for_timeout(1500)
-                
-                # Click the first a-tag result (skipping Search, Close, Logout)
-                links = await f_target.query_selector_all('a')
-                clicked = False
-                for link in links:
-                    txt = (await link.inner_text()).strip().upper()
-                    if txt and txt not in ['SEARCH', 'CLOSE', 'LOGOUT'] and 'EXT' not in txt and 'T2' not in txt:
-                        clean_txt = txt.split(';')[0].strip()
-                        if fac_text in clean_txt or clean_txt in fac_text:
-                            await link.click()
-                            clicked = True
-                            break
-                            
-                # Fallback purely to first available
-                if not clicked and links:
-                    for link in links:
-                        txt = (await link.inner_text()).strip()
-                        if txt and txt not in ['Search', 'Close', 'Logout']:
-                            await link.click()
-                            clicked = True
-                            break
-                            
-                if not clicked:
-                    print(f"      ⚠️  No matching records found for {fac_text} in popup")
-                    await popup_page.close()
+                if not await self._pick_faculty_in_popup(page, pick_faculty_btn, fac_text, laps):
                     return None
-                    
-                # Wait for popup to close and main page to receive values
-                for _ in range(10):
-                    if popup_page.is_closed():
-                        break
-                    await asyncio.sleep(0.5)
-                    
-                if not popup_page.is_closed():
-                    await popup_page.close()
-                    
-            except Exception as e:
-                print(f"      ⚠️  Error processing popup: {e}")
-                if not popup_page.is_closed():
-                    await popup_page.close()
-                return None
-
             # Click Proceed button on main page
             try:
                 proceed_btn = await target_frame.query_selector('input[value="Proceed"]') or \
                               await target_frame.query_selector('input[value="Go"]') or \
                               await target_frame.query_selector('input[type="submit"]')
                 if proceed_btn:
+                    await target_frame.evaluate(_MARK_STALE_JS)
+                    go_time = time.monotonic()
                     await proceed_btn.click()
                 else:
                     return None
             except:
                 return None
+            laps.lap("go_click")
             
-            # Wait for Data
-            data_found = False
-            for i in range(10):
-                await asyncio.sleep(1)
-                
-                table_check = await target_frame.evaluate("""
-                    () => {
-                        const tables = document.querySelectorAll('table');
-                        for (const table of tables) {
-                            const hasPlumField = table.querySelector('.plum_fieldbig');
-                            const rows = table.querySelectorAll('tr');
-                            if (hasPlumField && rows.length > 2) return true;
-                            if (table.innerText.includes('T1') && table.innerText.includes('T2')) return true;
-                        }
-                        return false;
-                    }
-                """)
-                
-                if table_check:
-                    data_found = True
-                    await asyncio.sleep(5)
-                    break
+            # Wait for Data: the table with its day rows, or the portal's no-record answer
+            try:
+                handle = await target_frame.wait_for_function(
+                    _FRESH_FACULTY_TABLE_JS, arg=EMPTY_RESULT_PATTERN,
+                    polling=100, timeout=self.pacing.timeout_ms
+                )
+                outcome = await handle.json_value()
+            except Exception:
+                outcome = None
             
-            if not data_found:
+            laps.lap("wait")
+            if outcome is None:
+                self.pacing.record_timeout()
+                return None
+            self.pacing.record_success(time.monotonic() - go_time)
+            if outcome == 'empty':
+                print(f"      📭 No record for {fac_text}")
                 return None
             
             await self.bypass_all_protections(page)
+            laps.lap("bypass")
             
-            # Extract timetable data
-            timetable_data = await target_frame.evaluate(f"""
-                () => {{
-                    const data = {{
-                        faculty: "{fac_text}",
-                        semester: "{semester}",
-                        schedule: {{}}
-                    }};
-                    
-                    let table = null;
-                    const tables = document.querySelectorAll('table');
-                    for (const t of tables) {{
-                        const txt = t.innerText;
-                        if (txt.includes('T1') || txt.includes('T2') || t.querySelector('.plum_fieldbig')) {{
-                            table = t;
-                            break;
-                        }}
-                    }}
-                    
-                    if (!table) return null;
-                    
-                    const rows = Array.from(table.querySelectorAll('tr'));
-                    const headerRow = rows.find(r => r.innerText.includes('T1') || r.innerText.includes('T2'));
-                    if (!headerRow) return null;
-                    
-                    const timeSlots = [];
-                    headerRow.querySelectorAll('td, th').forEach((cell, idx) => {{
-                        if (idx > 0) timeSlots.push(cell.textContent.trim());
-                    }});
-                    
-                    const bodyRows = rows.filter(r => 
-                        /Mon|Tue|Wed|Thu|Fri|Sat/i.test(r.innerText)
-                    );
-                    
-                    for (const row of bodyRows) {{
-                        const cells = Array.from(row.querySelectorAll('td, th'));
-                        if (cells.length === 0) continue;
-                        
-                        const day = cells[0].textContent.trim();
-                        data.schedule[day] = [];
-                        
-                        for (let j = 1; j < cells.length && (j-1) < timeSlots.length; j++) {{
-                            const cell = cells[j];
-                            const text = cell.textContent.trim().replace(/\\s+/g, ' ');
-                            data.schedule[day].push({{
-                                time_slot: timeSlots[j-1],
-                                content: text,
-                                is_occupied: text.length > 5
-                            }});
-                        }}
-                    }}
-                    return data;
-                }}
-            """)
+            # Extract timetable data (parsed in Python, see timetable_parser.py)
+            html = await target_frame.content()
+            timetable_data = parse_faculty_timetable(html, fac_text, semester)
+            laps.lap("extract")
             
             return timetable_data
                 
@@ -406,30 +573,126 @@ class FacultyTimetableScraper:
             print(f"⚠️  Error scraping faculty {fac_text}: {e}")
             return None
 
+    async def open_worker_pages(self, page, count: int):
+        """
+        Open extra pages in the logged-in context, each loaded with the faculty form.
+        All pages share the session cookies of `page.context`, so no extra login is needed.
+        Returns the list of usable pages, starting with `page` itself.
+        """
+        pages = [page]
+        if count <= 1:
+            return pages
+        
+        form_frame, _ = await self._find_faculty_picker(page)
+        if not form_frame:
+            print("⚠️  Faculty form not found on the main page. Running with a single worker.")
+            return pages
+        
+        async def ready(worker):
+            await self.bypass_all_protections(worker)
+            _, picker = await self._find_faculty_picker(worker)
+            return picker
+        
+        extra = await open_worker_pages(page, form_frame.url, count, ready, form="faculty form")
+        return pages + [worker for worker, _ in extra]
+    
+    async def _scrape_faculties_pooled(self, worker_pages: list, semester: str, output, stream_output: bool):
+        """
+        Worker pool: every page owns a faculty form (and its own Picker popups) and
+        pulls the next name from a shared queue. Only the first self.pacing.workers
+        pages take names at any time. Without streaming, records are appended to
+        `output` in Excel order once all workers are done.
+        """
+        total = len(self.faculty_names)
+        self.pacing.max_workers = min(self.pacing.max_workers, len(worker_pages))
+        self.pacing.workers = min(self.pacing.workers, self.pacing.max_workers)
+        print(f"   🧵 Using {self.pacing.workers} of {len(worker_pages)} workers for {total} faculties")
+        
+        queue = asyncio.Queue()
+        for idx, fac_name in enumerate(self.faculty_names, 1):
+            queue.put_nowait((idx, fac_name))
+        results = {}
+        
+        async def worker(worker_id, worker_page):
+            while True:
+                if not self.pacing.allows(worker_id) and not queue.empty():
+                    await asyncio.sleep(max(self.pacing.delay_s, 0.5))
+                    continue
+                try:
+                    idx, fac_name = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                fac_name_clean = fac_name.strip().split(';')[0].strip()
+                
+                with self.timing.phase("faculty_total"):
+                    fac_data = await self.scrape_faculty_timetable(worker_page, fac_name_clean, semester)
+                if fac_data:
+                    if stream_output:
+                        output.write(fac_data, key=idx)   # read back in Excel order
+                    else:
+                        results[idx] = fac_data
+                
+                status = "✓" if fac_data else "✗ (No timetable found)"
+                print(f"   [{idx}/{total}] (w{worker_id}) Faculty: {fac_name_clean}... {status}")
+                await self.pacing.pause()
+        
+        await asyncio.gather(*(worker(i, p) for i, p in enumerate(worker_pages)))
+        if not stream_output:
+            output.extend(results[idx] for idx in sorted(results))
+    
+    def output_path(self, filename):
+        home_dir = os.path.expanduser("~")
+        return os.path.join(home_dir, "ims_scraper_outputs", "faculties", filename)
+    
     async def save_data(self, fac_data, filename='faculties_data.json'):
-        """Save all scraped data"""
-        output = {
+        """
+        Save all scraped data.
+        fac_data may be a list or the NDJSON output stream; records are copied
+        into the document one at a time.
+        """
+        header = {
             'timestamp': datetime.now().isoformat(),
             'user_id': self.user_id,
             'fin_year': self.fin_year,
-            'faculties': fac_data
         }
         
-        home_dir = os.path.expanduser("~")
-        output_path = os.path.join(home_dir, "ims_scraper_outputs", "faculties", filename)
+        output_path = self.output_path(filename)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+            write_json_document(f, header, 'faculties', fac_data)
         
         print(f"💾 Data saved to {output_path}")
         return output_path
     
-    async def run(self, headless=False, semester="EVEN"):
-        """Main execution"""
+    async def run(self, headless=False, semester="EVEN", block_resources=True, stream_output=True,
+                  use_index=True, refresh_index=False, concurrency=1, max_concurrency=None):
+        """
+        Main execution
+        block_resources: skip images, stylesheets, fonts and analytics (see resource_policy.py)
+        stream_output: append each faculty to faculties_data.ndjson as soon as it is scraped
+        use_index: fill faculty codes from the crawled faculty catalog instead of
+                   opening the Picker popup per faculty (unknown names still use it)
+        refresh_index: re-crawl the Picker popup even if the faculty catalog cache is fresh
+        concurrency: number of pages (same logged-in context) scraping faculties in parallel
+        max_concurrency: upper bound the pacing controller may grow the worker count to
+                         (defaults to concurrency; it shrinks it on timeouts either way)
+        """
+        concurrency = max(1, concurrency)
+        pool_size = max(concurrency, max_concurrency or concurrency)
+        self.pacing.workers = concurrency
+        self.pacing.max_workers = pool_size
         print("\n" + "="*60)
         print("🚀 IMS FACULTY TIMETABLE SCRAPER")
         print("="*60 + "\n")
+        
+        # With a fresh catalog cache, names are resolved before the browser starts
+        resolved = False
+        if use_index and not refresh_index and self.faculty_names:
+            catalog = self.faculty_catalog.load()
+            if catalog:
+                self.resolve_faculty_names(catalog)
+                resolved = True
 
         async with async_playwright() as p:
             browser = await p.chromium.launch(
@@ -443,7 +706,13 @@ class FacultyTimetableScraper:
             )
             
             await context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined});")
+            
+            self.resource_policy = ResourcePolicy() if block_resources else None
+            if self.resource_policy:
+                await self.resource_policy.install(context)
+            
             page = await context.new_page()
+            all_faculties_data = []
             
             try:
                 success = await self.login(page)
@@ -454,26 +723,41 @@ class FacultyTimetableScraper:
                 if not self.faculty_names:
                     print("❌ No faculty names loaded from Excel. Exiting.")
                     return
+                
+                if use_index and not resolved:
+                    catalog = await self.get_faculty_catalog(page, refresh=refresh_index)
+                    if catalog:
+                        self.resolve_faculty_names(catalog)
 
-                all_faculties_data = []
+                # Records go straight to disk when streaming; the list is only used otherwise
+                if stream_output:
+                    all_faculties_data = NdjsonWriter(self.output_path('faculties_data.ndjson'))
+                    print(f"📝 Streaming faculty records to {all_faculties_data.path}")
                 print(f"\n🎯 Processing {len(self.faculty_names)} faculties from Excel (Search Workflow)...")
                 
-                for idx, fac_name in enumerate(self.faculty_names, 1):
-                    name_parts = fac_name.strip().split(';')
-                    fac_name_clean = name_parts[0].strip()
+                # Extra pages share the logged-in session; each owns its faculty form
+                worker_pages = await self.open_worker_pages(page, pool_size)
+                if len(worker_pages) > 1:
+                    await self._scrape_faculties_pooled(worker_pages, semester, all_faculties_data, stream_output)
+                else:
+                    for idx, fac_name in enumerate(self.faculty_names, 1):
+                        name_parts = fac_name.strip().split(';')
+                        fac_name_clean = name_parts[0].strip()
                     
-                    print(f"   [{idx}/{len(self.faculty_names)}] Faculty: {fac_name_clean}...", end=" ")
+                        print(f"   [{idx}/{len(self.faculty_names)}] Faculty: {fac_name_clean}...", end=" ")
                     
-                    fac_data = await self.scrape_faculty_timetable(page, fac_name_clean, semester)
-                    if fac_data:
-                        all_faculties_data.append(fac_data)
-                        print("✓")
-                    else:
-                        print("✗ (No timetable found)")
-                        
-                    await page.wait_for_timeout(300)
+                        with self.timing.phase("faculty_total"):
+                            fac_data = await self.scrape_faculty_timetable(page, fac_name_clean, semester)
+                        if fac_data:
+                            if stream_output:
+                                all_faculties_data.write(fac_data, key=idx)
+                            else:
+                                all_faculties_data.append(fac_data)
+                            print("✓")
+                        else:
+                            print("✗ (No timetable found)")
                         
-                    await page.wait_for_timeout(300)
+                        await self.pacing.pause()
                 
                 # Save results
                 if all_faculties_data:
@@ -481,11 +765,19 @@ class FacultyTimetableScraper:
                 
                 print("\n" + "="*60)
                 print(f"✅ Scraping complete! Saved {len(all_faculties_data)} faculties.")
+                self.timing.print_summary()
+                self.pacing.print_summary()
+                if self.resource_policy:
+                    await self.resource_policy.flush()
+                    self.resource_policy.print_summary()
                 print("="*60 + "\n")
                 
             except Exception as e:
                 print(f"❌ Fatal error: {e}")
             finally:
+                if isinstance(all_faculties_data, NdjsonWriter):
+                    all_faculties_data.close()
+                self.timing.write()
                 if not headless:
                     print("🔍 Browser open for inspection. Press Ctrl+C to exit.")
                     await asyncio.get_event_loop().run_in_executor(None, input)
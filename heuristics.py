@@ -8,13 +8,17 @@ Responsibilities
 2. String normalisation / fuzzy matching
 3. A HeuristicsCache that learns from successful scrapes and persists to disk.
 4. A Blacklist that prunes department×degree pairs that consistently return nothing.
+5. An OptionTreeCache that remembers the sem → degree → dept → spec dropdown
+   options per fin_year, so a run can plan its traversal without the live cascade.
 """
 
 from __future__ import annotations
 
+import copy
 import json
 import os
 import re
+import time
 import unicodedata
 from pathlib import Path
 from typing import Optional
@@ -318,18 +322,26 @@ def is_spec_allowed(raw_spec: str, raw_dept: str) -> bool:
 
 _DEFAULT_CACHE_PATH = os.path.expanduser("~/ims_scraper_outputs/heuristics_cache.json")
 
+# Identical timetables in a row before a section / spec collapse rule applies
+COLLAPSE_MIN_EVIDENCE = 3
+
 
 class HeuristicsCache:
     """
     Persists learned (dept → degree) and (dept → spec) associations so that
     future runs can skip impossible combinations from the very first request.
 
+    It also learns collapse rules: for a dept × degree pair, whether changing
+    the section (or the spec) ever changes the timetable.
+
     Schema
     ──────
     {
       "dept_to_degrees":  { "<NORM_DEPT>": ["<NORM_DEG>", ...] },
       "dept_to_specs":    { "<NORM_DEPT>": ["<NORM_SPEC>", ...] },
-      "degree_to_depts":  { "<NORM_DEG>":  ["<NORM_DEPT>", ...] }
+      "degree_to_depts":  { "<NORM_DEG>":  ["<NORM_DEPT>", ...] },
+      "collapse_rules":   { "<NORM_DEPT>|<NORM_DEG>": {"section": {"same": 4, "diff": 0},
+                                                       "spec":    {"same": 0, "diff": 1}} }
     }
     """
 
@@ -339,10 +351,27 @@ class HeuristicsCache:
             "dept_to_degrees":  {},
             "dept_to_specs":    {},
             "degree_to_depts":  {},
+            "collapse_rules":   {},
         }
         self._dirty = False
+        self._parent: Optional[HeuristicsCache] = None
         self._load()
 
+    def fork(self, data: Optional[dict] = None) -> "HeuristicsCache":
+        """
+        A view that decides from `data` (default: this cache's current state) plus
+        only what it learns itself; everything it learns is also recorded here.
+        One fork per class shard keeps a shard's pruning independent of others.
+        """
+        child = copy.copy(self)
+        child._data   = copy.deepcopy(self._data if data is None else data)
+        child._dirty  = False
+        child._parent = self
+        return child
+
+    def snapshot(self) -> dict:
+        return copy.deepcopy(self._data)
+
     # ── Persistence ──────────────────────────────────────────────────────────
 
     def _load(self):
@@ -358,6 +387,8 @@ class HeuristicsCache:
                 print(f"⚠️   Could not read heuristics cache: {e}")
 
     def save(self, force: bool = False):
+        if self._parent is not None:
+            return self._parent.save(force)
         if not (self._dirty or force):
             return
         os.makedirs(os.path.dirname(self.path), exist_ok=True)
@@ -385,6 +416,25 @@ class HeuristicsCache:
         _add(self._data["degree_to_depts"],  degree, dept)
         if spec:
             _add(self._data["dept_to_specs"], dept, spec)
+        if self._parent is not None:
+            self._parent.record_success(raw_dept, raw_degree, raw_spec)
+
+    def record_dimension(self, raw_dept: str, raw_degree: str, dimension: str, same: bool):
+        """
+        Two combinations of this dept × degree that differ only in `dimension`
+        ("section" or "spec") returned the same (same=True) or different timetables.
+        A difference wipes the evidence, so a rule has to be re-earned.
+        """
+        key  = f"{normalize(raw_dept)}|{normalize(raw_degree)}"
+        rule = self._data["collapse_rules"].setdefault(key, {}).setdefault(dimension, {"same": 0, "diff": 0})
+        if same:
+            rule["same"] += 1
+        else:
+            rule["same"] = 0
+            rule["diff"] += 1
+        self._dirty = True
+        if self._parent is not None:
+            self._parent.record_dimension(raw_dept, raw_degree, dimension, same)
 
     # ── Querying ─────────────────────────────────────────────────────────────
 
@@ -400,6 +450,13 @@ class HeuristicsCache:
     def has_any_success_for_dept(self, raw_dept: str) -> bool:
         return normalize(raw_dept) in self._data["dept_to_degrees"]
 
+    def is_collapsed(self, raw_dept: str, raw_degree: str, dimension: str,
+                     min_evidence: int = COLLAPSE_MIN_EVIDENCE) -> bool:
+        """True when `dimension` has made no difference for this pair at least min_evidence times in a row."""
+        key  = f"{normalize(raw_dept)}|{normalize(raw_degree)}"
+        rule = self._data["collapse_rules"].get(key, {}).get(dimension)
+        return bool(rule) and rule["same"] >= min_evidence
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 4.  Blacklist  (prune dept×degree pairs with repeated failures)
@@ -421,8 +478,33 @@ class Blacklist:
         self._failures: dict[tuple[str, str], int] = {}
         self._session_skipped: set[tuple[str, str]] = set()
         self._persisted_blacklisted: set[tuple[str, str]] = set()
+        self._parent: Optional[Blacklist] = None
         self._load()
 
+    def fork(self, state: Optional[tuple] = None) -> "Blacklist":
+        """
+        A view that decides from `state` (see snapshot(); default: the current
+        state) plus its own failures; persistent changes are forwarded here.
+        """
+        failures, skipped, persisted = copy.deepcopy(state or self.snapshot())
+        child = copy.copy(self)
+        child._failures, child._session_skipped, child._persisted_blacklisted = failures, skipped, persisted
+        child._parent = self
+        return child
+
+    def snapshot(self) -> tuple:
+        return copy.deepcopy((self._failures, self._session_skipped, self._persisted_blacklisted))
+
+    def _persist(self, key: tuple[str, str], blacklisted: bool):
+        """Add `key` to (or drop it from) the persistent blacklist file."""
+        if self._parent is not None:
+            return self._parent._persist(key, blacklisted)
+        if blacklisted:
+            self._persisted_blacklisted.add(key)
+        else:
+            self._persisted_blacklisted.discard(key)
+        self._save()
+
     def _load(self):
         if os.path.exists(self._path):
             try:
@@ -456,7 +538,7 @@ class Blacklist:
         if self._failures[key] == self._persist_threshold:
             if key not in self._persisted_blacklisted:
                 self._persisted_blacklisted.add(key)
-                self._save()
+                self._persist(key, True)
                 print(f"         🚫  Persistently Blacklisted: {raw_dept} × {raw_degree} "
                       f"(≥{self._persist_threshold} empty ops)")
 
@@ -479,15 +561,149 @@ class Blacklist:
         # If successfully scraped, ensure it's removed from persistent blacklist
         if key in self._persisted_blacklisted:
             self._persisted_blacklisted.discard(key)
-            self._save()
+            self._persist(key, False)
 
     def is_blacklisted(self, raw_dept: str, raw_degree: str) -> bool:
         key = self._key(raw_dept, raw_degree)
         return key in self._persisted_blacklisted or key in self._session_skipped
 
+    def failure_count(self, raw_dept: str, raw_degree: str) -> int:
+        """Consecutive failures recorded for this pair in the current session."""
+        return self._failures.get(self._key(raw_dept, raw_degree), 0)
+
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 5.  Filtering helpers  (used directly by the scraper loop)
+# 5.  Option-tree cache  (dropdown cascade discovered on earlier runs)
+# ─────────────────────────────────────────────────────────────────────────────
+
+_DEFAULT_OPTION_TREE_PATH = os.path.join(os.path.dirname(_DEFAULT_CACHE_PATH), "option_tree_cache.json")
+
+# Bump when the shape of a node changes; older files are then ignored.
+OPTION_TREE_VERSION = 1
+
+
+class OptionTreeCache:
+    """
+    Persists the live dropdown options of the class timetable form, keyed by
+    fin_year. A path names a branch of the cascade:
+
+        (sem,)                  → degree options for that semester
+        (sem, degree)           → department options       (degree = option value)
+        (sem, degree, dept)     → specialisation options
+
+    Schema
+    ──────
+    {
+      "version": 1,
+      "fin_years": {
+        "2025-26": {
+          "saved_at": 1735689600.0,
+          "sems": {
+            "6": { "options": [ {"value": "...", "text": "..."} ],
+                   "children": { "<degree>": { "options": [...], "children": {...} } } }
+          }
+        }
+      }
+    }
+
+    A branch that fails validation against the live form is dropped with
+    invalidate(), so the next lookup falls through to the live cascade.
+    """
+
+    def __init__(self, fin_year: str, path: str = _DEFAULT_OPTION_TREE_PATH):
+        self.fin_year = fin_year
+        self.path     = path
+        self._data: dict = {"version": OPTION_TREE_VERSION, "fin_years": {}}
+        self._dirty = False
+        self.hits   = 0
+        self.misses = 0
+        self._load()
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                loaded = json.load(f)
+        except Exception as e:
+            print(f"⚠️   Could not read option-tree cache: {e}")
+            return
+        if loaded.get("version") != OPTION_TREE_VERSION:
+            return
+        self._data["fin_years"] = loaded.get("fin_years", {})
+        if self.fin_year in self._data["fin_years"]:
+            print(f"📖  Option-tree cache loaded for {self.fin_year} from {self.path}")
+
+    def save(self, force: bool = False):
+        if not (self._dirty or force):
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=2, ensure_ascii=False)
+            self._dirty = False
+        except Exception as e:
+            print(f"⚠️   Could not save option-tree cache: {e}")
+
+    # ── Tree access ──────────────────────────────────────────────────────────
+
+    def _node(self, path: tuple, create: bool = False) -> Optional[dict]:
+        year = self._data["fin_years"].get(self.fin_year)
+        if year is None:
+            if not create:
+                return None
+            year = self._data["fin_years"][self.fin_year] = {"saved_at": 0, "sems": {}}
+        children = year["sems"]
+        node = None
+        for part in path:
+            node = children.get(str(part))
+            if node is None:
+                if not create:
+                    return None
+                node = children[str(part)] = {"options": None, "children": {}}
+            children = node["children"]
+        return node
+
+    def get(self, path: tuple) -> Optional[list[dict]]:
+        """Cached options below `path`, or None when that branch was never discovered."""
+        node = self._node(path)
+        options = node["options"] if node else None
+        if options is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return options
+
+    def put(self, path: tuple, options: list[dict]):
+        """Store the live options below `path`; children of options that disappeared are dropped."""
+        node = self._node(path, create=True)
+        options = [{"value": o["value"], "text": o["text"]} for o in options]
+        if node["options"] == options:
+            return
+        node["options"] = options
+        values = {o["value"] for o in options}
+        node["children"] = {k: v for k, v in node["children"].items() if k in values}
+        self._data["fin_years"][self.fin_year]["saved_at"] = time.time()
+        self._dirty = True
+
+    def invalidate(self, path: tuple):
+        """Forget the options below `path` and everything discovered beneath them."""
+        node = self._node(path)
+        if node is not None and (node["options"] is not None or node["children"]):
+            node["options"]  = None
+            node["children"] = {}
+            self._dirty = True
+
+    def clear(self):
+        """Forget the whole tree for this fin_year."""
+        if self._data["fin_years"].pop(self.fin_year, None) is not None:
+            self._dirty = True
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 6.  Filtering helpers  (used directly by the scraper loop)
 # ─────────────────────────────────────────────────────────────────────────────
 
 def filter_depts_for_degree(
@@ -550,4 +766,72 @@ def filter_specs_for_dept(
     if result:
         return result
 
-    return spec_opts
\ No newline at end of file
+    return spec_opts
+
+
+def score_combination(
+    raw_degree: str,
+    raw_dept: str,
+    raw_spec: str,
+    cache: HeuristicsCache,
+    blacklist: Optional[Blacklist] = None,
+) -> float:
+    """
+    Expected probability (0..1) that a degree × dept × spec combination returns
+    a timetable; used to order a planned crawl by yield.
+
+    Priority:
+      1. Learned successes in the cache (pair and spec seen before → 0.9).
+      2. Otherwise the static DEGREE_TO_DEPARTMENTS / DEPARTMENT_TO_SPECIALIZATIONS maps.
+      3. Every consecutive failure of the pair in this session halves the score;
+         a blacklisted pair scores 0. The planner applies this while it runs
+         through rescore_combinations().
+    """
+    if blacklist is not None and blacklist.is_blacklisted(raw_dept, raw_degree):
+        return 0.0
+
+    no_spec = not raw_spec or raw_spec == "N_A"
+    if normalize(raw_degree) in cache.known_degrees_for_dept(raw_dept):
+        known_specs = cache.known_specs_for_dept(raw_dept)
+        if no_spec or not known_specs or normalize(raw_spec) in known_specs:
+            score = 0.9
+        else:
+            score = 0.6
+    else:
+        if allowed_departments_for_degree(raw_degree):
+            score = 0.5 if is_department_allowed(raw_dept, raw_degree) else 0.1
+        else:
+            score = 0.3   # novel degree: nothing known either way
+        if cache.has_any_success_for_dept(raw_dept):
+            score += 0.1
+        if not no_spec and not is_spec_allowed(raw_spec, raw_dept):
+            score *= 0.5
+
+    if blacklist is not None:
+        score *= 0.5 ** blacklist.failure_count(raw_dept, raw_degree)
+    return round(score, 4)
+
+
+def rescore_combinations(
+    combos: list[dict],
+    raw_degree: str,
+    raw_dept: str,
+    cache: HeuristicsCache,
+    blacklist: Optional[Blacklist] = None,
+) -> int:
+    """
+    Re-score the not-yet-scraped combinations of one degree × dept pair after a
+    result for that pair (a failure halves, a success resets) and re-sort
+    `combos` in place by (-score, order). Returns how many were re-scored.
+
+    Each combo is a planner entry: {"degree": {"text"}, "dept": {"text"},
+    "spec": {"text"}, "score": float, "order": tuple, ...}.
+    """
+    touched = 0
+    for combo in combos:
+        if combo["degree"]["text"] == raw_degree and combo["dept"]["text"] == raw_dept:
+            combo["score"] = score_combination(raw_degree, raw_dept, combo["spec"]["text"], cache, blacklist)
+            touched += 1
+    if touched:
+        combos.sort(key=lambda c: (-c["score"], c["order"]))
+    return touched
@@ -0,0 +1,581 @@
+"""
+mock_portal.py  ─  A local stand-in for the IMS portal, for benchmarks and offline runs.
+
+Serves just enough of the real portal for the three scrapers to run unmodified
+(apart from login / navigation, which need no captcha here):
+
+  • /imsnsit/                     landing page with the "Student Login" button
+  • student_login.php             frameset with the `banner` login frame
+  • login.php                     sets the session cookie → home.php
+  • home.php                      banner ("Welcome …") + menu + data frames
+  • RoomTimetable.php             txtroom / txtroomcode / semcmb form, Go, plum table
+  • ClassTimetable.php            sem → section → degree → dept → spec → day cascade
+  • FacultyTimetable.php          sem + Pick Faculty + Proceed
+  • picker_room.php / picker_faculty.php   the Picker popups
+  • class_options.php             JSON options for the cascading dropdowns
+
+Every result submission (Go / Proceed) waits `latency_ms` ± `jitter_ms`; cascade
+option lookups wait `option_latency_ms`. A deterministic `empty_ratio` of rooms,
+class combinations and faculties come back with "No Record Found".
+
+Usage
+─────
+    portal = MockPortal(latency_ms=300).start()
+    scraper.base_url = portal.base_url
+    ...
+    portal.stop()
+
+    python mock_portal.py --port 8765 --latency-ms 300     # serve until Ctrl+C
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1.  Static portal data
+# ─────────────────────────────────────────────────────────────────────────────
+
+DAYS       = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat")
+TIME_SLOTS = ("08:00-09:00", "09:00-10:00", "10:00-11:00", "11:00-12:00",
+              "12:00-13:00", "13:00-14:00", "14:00-15:00", "15:00-16:00")
+
+# Degree → departments → specialisations, in the portal's own spelling.
+# B.Tech deliberately lists MANAGEMENT STUDIES so the heuristic filter has something to prune.
+CLASS_TREE: dict[str, dict[str, list[str]]] = {
+    "B.Tech": {
+        "COMPUTER SCIENCE AND ENGINEERING":          ["COMPUTER SCIENCE AND ENGINEERING", "ARTIFICIAL INTELLIGENCE", "DATA SCIENCE"],
+        "INFORMATION TECHNOLOGY":                    ["INFORMATION TECHNOLOGY", "INFORMATION TECHNOLOGY NETWORK AND INFORMATION SECURITY"],
+        "ELECTRONICS AND COMMUNICATION ENGINEERING": ["ELECTRONICS AND COMMUNICATION ENGINEERING", "VLSI DESIGN"],
+        "MECHANICAL ENGINEERING":                    ["MECHANICAL ENGINEERING"],
+        "MANAGEMENT STUDIES":                        ["FINANCE"],
+    },
+    "M.Tech": {
+        "COMPUTER SCIENCE AND ENGINEERING":          ["DATA SCIENCE", "CYBER SECURITY"],
+        "ELECTRONICS AND COMMUNICATION ENGINEERING": ["VLSI DESIGN", "SIGNAL PROCESSING"],
+    },
+    "MBA": {
+        "MANAGEMENT STUDIES":                        ["FINANCE", "MARKETING"],
+    },
+}
+
+_SUBJECTS = ("CS301", "CS302", "IT304", "EC210", "ME115", "MA201", "HS101", "CS405", "EC330", "MB510")
+
+_SURNAMES   = ("SHARMA", "GUPTA", "SINGH", "VERMA", "KUMAR", "JAIN", "AGARWAL", "MEHTA", "RAO", "NAIR",
+               "BANSAL", "KAPOOR", "CHOPRA", "MISHRA", "PANDEY", "SAXENA", "TIWARI", "YADAV")
+_FIRST_NAMES = ("ANITA", "RAJESH", "PRIYA", "SANJAY", "NEHA", "AMIT", "KAVITA", "VIKAS", "POOJA", "RAHUL",
+                "SUNITA", "MANOJ", "DEEPA", "ARUN", "REKHA", "VIVEK")
+
+_PIXEL_GIF = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+
+def default_rooms(count: int) -> list[dict]:
+    """`count` rooms inside RoomTimetableScraper.room_ranges ({value, text} like the Picker)."""
+    blocks = [range(b, b + 40) for b in (4000, 4100, 4200, 4300, 6000, 6100, 6200, 6300, 8000, 8100, 8200)]
+    numbers = [n for block in zip(*blocks) for n in block]   # spread across blocks
+    rooms = [{"value": str(1000 + i), "text": str(n)} for i, n in enumerate(numbers[:count])]
+    return rooms
+
+
+def default_faculties(count: int) -> list[dict]:
+    out = []
+    for i in range(count):
+        name = f"DR. {_FIRST_NAMES[i % len(_FIRST_NAMES)]} {_SURNAMES[(i * 7) % len(_SURNAMES)]}"
+        if i >= len(_FIRST_NAMES):
+            name += f" {i // len(_FIRST_NAMES) + 1}"   # keep names unique
+        out.append({"code": f"F{i:03d}", "name": name})
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2.  Page templates
+# ─────────────────────────────────────────────────────────────────────────────
+
+_PAGE = """<html><head><title>{title}</title>
+<link rel="stylesheet" href="style.css"></head>
+<body>{body}</body></html>"""
+
+_OPEN_URL_JS = """<script>
+function openURL(u) { window.open(u, 'picker', 'width=420,height=520,scrollbars=yes'); }
+</script>"""
+
+# Mirrors how IMS fills the hidden code + visible text from a Picker popup
+_SETVAL_JS = """<script>
+function SetVal(code, text) {{
+    const d = window.opener.document;
+    d.getElementById('{code_id}').value = code;
+    d.getElementById('{text_id}').value = text;
+    window.close();
+}}
+</script>"""
+
+
+def _esc(value) -> str:
+    return html.escape(str(value), quote=True)
+
+
+def _options(values, selected=None, placeholder: Optional[str] = None) -> str:
+    out = [f'<option value="">{_esc(placeholder)}</option>'] if placeholder is not None else []
+    for v in values:
+        value, text = v if isinstance(v, tuple) else (v, v)
+        sel = " selected" if str(value) == str(selected) else ""
+        out.append(f'<option value="{_esc(value)}"{sel}>{_esc(text)}</option>')
+    return "".join(out)
+
+
+def _grid_table(header_label: str, rng: random.Random, fill: float) -> str:
+    """A .plum_fieldbig grid (room / faculty layout): header row T1..T8, one row per day."""
+    rows = [f'<tr><td colspan="{len(TIME_SLOTS) + 1}" class="plum_head">{_esc(header_label)}</td></tr>',
+            '<tr><td class="plum_fieldbig">Day</td>'
+            + "".join(f'<td class="plum_fieldbig">T{i + 1}</td>' for i in range(len(TIME_SLOTS))) + "</tr>"]
+    for day in DAYS:
+        cells = []
+        for _ in TIME_SLOTS:
+            if rng.random() < fill:
+                cells.append(f"<td>{rng.choice(_SUBJECTS)} ({rng.choice(('L', 'T', 'P'))}) 2022U{rng.randint(10, 99)}</td>")
+            else:
+                cells.append("<td>&nbsp;</td>")
+        rows.append(f'<tr><td class="plum_fieldbig">{day}</td>{"".join(cells)}</tr>')
+    return '<table class="plum_table" border="1">' + "".join(rows) + "</table>"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3.  The portal
+# ─────────────────────────────────────────────────────────────────────────────
+
+class MockPortal:
+    """Threaded local HTTP server imitating the IMS timetable pages."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: int = 300, jitter_ms: int = 100, option_latency_ms: int = 150,
+                 empty_ratio: float = 0.15, rooms: int = 60, faculties: int = 30,
+                 fin_year: str = "2025-26", seed: int = 7):
+        self.host = host
+        self.port = port
+        self.latency_ms        = latency_ms
+        self.jitter_ms         = jitter_ms
+        self.option_latency_ms = option_latency_ms
+        self.empty_ratio       = empty_ratio
+        self.fin_year          = fin_year
+        self.seed              = seed
+        self.rooms     = default_rooms(rooms)
+        self.faculties = default_faculties(faculties)
+        self.requests: Counter = Counter()
+        self._sessions: dict[str, str] = {}   # token → user id
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+
+    def start(self) -> "MockPortal":
+        portal = self
+
+        class Handler(_PortalHandler):
+            pass
+        Handler.portal = portal
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/imsnsit/"
+
+    # ── Helpers ──────────────────────────────────────────────────────────────
+
+    def _rng(self, *key) -> random.Random:
+        return random.Random(f"{self.seed}:" + ":".join(map(str, key)))
+
+    def _is_empty(self, *key) -> bool:
+        return self._rng("empty", *key).random() < self.empty_ratio
+
+    def _sleep(self, base_ms: int):
+        if base_ms <= 0:
+            return
+        jitter = random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        time.sleep(max(0.0, base_ms + jitter) / 1000)
+
+    def new_session(self, user: str) -> str:
+        token = secrets.token_hex(12)
+        with self._lock:
+            self._sessions[token] = user
+        return token
+
+    def end_session(self, token: str):
+        """Expire a session, as the portal does after its idle timeout."""
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def has_session(self, token: Optional[str]) -> bool:
+        return token is not None and token in self._sessions
+
+    def count(self, endpoint: str):
+        with self._lock:
+            self.requests[endpoint] += 1
+
+    # ── Pages ────────────────────────────────────────────────────────────────
+
+    def page_landing(self) -> str:
+        return _PAGE.format(title="IMS NSIT", body="""
+<h2>Integrated Management System</h2>
+<input type="button" value="Student Login" onclick="location.href='student_login.php'">
+""")
+
+    def page_login_frameset(self) -> str:
+        return """<html><head><title>IMS Login</title></head>
+<frameset rows="220,*">
+  <frame name="banner" src="login_form.php">
+  <frame name="data" src="blank.php">
+</frameset></html>"""
+
+    def page_login_form(self) -> str:
+        years = _options(["2024-25", "2025-26"], selected=self.fin_year)
+        return _PAGE.format(title="Login", body=f"""
+<form method="post" action="login.php" target="_top">
+  <input type="text" name="txtuserid" placeholder="Enter userid">
+  <input type="password" name="txtpassword" placeholder="Enter password">
+  <select name="cmbfinyear">{years}</select>
+  <input type="text" name="cap" placeholder="Enter captcha">
+  <input type="submit" value="Login">
+</form>""")
+
+    def page_home_frameset(self) -> str:
+        return """<html><head><title>IMS</title></head>
+<frameset rows="80,*">
+  <frame name="banner" src="banner.php">
+  <frameset cols="200,*">
+    <frame name="menu" src="menu.php">
+    <frame name="data" src="blank.php">
+  </frameset>
+</frameset></html>"""
+
+    def page_banner(self, user: str) -> str:
+        return _PAGE.format(title="Banner", body=f"<b>Welcome {_esc(user or 'Student')}</b>")
+
+    def page_menu(self) -> str:
+        return _PAGE.format(title="Menu", body="""
+<b>TIME TABLE</b><br>
+<a href="RoomTimetable.php" target="data">RoomTimetable</a><br>
+<a href="ClassTimetable.php" target="data">ClassTimetable</a><br>
+<a href="FacultyTimetable.php" target="data">Faculty Timetable</a><br>""")
+
+    # Room ───────────────────────────────────────────────────────────────────
+
+    def page_room(self, form: Optional[dict] = None) -> str:
+        form = form or {}
+        sem = form.get("semcmb", "EVEN")
+        result = ""
+        if form:
+            self._sleep(self.latency_ms)
+            result = self._room_result(form.get("roomcode") or form.get("room", ""), form.get("room", ""), sem)
+        return _PAGE.format(title="Room Timetable", body=f"""
+{_OPEN_URL_JS}
+<form name="frm" method="post" action="RoomTimetable.php">
+  <table><tr>
+    <td>Semester</td><td><select name="semcmb">{_options(["ODD", "EVEN"], selected=sem)}</select></td>
+    <td>Room :</td>
+    <td><input type="text" name="room" id="txtroom" value="{_esc(form.get('room', ''))}">
+        <input type="hidden" name="roomcode" id="txtroomcode" value="{_esc(form.get('roomcode', ''))}">
+        <a href="javascript:openURL('picker_room.php')"><img src="images/enlarge.gif" border="0" title="Picker"></a></td>
+    <td><input type="submit" name="go" value="Go"></td>
+  </tr></table>
+</form>
+{result}""")
+
+    def _room_result(self, code: str, text: str, sem: str) -> str:
+        room = next((r for r in self.rooms if code in (r["value"], r["text"])), None)
+        if room is None or self._is_empty("room", room["text"], sem):
+            return "<p>No Record Found</p>"
+        rng = self._rng("room", room["text"], sem)
+        label = f"Room Time Table ( Year : {self.fin_year} )  ROOM : {room['text']}"
+        return _grid_table(label, rng, fill=rng.uniform(0.2, 0.8))
+
+    def page_room_picker(self) -> str:
+        links = "".join(
+            f"""<a href="javascript:SetVal('{_esc(r['value'])}','{_esc(r['text'])}')">{_esc(r['text'])}</a><br>"""
+            for r in self.rooms
+        )
+        return _PAGE.format(title="Pick Room",
+                            body=_SETVAL_JS.format(code_id="txtroomcode", text_id="txtroom")
+                            + links + '<a href="javascript:window.close()">Close</a>')
+
+    # Class ──────────────────────────────────────────────────────────────────
+
+    def class_options(self, level: str, degree: str = "", dept: str = "") -> list[str]:
+        if level == "degree":
+            return list(CLASS_TREE)
+        if level == "dept":
+            return list(CLASS_TREE.get(degree, {}))
+        if level == "spec":
+            return list(CLASS_TREE.get(degree, {}).get(dept, []))
+        return []
+
+    def page_class(self, form: Optional[dict] = None) -> str:
+        form = form or {}
+        sem, sec = form.get("sem", ""), form.get("sec", "")
+        degree, dept, spec = form.get("degree", ""), form.get("dept", ""), form.get("spec", "")
+        result = ""
+        if form.get("go"):
+            self._sleep(self.latency_ms)
+            result = self._class_result(sem, sec, degree, dept, spec)
+
+        return _PAGE.format(title="Class Timetable", body=f"""
+<form name="frm" method="post" action="ClassTimetable.php">
+  <table><tr>
+    <td>Semester</td><td><select name="sem" onchange="loadOptions('degree')">{_options(range(1, 9), sem, "--Select--")}</select></td>
+    <td>Section</td><td><select name="sec">{_options(range(1, 4), sec, "--Select--")}</select></td>
+    <td>Degree</td><td><select name="degree" onchange="loadOptions('dept')">{_options(self.class_options("degree"), degree, "--Select--")}</select></td>
+    <td>Department</td><td><select name="dept" onchange="loadOptions('spec')">{_options(self.class_options("dept", degree), dept, "--Select--")}</select></td>
+    <td>Specialization</td><td><select name="spec">{_options(self.class_options("spec", degree, dept), spec, "--Select--")}</select></td>
+    <td>Day</td><td><select name="day">{_options(("All",) + DAYS, form.get("day", "All"))}</select></td>
+    <td><input type="submit" name="go" value="Go"></td>
+  </tr></table>
+</form>
+<script>
+// Cascading dropdowns: the portal refills the next select from the server
+function loadOptions(level) {{
+    const f = document.forms.frm;
+    const q = new URLSearchParams({{level: level, degree: f.degree.value, dept: f.dept.value}});
+    const target = f[level];
+    fetch('class_options.php?' + q).then(r => r.json()).then(opts => {{
+        target.innerHTML = '<option value="">--Select--</option>'
+            + opts.map(o => '<option value="' + o + '">' + o + '</option>').join('');
+        if (level === 'dept') f.spec.innerHTML = '<option value="">--Select--</option>';
+        target.dispatchEvent(new Event('optionsloaded'));
+    }});
+}}
+</script>
+{result}""")
+
+    def _class_result(self, sem, sec, degree, dept, spec) -> str:
+        valid = spec in CLASS_TREE.get(degree, {}).get(dept, []) or (not spec and dept in CLASS_TREE.get(degree, {}))
+        if not valid or self._is_empty("class", sem, sec, degree, dept, spec):
+            return "<p>No Record Found</p>"
+        rng = self._rng("class", sem, sec, degree, dept, spec)
+        header = "<tr><td></td>" + "".join(f"<td>T{i + 1}<br>{t}</td>" for i, t in enumerate(TIME_SLOTS)) + "</tr>"
+        rows = [f'<tr><td colspan="9">( Year : {self.fin_year} Sem : {_esc(sem)} Degree : {_esc(degree)} '
+                f'Department : {_esc(dept)} Section : {_esc(sec)} )</td></tr>',
+                '<tr><td colspan="9">Time Table (CORE)</td></tr>', header]
+        used = set()
+        for day in DAYS:
+            cells = []
+            for _ in TIME_SLOTS:
+                if rng.random() < 0.55:
+                    code = rng.choice(_SUBJECTS)
+                    used.add(code)
+                    cells.append(f"<td>{code} ({rng.choice(('L', 'T', 'P'))}) {rng.randint(4000, 8240)}</td>")
+                else:
+                    cells.append("<td></td>")
+            rows.append(f"<tr><td>{day}</td>{''.join(cells)}</tr>")
+        for code in sorted(used):
+            rows.append(f'<tr><td colspan="9">{code} - Subject {code} / {rng.choice(_SURNAMES)}</td></tr>')
+        return '<table border="1">' + "".join(rows) + "</table>"
+
+    # Faculty ────────────────────────────────────────────────────────────────
+
+    def page_faculty(self, form: Optional[dict] = None) -> str:
+        form = form or {}
+        sem = form.get("sem", "EVEN")
+        result = ""
+        if form:
+            self._sleep(self.latency_ms)
+            result = self._faculty_result(form.get("faccode", ""), sem)
+        return _PAGE.format(title="Faculty Timetable", body=f"""
+{_OPEN_URL_JS}
+<form name="frm" method="post" action="FacultyTimetable.php">
+  <table><tr>
+    <td>Semester</td><td><select name="sem">{_options(["ODD", "EVEN"], selected=sem)}</select></td>
+    <td>Faculty :</td>
+    <td><input type="text" name="faculty" id="txtfaculty" readonly value="{_esc(form.get('faculty', ''))}">
+        <input type="hidden" name="faccode" id="txtfaccode" value="{_esc(form.get('faccode', ''))}">
+        <a href="javascript:openURL('picker_faculty.php')"><img src="images/enlarge.gif" border="0" title="Picker"></a></td>
+    <td><input type="submit" name="proceed" value="Proceed"></td>
+  </tr></table>
+</form>
+{result}""")
+
+    def _faculty_result(self, code: str, sem: str) -> str:
+        fac = next((f for f in self.faculties if f["code"] == code), None)
+        if fac is None or self._is_empty("faculty", fac["code"], sem):
+            return "<p>No Record Found</p>"
+        rng = self._rng("faculty", fac["code"], sem)
+        return _grid_table(f"Faculty Time Table ( Year : {self.fin_year} )  {fac['name']}", rng, fill=0.35)
+
+    def page_faculty_picker(self, search: str = "") -> str:
+        body = _SETVAL_JS.format(code_id="txtfaccode", text_id="txtfaculty") + """
+<form method="get" action="picker_faculty.php">
+  <input type="text" name="search"> <input type="submit" name="proceed" value="Search">
+</form>"""
+        if search:
+            self._sleep(self.option_latency_ms)
+            words = search.upper().split()
+            hits = [f for f in self.faculties if all(w in f["name"] for w in words)]
+            body += "".join(
+                f"""<a href="javascript:SetVal('{f['code']}','{_esc(f['name'])}')">{_esc(f['name'])}; {f['code']}</a><br>"""
+                for f in hits
+            ) or "<p>No Record Found</p>"
+        body += '<a href="javascript:window.close()">Close</a>'
+        return _PAGE.format(title="Pick Faculty", body=body)
+
+    # ── Reporting ────────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.requests)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 4.  HTTP handler
+# ─────────────────────────────────────────────────────────────────────────────
+
+class _PortalHandler(BaseHTTPRequestHandler):
+    portal: MockPortal = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass   # keep benchmark output readable
+
+    # ── Plumbing ─────────────────────────────────────────────────────────────
+
+    def _cookie(self, name: str) -> Optional[str]:
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            k, _, v = part.strip().partition("=")
+            if k == name:
+                return v
+        return None
+
+    def _send(self, body, status: int = 200, content_type: str = "text/html; charset=utf-8",
+              headers: Optional[dict] = None):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _redirect(self, location: str, headers: Optional[dict] = None):
+        self._send("", status=302, headers={"Location": location, **(headers or {})})
+
+    def _form(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode("utf-8", errors="replace") if length else ""
+        return {k: v[-1] for k, v in parse_qs(raw, keep_blank_values=True).items()}
+
+    # ── Routing ──────────────────────────────────────────────────────────────
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        self._route(self._query())
+
+    def do_POST(self):
+        self._route(self._form(), post=True)
+
+    def _query(self) -> dict:
+        return {k: v[-1] for k, v in parse_qs(urlparse(self.path).query, keep_blank_values=True).items()}
+
+    def _route(self, params: dict, post: bool = False):
+        portal = self.portal
+        path = urlparse(self.path).path
+        if not path.startswith("/imsnsit/"):
+            return self._redirect("/imsnsit/")
+        name = path[len("/imsnsit/"):]
+        portal.count(name or "index")
+
+        public = {
+            "":                 portal.page_landing,
+            "student_login.php": portal.page_login_frameset,
+            "login_form.php":   portal.page_login_form,
+            "blank.php":        lambda: _PAGE.format(title="", body=""),
+            "style.css":        lambda: "",
+        }
+        if name in public:
+            ctype = "text/css" if name.endswith(".css") else "text/html; charset=utf-8"
+            return self._send(public[name](), content_type=ctype)
+        if name.startswith("images/"):
+            return self._send(_PIXEL_GIF, content_type="image/gif")
+        if name == "login.php" and post:
+            token = portal.new_session(params.get("txtuserid", ""))
+            return self._redirect("home.php", headers={"Set-Cookie": f"PHPSESSID={token}; Path=/imsnsit/"})
+
+        token = self._cookie("PHPSESSID")
+        if not portal.has_session(token):
+            return self._redirect("/imsnsit/")
+
+        pages = {
+            "home.php":             portal.page_home_frameset,
+            "banner.php":           lambda: portal.page_banner(portal._sessions.get(token, "")),
+            "menu.php":             portal.page_menu,
+            "RoomTimetable.php":    lambda: portal.page_room(params if post else None),
+            "ClassTimetable.php":   lambda: portal.page_class(params if post else None),
+            "FacultyTimetable.php": lambda: portal.page_faculty(params if post else None),
+            "picker_room.php":      portal.page_room_picker,
+            "picker_faculty.php":   lambda: portal.page_faculty_picker(params.get("search", "")),
+        }
+        if name in pages:
+            return self._send(pages[name]())
+        if name == "class_options.php":
+            portal._sleep(portal.option_latency_ms)
+            opts = portal.class_options(params.get("level", ""), params.get("degree", ""), params.get("dept", ""))
+            return self._send(json.dumps(opts), content_type="application/json")
+        self._send("<html><body>Not Found</body></html>", status=404)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local mock of the IMS timetable portal.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=300)
+    parser.add_argument("--jitter-ms", type=int, default=100)
+    parser.add_argument("--option-latency-ms", type=int, default=150)
+    parser.add_argument("--empty-ratio", type=float, default=0.15)
+    parser.add_argument("--rooms", type=int, default=60)
+    parser.add_argument("--faculties", type=int, default=30)
+    args = parser.parse_args()
+
+    portal = MockPortal(port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        option_latency_ms=args.option_latency_ms, empty_ratio=args.empty_ratio,
+                        rooms=args.rooms, faculties=args.faculties).start()
+    print(f"🧪 Mock IMS portal on {portal.base_url}  (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        portal.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+pacing.py  ─  Adaptive request pacing shared by all three scrapers.
+
+Replaces the hard-coded pauses (200 ms between rooms, `wait_ms` after every
+dropdown, the 15 s Go timeout) with one AIMD controller that watches how long
+the portal takes to answer a Go and how often it times out:
+
+  • Additive increase — every healthy answer shaves `delay_step_s` off the
+    inter-request delay, and every `increase_every` healthy answers in a row
+    allow one more worker (up to `max_workers`).
+  • Multiplicative decrease — a timeout, an error or a very slow answer
+    multiplies the delay by `backoff_factor` and halves the worker count.
+    At most one decrease per `cooldown_s`, so a burst of timeouts from
+    parallel workers counts as one congestion event.
+
+The Go timeout and the dropdown settle times follow the observed latency
+(an EWMA), so a fast portal is polled with short timeouts and a slow one
+gets more room before a combination is given up on.
+
+Usage
+─────
+    pacing = PacingController(workers=2, max_workers=6)
+    t0 = time.monotonic()
+    ok = await wait_for_table(timeout=pacing.timeout_s)
+    pacing.record_success(time.monotonic() - t0) if ok else pacing.record_timeout()
+    await pacing.pause()
+
+Every scraper creates its own controller in __init__; assign the same
+instance to several scrapers (`b.pacing = a.pacing`) to pace them together.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter, deque
+from typing import Optional
+
+
+class PacingController:
+    """AIMD controller for the inter-request delay, worker count and Go timeout."""
+
+    def __init__(self,
+                 base_delay_s: float = 0.2,
+                 min_delay_s: float = 0.0,
+                 max_delay_s: float = 10.0,
+                 delay_step_s: float = 0.05,
+                 backoff_factor: float = 2.0,
+                 workers: int = 1,
+                 max_workers: Optional[int] = None,
+                 increase_every: int = 10,
+                 timeout_s: float = 15.0,
+                 min_timeout_s: float = 3.0,
+                 max_timeout_s: float = 30.0,
+                 slow_latency_s: float = 8.0,
+                 target_latency_s: float = 2.0,
+                 max_timeout_rate: float = 0.1,
+                 window: int = 50,
+                 cooldown_s: float = 2.0):
+        self.base_delay_s   = base_delay_s
+        self.min_delay_s    = min_delay_s
+        self.max_delay_s    = max_delay_s
+        self.delay_step_s   = delay_step_s
+        self.backoff_factor = backoff_factor
+        self.max_workers    = max(1, max_workers or workers)
+        self.increase_every = increase_every
+        self.initial_timeout_s = timeout_s
+        self.min_timeout_s  = min_timeout_s
+        self.max_timeout_s  = max_timeout_s
+        self.slow_latency_s = slow_latency_s
+        self.target_latency_s = target_latency_s
+        self.max_timeout_rate = max_timeout_rate
+        self.cooldown_s     = cooldown_s
+
+        self.delay_s = base_delay_s
+        self.workers = min(max(1, workers), self.max_workers)
+        self.latency_ewma: Optional[float] = None
+        self._alpha = 0.2
+        self._streak = 0
+        self._last_decrease = 0.0
+        self._outcomes: deque = deque(maxlen=window)   # True = timeout / error
+        self.counts: Counter = Counter()
+        self.peak_workers = self.workers
+
+    # ── Feedback ─────────────────────────────────────────────────────────────
+
+    def _observe(self, latency_s: float):
+        if self.latency_ewma is None:
+            self.latency_ewma = latency_s
+        else:
+            self.latency_ewma += self._alpha * (latency_s - self.latency_ewma)
+
+    def record_success(self, latency_s: float):
+        """A Go (or HTTP submit) answered after `latency_s` seconds."""
+        self.counts["ok"] += 1
+        self._observe(latency_s)
+        self._outcomes.append(False)
+        if latency_s > self.slow_latency_s:
+            self._decrease("slow")
+        else:
+            self._increase()
+
+    def record_timeout(self):
+        """No answer within timeout_s. The timeout itself is fed to the latency EWMA."""
+        self.counts["timeout"] += 1
+        self._observe(self.timeout_s)
+        self._outcomes.append(True)
+        self._decrease("timeout")
+
+    def record_error(self):
+        """The portal answered with an error (HTTP 5xx/429, connection reset...)."""
+        self.counts["error"] += 1
+        self._outcomes.append(True)
+        self._decrease("error")
+
+    def _increase(self):
+        if self.timeout_rate > self.max_timeout_rate:
+            return   # still recovering from a bad stretch: hold
+        self.delay_s = max(self.min_delay_s, self.delay_s - self.delay_step_s)
+        self._streak += 1
+        if self._streak >= self.increase_every and self.workers < self.max_workers:
+            self.workers += 1
+            self.peak_workers = max(self.peak_workers, self.workers)
+            self._streak = 0
+
+    def _decrease(self, reason: str):
+        self._streak = 0
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_s:
+            return
+        self._last_decrease = now
+        self.counts[f"backoff_{reason}"] += 1
+        self.delay_s = min(self.max_delay_s,
+                           max(self.delay_s * self.backoff_factor, self.base_delay_s))
+        self.workers = max(1, self.workers // 2)
+
+    # ── Derived settings ─────────────────────────────────────────────────────
+
+    @property
+    def timeout_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    @property
+    def timeout_s(self) -> float:
+        """Go timeout: ~4× the typical latency, clamped; the initial value until measured."""
+        if self.latency_ewma is None:
+            return self.initial_timeout_s
+        return min(self.max_timeout_s, max(self.min_timeout_s, 4 * self.latency_ewma + 1))
+
+    @property
+    def timeout_ms(self) -> int:
+        return int(self.timeout_s * 1000)
+
+    def settle_ms(self, ms: float) -> int:
+        """Scale a fixed settle time (e.g. after a dropdown change) by how slow the portal is."""
+        if self.latency_ewma is None:
+            return int(ms)
+        factor = min(3.0, max(0.5, self.latency_ewma / self.target_latency_s))
+        return int(ms * factor)
+
+    # ── Waiting ──────────────────────────────────────────────────────────────
+
+    async def pause(self):
+        """The delay between two requests of the same worker."""
+        if self.delay_s > 0:
+            await asyncio.sleep(self.delay_s)
+
+    def allows(self, worker_id: int) -> bool:
+        """Whether worker `worker_id` (0-based) may take new work right now."""
+        return worker_id < self.workers
+
+    # ── Reporting ────────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        return {
+            "delay_s":       round(self.delay_s, 3),
+            "workers":       self.workers,
+            "peak_workers":  self.peak_workers,
+            "timeout_s":     round(self.timeout_s, 2),
+            "latency_ewma_s": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "timeout_rate":  round(self.timeout_rate, 3),
+            "counts":        dict(self.counts),
+        }
+
+    def print_summary(self):
+        lat = f"{self.latency_ewma:.2f}s" if self.latency_ewma is not None else "n/a"
+        backoffs = sum(v for k, v in self.counts.items() if k.startswith("backoff_"))
+        print(f"🚦 Pacing: latency~{lat}  timeouts {self.counts['timeout']}"
+              f"  errors {self.counts['error']}  backoffs {backoffs}"
+              f"  | delay {self.delay_s * 1000:.0f} ms, workers {self.workers}"
+              f" (peak {self.peak_workers}), Go timeout {self.timeout_s:.1f}s")
@@ -0,0 +1,154 @@
+"""
+phase_timing.py  ─  Per-phase timing for room, class and faculty scrapes.
+
+Every scrape is a short chain of phases (frame discovery, field fill, Go click,
+the wait for the result table, bypass re-injection, extraction...). PhaseTimer
+keeps the duration of every phase of every item and, at the end of a run,
+writes p50 / p95 / max per phase to
+
+    ~/ims_scraper_outputs/timings/<scraper>_phases.json
+    ~/ims_scraper_outputs/timings/<scraper>_phases.prom   (Prometheus text format)
+
+Usage
+─────
+    timing = PhaseTimer("room")
+
+    laps = timing.laps()            # sequential phases: each lap() closes one
+    ...;  laps.lap("field_fill")
+    ...;  laps.lap("go_click")
+
+    with timing.phase("total"):     # or time a block directly
+        ...
+
+    timing.write()
+    timing.print_summary()
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+_DEFAULT_TIMINGS_DIR = os.path.expanduser("~/ims_scraper_outputs/timings")
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Laps:
+    """Stopwatch over one item: every lap(name) records the time since the previous lap."""
+
+    def __init__(self, timer: "PhaseTimer"):
+        self._timer = timer
+        self._last  = time.perf_counter()
+
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        self._timer.record(phase, now - self._last)
+        self._last = now
+
+    def skip(self):
+        """Restart the stopwatch without recording (time that belongs to no phase)."""
+        self._last = time.perf_counter()
+
+
+class PhaseTimer:
+    """Collects phase durations (seconds) and reports p50 / p95 / max per phase."""
+
+    def __init__(self, scraper: str, directory: str = _DEFAULT_TIMINGS_DIR):
+        self.scraper   = scraper
+        self.directory = directory
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.started_at = datetime.now()
+
+    # ── Recording ────────────────────────────────────────────────────────────
+
+    def record(self, phase: str, seconds: float):
+        self.samples[phase].append(seconds)
+
+    @contextmanager
+    def phase(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def laps(self) -> Laps:
+        return Laps(self)
+
+    # ── Reporting ────────────────────────────────────────────────────────────
+
+    def summary(self) -> dict:
+        out = {}
+        for phase, values in self.samples.items():
+            ordered = sorted(values)
+            out[phase] = {
+                "count": len(ordered),
+                "p50":   round(percentile(ordered, 50), 4),
+                "p95":   round(percentile(ordered, 95), 4),
+                "max":   round(ordered[-1], 4),
+                "total": round(sum(ordered), 4),
+            }
+        return out
+
+    def to_prometheus(self) -> str:
+        name = "ims_scraper_phase_seconds"
+        lines = [
+            f"# HELP {name} Duration of one phase of an IMS scrape operation.",
+            f"# TYPE {name} summary",
+        ]
+        max_lines = [
+            f"# HELP {name}_max Slowest observed duration of the phase.",
+            f"# TYPE {name}_max gauge",
+        ]
+        for phase, s in self.summary().items():
+            labels = f'scraper="{self.scraper}",phase="{phase}"'
+            lines.append(f'{name}{{{labels},quantile="0.5"}} {s["p50"]}')
+            lines.append(f'{name}{{{labels},quantile="0.95"}} {s["p95"]}')
+            lines.append(f"{name}_sum{{{labels}}} {s['total']}")
+            lines.append(f"{name}_count{{{labels}}} {s['count']}")
+            max_lines.append(f"{name}_max{{{labels}}} {s['max']}")
+        return "\n".join(lines + max_lines) + "\n"
+
+    def write(self, directory: Optional[str] = None) -> Optional[tuple[str, str]]:
+        """Write the JSON and Prometheus reports; returns their paths (None if nothing was timed)."""
+        if not self.samples:
+            return None
+        directory = directory or self.directory
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"{self.scraper}_phases.json")
+        prom_path = os.path.join(directory, f"{self.scraper}_phases.prom")
+
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "scraper":     self.scraper,
+                "started_at":  self.started_at.isoformat(),
+                "finished_at": datetime.now().isoformat(),
+                "phases":      self.summary(),
+            }, f, indent=2)
+        with open(prom_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+
+        print(f"⏱️  Phase timings saved to {json_path} (+ .prom)")
+        return json_path, prom_path
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print(f"⏱️  Phase timings ({self.scraper}):")
+        print(f"   {'phase':<18} {'n':>6} {'p50':>8} {'p95':>8} {'max':>8}")
+        for phase, s in sorted(summary.items(), key=lambda kv: -kv[1]["total"]):
+            print(f"   {phase:<18} {s['count']:>6} {s['p50']:>7.2f}s {s['p95']:>7.2f}s {s['max']:>7.2f}s")
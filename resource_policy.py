@@ -0,0 +1,170 @@
+"""
+resource_policy.py  ─  Network request filtering shared by all three scrapers.
+
+The IMS frameset pulls images, stylesheets and fonts on every Go, none of which
+the scrapers read. ResourcePolicy installs a `context.route` handler that
+
+  • always lets through URLs matching `allow_patterns` (the room / class /
+    faculty timetable frames and the Picker popup),
+  • blocks non-essential resource types and analytics hosts,
+  • counts what it blocked, per resource type.
+
+Blocked images are answered with a 1×1 GIF instead of being aborted, so
+clickable images such as img[title="Picker"] keep a non-zero size.
+
+Stylesheets served by the portal itself are let through: IMS hides and shows
+rows with CSS classes, and the parsers read innerText, which depends on them.
+Third-party stylesheets (CDN themes, web fonts) are still blocked.
+
+Bytes saved are only reported with `measure_bytes=True`. That mode sends one
+extra HEAD request, with the session cookies, per distinct blocked same-site
+URL, and IMS PHP endpoints often answer without a Content-Length, so it is
+off by default and meant for one-off measurements rather than real runs.
+
+Usage
+─────
+    policy = ResourcePolicy()
+    await policy.install(context)
+    ...
+    await policy.flush()
+    policy.print_summary()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import re
+from collections import Counter
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+DEFAULT_BLOCKED_TYPES = frozenset({
+    "image", "stylesheet", "font", "media", "manifest", "texttrack",
+})
+
+DEFAULT_TRACKER_PATTERNS = (
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"doubleclick\.net",
+    r"facebook\.(net|com)/tr",
+    r"hotjar\.com",
+    r"clarity\.ms",
+    r"statcounter\.com",
+)
+
+# Never block anything on these: the result frames and the picker popup
+DEFAULT_ALLOW_PATTERNS = (
+    r"timetable",
+    r"picker",
+)
+
+_PIXEL_GIF = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+
+
+class ResourcePolicy:
+    """Blocks non-essential requests on a browser context and keeps counts."""
+
+    def __init__(self,
+                 blocked_types: Iterable[str] = DEFAULT_BLOCKED_TYPES,
+                 tracker_patterns: Iterable[str] = DEFAULT_TRACKER_PATTERNS,
+                 allow_patterns: Iterable[str] = DEFAULT_ALLOW_PATTERNS,
+                 measure_bytes: bool = False,
+                 keep_site_stylesheets: bool = True):
+        self.blocked_types = frozenset(blocked_types)
+        self._tracker_re = re.compile("|".join(tracker_patterns), re.I) if tracker_patterns else None
+        self._allow_re   = re.compile("|".join(allow_patterns), re.I) if allow_patterns else None
+        self.measure_bytes = measure_bytes
+        self.keep_site_stylesheets = keep_site_stylesheets
+
+        self.allowed_requests = 0
+        self.blocked_by_type: Counter = Counter()
+        self._blocked_urls: Counter = Counter()
+        self._url_sizes: dict[str, int] = {}
+        self._size_tasks: dict[str, asyncio.Task] = {}
+        self._context = None
+        self._site: Optional[str] = None
+
+    # ── Installation ─────────────────────────────────────────────────────────
+
+    async def install(self, context):
+        self._context = context
+        await context.route("**/*", self._handle)
+
+    def _should_block(self, url: str, resource_type: str) -> Optional[str]:
+        """Return the reason to block ('tracker' or the resource type) or None."""
+        if self._allow_re and self._allow_re.search(url):
+            return None
+        if self._tracker_re and self._tracker_re.search(url):
+            return "tracker"
+        if resource_type == "stylesheet" and self.keep_site_stylesheets \
+                and urlparse(url).netloc == self._site:
+            return None
+        if resource_type in self.blocked_types:
+            return resource_type
+        return None
+
+    async def _handle(self, route, request):
+        url = request.url
+        if self._site is None and request.resource_type == "document":
+            self._site = urlparse(url).netloc
+
+        reason = self._should_block(url, request.resource_type)
+        if reason is None:
+            self.allowed_requests += 1
+            await route.continue_()
+            return
+
+        self.blocked_by_type[reason] += 1
+        self._blocked_urls[url] += 1
+        if self.measure_bytes and reason != "tracker" and url not in self._size_tasks \
+                and urlparse(url).netloc == self._site:
+            self._size_tasks[url] = asyncio.create_task(self._learn_size(url))
+
+        if request.resource_type == "image":
+            await route.fulfill(status=200, content_type="image/gif", body=_PIXEL_GIF)
+        else:
+            await route.abort()
+
+    async def _learn_size(self, url: str):
+        try:
+            resp = await self._context.request.head(url, timeout=5000)
+            self._url_sizes[url] = int(resp.headers.get("content-length", 0))
+        except Exception:
+            self._url_sizes[url] = 0
+
+    # ── Reporting ────────────────────────────────────────────────────────────
+
+    @property
+    def blocked_requests(self) -> int:
+        return sum(self.blocked_by_type.values())
+
+    @property
+    def bytes_saved(self) -> Optional[int]:
+        """Measured bytes not downloaded, or None when measure_bytes is off."""
+        if not self.measure_bytes:
+            return None
+        return sum(self._url_sizes.get(url, 0) * hits for url, hits in self._blocked_urls.items())
+
+    async def flush(self):
+        """Wait for outstanding size lookups so bytes_saved is complete."""
+        pending = [t for t in self._size_tasks.values() if not t.done()]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "allowed_requests": self.allowed_requests,
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_type":  dict(self.blocked_by_type),
+            "bytes_saved":      self.bytes_saved,
+        }
+
+    def print_summary(self):
+        total = self.allowed_requests + self.blocked_requests
+        pct = 100 * self.blocked_requests / total if total else 0.0
+        by_type = ", ".join(f"{k}={v}" for k, v in self.blocked_by_type.most_common())
+        saved = f"  ~{self.bytes_saved / 1024:.0f} KB saved" if self.measure_bytes else ""
+        print(f"🛡️  Requests blocked: {self.blocked_requests}/{total} ({pct:.1f}%)"
+              + saved
+              + (f"  [{by_type}]" if by_type else ""))
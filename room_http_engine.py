@@ -0,0 +1,249 @@
+"""
+room_http_engine.py  ─  Browserless replay of the RoomTimetable "Go" submit.
+
+After login, a room timetable is just a form POST (txtroom / txtroomcode + Go).
+RoomHttpEngine snapshots that form once from the live Playwright page, seeds
+an aiohttp cookie jar with the browser context's session cookies, and then
+replays the submit for every room over a pooled aiohttp session. The response
+HTML is parsed in Python by timetable_parser, so nothing is rendered.
+
+The form posts back to itself, so a redirect or a login page means the
+session cookie is no longer valid: the cookies are read again from the browser
+context (which may hold a renewed session) and the room is submitted once more.
+
+Usage (inside RoomTimetableScraper, after navigate_to_room_timetable):
+
+    engine = await RoomHttpEngine.from_page(page, form_frame, concurrency=8)
+    data   = await engine.scrape_room_timetable(room, "EVEN")
+    await engine.close()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from typing import Optional
+
+import aiohttp
+from yarl import URL
+
+from timetable_parser import is_empty_result, parse_room_timetable
+
+# Snapshot of the room form: action URL, method, every successful field, plus
+# the names of the room / room-code / semester controls and the Go button.
+_FORM_SNAPSHOT_JS = """
+() => {
+    const visible = document.getElementById('txtroom') || document.querySelector('input[name="room"]');
+    const form = (visible && visible.form) || document.querySelector('form');
+    if (!form) return null;
+
+    const hidden = document.getElementById('txtroomcode') || document.querySelector('input[name="roomcode"]');
+    const sem    = form.querySelector('select[name="semcmb"]');
+    const go     = form.querySelector('input[value="Go"]') || form.querySelector('input[type="submit"]');
+
+    const fields = [];
+    for (const [name, value] of new FormData(form).entries()) {
+        if (typeof value === 'string') fields.push([name, value]);
+    }
+    return {
+        action:      new URL(form.getAttribute('action') || '', document.baseURI).href,
+        method:      (form.getAttribute('method') || 'GET').toUpperCase(),
+        fields:      fields,
+        room_field:  visible ? (visible.name || visible.id) : null,
+        code_field:  hidden  ? (hidden.name  || hidden.id)  : null,
+        sem_field:   sem     ? sem.name : null,
+        submit:      (go && go.name) ? [go.name, go.value] : null,
+        referer:     document.location.href,
+        user_agent:  navigator.userAgent,
+    };
+}
+"""
+
+# The portal's login entry points: an answer showing one of them is not a result
+_LOGIN_PAGE_RE = re.compile(r'name="txtuserid"|value="Student Login"', re.I)
+
+
+class RoomHttpEngine:
+    """
+    Replays the room form submission with the browser session's cookies.
+
+    One aiohttp session (connection pool capped at `concurrency`) is shared by
+    every request, so RoomTimetableScraper's worker pool can drive it with
+    many concurrent rooms.
+
+    With a PacingController (pacing.py), each request uses its current timeout
+    and reports its latency, timeouts and HTTP errors back to it.
+
+    Cookies live in the session's cookie jar, so a cookie the portal sets on a
+    response is sent from then on. With a browser `context`, an expired session
+    re-reads the context's cookies once per expiry, shared by every request
+    that ran into it.
+    """
+
+    def __init__(self, snapshot: dict, cookies: list[dict],
+                 concurrency: int = 8, timeout_s: int = 15, pacing=None, context=None):
+        self.snapshot    = snapshot
+        self.concurrency = max(1, concurrency)
+        self.timeout_s   = timeout_s
+        self.pacing      = pacing
+        self._cookies    = cookies
+        self._context    = context
+        self._cookie_gen = 0   # bumped on every re-read from the context
+        self._resync_lock = asyncio.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    # ── Construction ─────────────────────────────────────────────────────────
+
+    @classmethod
+    async def from_page(cls, page, form_frame, concurrency: int = 8,
+                        timeout_s: int = 15, pacing=None) -> Optional["RoomHttpEngine"]:
+        """Snapshot the room form in `form_frame` and the cookies of `page.context`."""
+        try:
+            snapshot = await form_frame.evaluate(_FORM_SNAPSHOT_JS)
+        except Exception as e:
+            print(f"⚠️  Could not snapshot the room form: {e}")
+            return None
+        if not snapshot or not snapshot.get("room_field"):
+            print("⚠️  Room form not found — HTTP engine unavailable.")
+            return None
+
+        cookies = await page.context.cookies(snapshot["action"])
+        print(f"   🌐 HTTP engine: {snapshot['method']} {snapshot['action']} "
+              f"({len(cookies)} cookies, {concurrency} connections)")
+        return cls(snapshot, cookies, concurrency=concurrency, timeout_s=timeout_s, pacing=pacing,
+                   context=page.context)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout_s),
+                # unsafe: the portal may be addressed by IP, e.g. a local mock_portal
+                cookie_jar=aiohttp.CookieJar(unsafe=True),
+                headers={
+                    "User-Agent": self.snapshot["user_agent"],
+                    "Referer":    self.snapshot["referer"],
+                },
+            )
+            self._seed_cookies(self._cookies)
+        return self._session
+
+    def _seed_cookies(self, cookies: list[dict]):
+        """Put browser cookies (name / value dicts) into the jar, scoped to the form URL."""
+        self._session.cookie_jar.update_cookies(
+            {c["name"]: c["value"] for c in cookies}, response_url=URL(self.snapshot["action"]))
+
+    async def _resync_cookies(self, seen_gen: int) -> bool:
+        """
+        Re-read the session cookies from the browser context after a request
+        sent with generation `seen_gen` found the session expired. Requests
+        that hit the same expiry share one re-read. False without a context.
+        """
+        if self._context is None:
+            return False
+        async with self._resync_lock:
+            if self._cookie_gen == seen_gen:
+                try:
+                    self._cookies = await self._context.cookies(self.snapshot["action"])
+                except Exception as e:
+                    print(f"⚠️  Could not re-read the browser cookies: {e}")
+                    return False
+                self._seed_cookies(self._cookies)
+                self._cookie_gen += 1
+        return True
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    # ── Requests ─────────────────────────────────────────────────────────────
+
+    def _form_fields(self, room_value: str, room_text: str, semester: str) -> list[tuple[str, str]]:
+        snap = self.snapshot
+        overrides = {snap["room_field"]: room_text}
+        if snap.get("code_field"):
+            overrides[snap["code_field"]] = room_value
+        if snap.get("sem_field"):
+            overrides[snap["sem_field"]] = semester
+
+        fields = [(k, overrides.pop(k, v)) for k, v in snap["fields"]]
+        fields.extend(overrides.items())   # controls FormData skipped (e.g. empty selects)
+        if snap.get("submit"):
+            fields.append(tuple(snap["submit"]))
+        return fields
+
+    async def fetch_room_html(self, room_value: str, room_text: str, semester: str) -> Optional[str]:
+        """Submit the room form once; returns the response HTML or None on error."""
+        session = await self._get_session()
+        fields  = self._form_fields(room_value, room_text, semester)
+        method  = self.snapshot["method"]
+        url     = self.snapshot["action"]
+
+        pacing  = self.pacing
+        timeout = aiohttp.ClientTimeout(total=pacing.timeout_s if pacing else self.timeout_s)
+
+        async with self._semaphore:
+            for attempt in range(2):
+                seen_gen = self._cookie_gen
+                start = time.monotonic()
+                try:
+                    if method == "POST":
+                        resp_ctx = session.post(url, data=fields, timeout=timeout, allow_redirects=False)
+                    else:
+                        resp_ctx = session.get(url, params=fields, timeout=timeout, allow_redirects=False)
+                    async with resp_ctx as resp:
+                        status = resp.status
+                        html = await resp.text(errors="replace") if status == 200 else None
+                except asyncio.TimeoutError:
+                    print(f"⚠️  HTTP timeout for room {room_text}")
+                    if pacing:
+                        pacing.record_timeout()
+                    return None
+                except aiohttp.ClientError as e:
+                    print(f"⚠️  HTTP error for room {room_text}: {e}")
+                    if pacing:
+                        pacing.record_error()
+                    return None
+
+                if status in (301, 302, 303, 307, 308) or (html is not None and _LOGIN_PAGE_RE.search(html)):
+                    # Not the server being slow: no pacing report
+                    if attempt == 0 and await self._resync_cookies(seen_gen):
+                        print(f"🔑  Session expired — cookies re-read from the browser, retrying room {room_text}")
+                        continue
+                    print(f"⚠️  Session expired for room {room_text}")
+                    return None
+                if status != 200:
+                    print(f"⚠️  HTTP {status} for room {room_text}")
+                    if pacing:
+                        pacing.record_error()
+                    return None
+                break
+
+        if pacing:
+            pacing.record_success(time.monotonic() - start)
+        return html
+
+    async def scrape_room(self, room_identifier, semester: str = "EVEN") -> tuple[str, Optional[dict]]:
+        """Same contract as RoomTimetableScraper.scrape_room: ('ok' | 'empty' | 'error', data)."""
+        room_value = room_identifier if isinstance(room_identifier, str) else room_identifier['value']
+        room_text  = room_identifier if isinstance(room_identifier, str) else room_identifier.get('text', str(room_value))
+
+        html = await self.fetch_room_html(str(room_value), str(room_text), semester)
+        if html is None:
+            return "error", None
+
+        data = parse_room_timetable(html, room_text, semester)
+        if data and data.get("schedule"):
+            return "ok", data
+        if data is not None or is_empty_result(html):
+            return "empty", None
+        # Neither a timetable nor the no-record message: not an answer to trust
+        print(f"⚠️  Unrecognised response for room {room_text}")
+        return "error", None
+
+    async def scrape_room_timetable(self, room_identifier, semester: str = "EVEN") -> Optional[dict]:
+        """Same contract as RoomTimetableScraper.scrape_room_timetable, without a browser."""
+        _, data = await self.scrape_room(room_identifier, semester)
+        return data
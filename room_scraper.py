@@ -5,14 +5,136 @@ Scrapes availability data for ALL rooms by iterating through room numbers
 
 import asyncio
 from playwright.async_api import async_playwright
-import json
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 import re
+import time
+
+from pacing import PacingController
+from phase_timing import PhaseTimer
+from resource_policy import ResourcePolicy
+from storage import CatalogCache, NdjsonWriter, RoomCheckpoint, write_json_document
+from timetable_parser import EMPTY_RESULT_PATTERN, parse_room_timetable
+from worker_pages import open_worker_pages
 
 load_dotenv()
 
+# Fill, submit and wait for one room in a single evaluate() call.
+# The form is submitted into a hidden iframe (the "sink") so this frame never
+# navigates and the promise survives until the result is in. A MutationObserver
+# on both documents resolves as soon as a fresh plum table naming the room
+# appears, which also covers a portal that renders results in place. A result
+# page that only says "No Record Found" finishes it with 'empty' right away, as
+# does that message inserted (or written into existing text) in this document
+# after the submit.
+_FUSED_ROOM_SUBMIT_JS = """
+async ({roomText, roomVal, semester, timeoutMs, emptyPattern}) => {
+    const visible = document.getElementById('txtroom') || document.querySelector('input[name="room"]');
+    const form = visible && visible.form;
+    if (!form) return {status: 'no_form'};
+    const hidden = document.getElementById('txtroomcode') || document.querySelector('input[name="roomcode"]');
+    const sem = form.querySelector('select[name="semcmb"]');
+    const go = form.querySelector('input[value="Go"]') || form.querySelector('input[type="submit"]');
+
+    // Previous results in this document must not count as fresh
+    document.querySelectorAll('table').forEach(t => {
+        if (t.querySelector('.plum_fieldbig')) t.setAttribute('data-stale', '1');
+    });
+
+    if (sem && Array.from(sem.options).some(o => o.value === semester)) sem.value = semester;
+    visible.value = roomText;
+    visible.dispatchEvent(new Event('input', {bubbles: true}));
+    visible.dispatchEvent(new Event('change', {bubbles: true}));
+    if (hidden) hidden.value = roomVal;
+
+    let sink = document.getElementById('__ims_room_sink');
+    if (!sink) {
+        sink = document.createElement('iframe');
+        sink.id = sink.name = '__ims_room_sink';
+        sink.style.display = 'none';
+        document.body.appendChild(sink);
+    }
+
+    // Same rule as the click path: a non-stale plum table that names this room
+    // (or names no room at all)
+    const freshTable = (doc) => {
+        for (const table of doc.querySelectorAll('table')) {
+            if (table.getAttribute('data-stale') === '1') continue;
+            if (!table.querySelector('.plum_fieldbig') || table.querySelectorAll('tr').length <= 2) continue;
+            const text = (table.innerText || table.textContent || '').toUpperCase();
+            const want = String(roomText).toUpperCase();
+            if (text.split(/[^A-Z0-9-]+/).includes(want)) return true;
+            return !text.match(/ROOM\\s*(?:NO\\.?|NAME)?\\s*:\\s*([A-Z0-9]+-?[A-Z0-9]*)/);
+        }
+        return false;
+    };
+    const sinkDoc = () => {
+        const doc = sink.contentDocument;
+        return doc && doc.location.href !== 'about:blank' ? doc : null;
+    };
+    // The sink holds a new document per submit, so its no-record text is always this room's
+    const emptyRe = new RegExp(emptyPattern, 'i');
+    const emptyAnswer = (doc) => !!doc.body && emptyRe.test(doc.body.textContent || '');
+    // In this document only what changes after the submit counts: text already on it is an old answer
+    const skipped = ['SCRIPT', 'STYLE', 'SELECT', 'OPTION', 'IFRAME'];
+    const emptyInserted = (records) => records.some(r =>
+        Array.from(r.type === 'characterData' ? [r.target] : r.addedNodes).some(node =>
+            node.nodeType === Node.TEXT_NODE
+                ? !!node.parentNode && !skipped.includes(node.parentNode.nodeName) && emptyRe.test(node.data)
+                : node.nodeType === Node.ELEMENT_NODE && !skipped.includes(node.nodeName)
+                  && emptyRe.test(node.textContent || '')));
+
+    const start = performance.now();
+    return await new Promise(resolve => {
+        let done = false, sinkObserver = null;
+        const finish = (status, doc) => {
+            if (done) return;
+            done = true;
+            selfObserver.disconnect();
+            if (sinkObserver) sinkObserver.disconnect();
+            clearTimeout(timer);
+            sink.removeEventListener('load', onLoad);
+            doc = doc || sinkDoc() || document;
+            const html = doc.documentElement ? doc.documentElement.outerHTML : '';
+            if (doc !== document) sink.src = 'about:blank';   // stop the result page's scripts
+            resolve({status, html, elapsed_ms: performance.now() - start});
+        };
+        const check = () => {
+            const doc = sinkDoc();
+            if (doc && freshTable(doc)) return finish('ok', doc);
+            if (freshTable(document)) return finish('ok', document);
+            if (doc && emptyAnswer(doc)) finish('empty', doc);
+        };
+        const onLoad = () => {
+            const doc = sinkDoc();
+            if (!doc) return;
+            check();
+            if (!done && !sinkObserver) {
+                sinkObserver = new MutationObserver(check);
+                sinkObserver.observe(doc, {childList: true, subtree: true, characterData: true});
+            }
+        };
+        const selfObserver = new MutationObserver(records => {
+            check();
+            if (!done && emptyInserted(records)) finish('empty', document);
+        });
+        selfObserver.observe(document.body, {childList: true, subtree: true, characterData: true});
+        sink.addEventListener('load', onLoad);
+        const timer = setTimeout(() => finish('timeout'), timeoutMs);
+
+        const prevTarget = form.target;
+        form.target = sink.name;
+        try {
+            if (form.requestSubmit) form.requestSubmit(go || undefined);
+            else HTMLFormElement.prototype.submit.call(form);
+        } finally {
+            form.target = prevTarget;
+        }
+    });
+}
+"""
+
 
 class RoomTimetableScraper:
     def __init__(self, user_id: str = None, password: str = None, fin_year: str = "2025-26"):
@@ -24,6 +146,30 @@ class RoomTimetableScraper:
         # Define room ranges to scrape
         self.room_ranges = self.generate_room_ranges()
         
+        # Optional browserless backend (see room_http_engine.py), set up in run()
+        self.http_engine = None
+        
+        # Per-room resume journal (see storage.RoomCheckpoint), set up in run()
+        self.checkpoint = None
+        # Rooms of this run that ended in 'error' (timeout, lost session...): never journaled
+        self.failed_rooms = []
+        
+        # Rooms discovered from the Picker popup, cached on disk with a TTL
+        self.room_catalog = CatalogCache(fin_year, "rooms")
+        
+        # NDJSON stream of room records written while scraping (see storage.NdjsonWriter)
+        self.output_stream = None
+        
+        # Inter-room delay, worker count and Go timeout adapt to the portal (see pacing.py)
+        self.pacing = PacingController(timeout_s=5.0)
+        
+        # Per-phase durations of every room scrape (see phase_timing.py)
+        self.timing = PhaseTimer("room")
+        
+        # Fill + submit + wait in one evaluate() per room (falls back to clicking Go)
+        self.fused_submit = True
+        self._form_frames = {}
+        
     def generate_room_ranges(self):
         """
         Targets the entire fifth block: 5000-5040, 5100-5140, 5200-5240, 5300-5320
@@ -189,12 +335,20 @@ class RoomTimetableScraper:
             print("❌ Login check failed")
             return False
     
-    async def get_room_list(self, page):
+    async def get_room_list(self, page, refresh: bool = False):
         """
-        Discover available rooms from the 'Pick Room' popup
+        Discover available rooms from the 'Pick Room' popup.
+        The result is cached on disk (see storage.CatalogCache); the popup is only
+        opened when the cache is stale or refresh=True.
         """
         print("\n🔍 Discovering available rooms...")
+        if not refresh:
+            cached = self.room_catalog.load()
+            if cached:
+                return cached
+        
         rooms = []
+        complete = False
         
         try:
             # 1. Find the "Pick Room" button/link in the main page (likely in a frame)
@@ -253,7 +407,10 @@ class RoomTimetableScraper:
                     await pick_room_btn.click()
                 
                 popup_page = await popup_info.value
-                await popup_page.wait_for_load_state('networkidle')
+                await popup_page.wait_for_load_state('domcontentloaded')
+                # The list may still be filled in after DOMContentLoaded; a partial
+                # list must not be cached for the whole TTL
+                complete = await self._wait_for_stable_links(popup_page)
                 
                 # Debug: Dump popup content
                 try:
@@ -263,17 +420,21 @@ class RoomTimetableScraper:
                     print(f"📄 Saved popup content to ~/ims_scraper_outputs/room_list_popup.html")
                 except: pass
 
-                # 4. Scrape the list
+                # 4. Scrape the list — one evaluate per frame pulls every link at once
                 # The popup might have its own frames
-                for p_frame in [popup_page] + popup_page.frames:
-                    links = await p_frame.query_selector_all('a')
+                for p_frame in popup_page.frames:
+                    links = await p_frame.evaluate("""
+                        () => Array.from(document.querySelectorAll('a')).map(a => ({
+                            text: (a.innerText || '').trim(),
+                            href: a.getAttribute('href')
+                        }))
+                    """)
                     if links:
                         print(f"   Found {len(links)} links in popup frame: {getattr(p_frame, 'name', 'main')}")
                         
                         for link in links:
-                            text = await link.inner_text()
-                            text = text.strip()
-                            href = await link.get_attribute('href')
+                            text = link['text']
+                            href = link['href']
                             
                             # Usually: javascript:SetVal('108','G-108')
                             val = text
@@ -304,12 +465,40 @@ class RoomTimetableScraper:
             rooms = list(unique_rooms)
             
             print(f"   ✓ Discovered {len(rooms)} rooms.")
+            if complete:
+                self.room_catalog.save(rooms)
+            else:
+                print("   ⚠️  Popup link list never settled — room list used for this run only, not cached")
             return rooms
 
         except Exception as e:
             print(f"⚠️  Error in room discovery: {e}")
             return []
 
+    async def _wait_for_stable_links(self, popup_page, quiet_s: float = 1.0, timeout_s: float = None) -> bool:
+        """
+        Poll the number of links in the popup (all frames) until it has not changed
+        for quiet_s. Returns False when it was still changing after timeout_s.
+        """
+        timeout_s = timeout_s or self.pacing.timeout_s
+        start = changed_at = time.monotonic()
+        last = None
+        while True:
+            count = 0
+            for p_frame in popup_page.frames:
+                try:
+                    count += await p_frame.evaluate("() => document.querySelectorAll('a').length")
+                except Exception:
+                    pass  # frame mid-navigation
+            now = time.monotonic()
+            if count != last:
+                last, changed_at = count, now
+            elif count and now - changed_at >= quiet_s:
+                return True
+            if now - start >= timeout_s:
+                return False
+            await asyncio.sleep(0.25)
+    
     async def navigate_to_room_timetable(self, page):
         """Navigate to RoomTimetable page manually"""
         print("\n" + "="*60)
@@ -348,11 +537,130 @@ class RoomTimetableScraper:
         
         return True
 
+    async def find_room_form_frame(self, page):
+        """Return the frame hosting the txtroom/txtroomcode form, or None"""
+        for frame in page.frames:
+            try:
+                if await frame.query_selector('input[name="room"]') or \
+                   await frame.query_selector('input[id="txtroom"]'):
+                    return frame
+            except: continue
+        return None
+
+    async def open_worker_pages(self, page, count: int):
+        """
+        Open extra pages in the logged-in context, each loaded with the room form.
+        All pages share the session cookies of `page.context`, so no extra login is needed.
+        Returns the list of usable pages, starting with `page` itself.
+        """
+        pages = [page]
+        if count <= 1:
+            return pages
+
+        form_frame = await self.find_room_form_frame(page)
+        if not form_frame:
+            print("⚠️  Room form not found on the main page. Running with a single worker.")
+            return pages
+
+        async def ready(worker):
+            await self.bypass_all_protections(worker)
+            return await self.find_room_form_frame(worker)
+
+        extra = await open_worker_pages(page, form_frame.url, count, ready, form="room form")
+        return pages + [worker for worker, _ in extra]
+
     async def scrape_room_timetable(self, page, room_identifier, semester: str = "EVEN"):
         """
         Scrape timetable for a specific room
         room_identifier: can be a simple string (room number) or a dict {value, text} from dropdown
         """
+        _, data = await self.scrape_room(page, room_identifier, semester)
+        return data
+    
+    async def scrape_room(self, page, room_identifier, semester: str = "EVEN"):
+        """
+        Scrape one room and say how it went: (status, data) with status
+            'ok'    — data is the timetable
+            'empty' — the portal answered, and there is no timetable for this room
+            'error' — no answer to trust (timeout, missing form, lost session, exception)
+        """
+        if self.http_engine:
+            with self.timing.phase("http_request"):
+                return await self.http_engine.scrape_room(room_identifier, semester)
+        
+        if self.fused_submit:
+            status, data = await self._scrape_room_fused(page, room_identifier, semester)
+            if status is not None:
+                return status, data
+        return await self._scrape_room_by_click(page, room_identifier, semester)
+    
+    async def _room_form_frame(self, page):
+        """The room form frame of `page`, looked up once and reused until it detaches"""
+        frame = self._form_frames.get(page)
+        if frame is None or frame.is_detached():
+            frame = await self.find_room_form_frame(page)
+            self._form_frames[page] = frame
+        return frame
+    
+    async def _scrape_room_fused(self, page, room_identifier, semester: str):
+        """
+        One awaited call per room: _FUSED_ROOM_SUBMIT_JS fills the form, submits it
+        into a hidden iframe and resolves when the fresh table is there; the HTML it
+        returns is parsed in Python. Returns (status, data) as scrape_room does;
+        status None means the caller should fall back to the click path.
+        """
+        room_value = room_identifier if isinstance(room_identifier, str) else room_identifier['value']
+        room_text = room_identifier if isinstance(room_identifier, str) else room_identifier.get('text', str(room_value))
+        
+        laps = self.timing.laps()
+        frame = await self._room_form_frame(page)
+        laps.lap("frame_discovery")
+        if frame is None:
+            return None, None
+        
+        try:
+            result = await frame.evaluate(_FUSED_ROOM_SUBMIT_JS, {
+                'roomText':  str(room_text),
+                'roomVal':   str(room_value),
+                'semester':  semester,
+                'timeoutMs': self.pacing.timeout_ms,
+                'emptyPattern': EMPTY_RESULT_PATTERN,
+            })
+        except Exception as e:
+            print(f"   ⚠️  Fused submit failed for {room_text} ({e}); clicking Go instead")
+            self._form_frames.pop(page, None)
+            return None, None
+        laps.lap("fused_submit")
+        
+        if result.get('status') == 'no_form':
+            self._form_frames.pop(page, None)
+            return None, None
+        
+        if result['status'] == 'timeout':
+            self.pacing.record_timeout()
+            print(f"   ⚠️  Timeout waiting for data ({room_text})")
+            try:
+                with open(os.path.expanduser(f"~/ims_scraper_outputs/timeout_{room_text}.html"), "w") as f:
+                    f.write(result.get('html', ''))
+            except: pass
+            return 'error', None
+        
+        latency = result['elapsed_ms'] / 1000
+        self.pacing.record_success(latency)
+        if result['status'] == 'empty':
+            print(f"   📭 No record for {room_text} ({latency:.1f}s)")
+            return 'empty', None
+        timetable_data = parse_room_timetable(result['html'], room_text, semester)
+        laps.lap("extract")
+        print(f"   ✓ Loaded {room_text} ({latency:.1f}s)")
+        
+        if timetable_data and timetable_data.get('schedule'):
+            return 'ok', timetable_data
+        return 'empty', None
+    
+    async def _scrape_room_by_click(self, page, room_identifier, semester: str = "EVEN"):
+        """Fill the form field by field, click Go and wait for the table; (status, data) as scrape_room"""
+        laps = self.timing.laps()
         room_value = room_identifier if isinstance(room_identifier, str) else room_identifier['value']
         room_text = room_identifier if isinstance(room_identifier, str) else room_identifier.get('text', str(room_value))
         
@@ -370,6 +678,7 @@ class RoomTimetableScraper:
                         break
                     except: pass
             except: pass
+            laps.lap("semester_select")
             
             # Input Room
             input_found = False
@@ -387,15 +696,17 @@ class RoomTimetableScraper:
                     room_text = room_identifier['text'] if isinstance(room_identifier, dict) else str(room_identifier)
                     
                     print(f"   ✍️  Setting room to: {room_text}")
+                    laps.lap("frame_discovery")
                     
                     # Use JS to set values and CLEAR PREVIOUS RESULTS
                     await frame.evaluate(f"""
                         () => {{
-                            // Clear previous table if any to ensure we wait for NEW data
-                            const tables = document.querySelectorAll('table');
-                            tables.forEach(t => {{
-                                if (t.innerText.includes('TIME TABLE')) t.innerHTML = '<tr><td>Loading...</td></tr>';
+                            // Mark previous timetable as stale so we only accept NEW data
+                            document.querySelectorAll('table').forEach(t => {{
+                                if (t.querySelector('.plum_fieldbig')) t.setAttribute('data-stale', '1');
                             }});
+                            // ...and this document, so a "No Record Found" already on it is not the answer
+                            document.documentElement.setAttribute('data-stale', '1');
                             
                             // Set visible text
                             const visible = document.getElementById('txtroom') || document.querySelector('input[name="room"]');
@@ -412,13 +723,14 @@ class RoomTimetableScraper:
                             }}
                         }}
                     """)
+                    laps.lap("field_fill")
                     
                     input_found = True
                     break
             
             if not input_found:
                  print(f"⚠️  Could not find room input fields (txtroom/txtroomcode)")
-                 return None
+                 return 'error', None
 
             # Click Go button
             try:
@@ -427,59 +739,73 @@ class RoomTimetableScraper:
                 
                 if go_btn:
                     print("   🖱️  Clicking Go...")
+                    go_time = time.monotonic()
                     await go_btn.click()
                 else:
                     print("⚠️  Could not find Go button")
-                    return None
+                    return 'error', None
             except Exception as e:
                 print(f"⚠️  Error clicking Go: {e}")
-                return None
+                return 'error', None
+            laps.lap("go_click")
             
-            # --- Robust Wait for Data ---
-            # Increase wait time and poll for content
-            print("   ⏳ Waiting for data to load...", end=" ")
-            data_found = False
-            start_time = datetime.now()
-            
-            for i in range(5): # Max 5 seconds
-                await asyncio.sleep(1)
-                
-                # Check for table or "No data found"
-                if hasattr(target_frame, 'text_content'):
-                    text = await target_frame.text_content('body')
-                else:
-                    text = await target_frame.evaluate('document.body.innerText')
-                
-                # Look for a table with rows (excluding header-only and our "Loading..." placeholder)
-                table_check = await target_frame.evaluate("""
-                    () => {
-                        const tables = document.querySelectorAll('table');
-                        for (const table of tables) {
-                            // The timetable typically has cells with class 'plum_fieldbig'
-                            const hasPlumField = table.querySelector('.plum_fieldbig');
-                            const rows = table.querySelectorAll('tr');
-                            if (hasPlumField && rows.length > 2) {
-                                return true;
-                            }
+            # --- Wait for FRESH data ---
+            # The previous room's table was marked data-stale before Go, so a table only
+            # counts once it is unmarked AND (when the page names a room) names this room.
+            # This replaces the old fixed 8s sleep that guarded against 5115 being saved as 5116.
+            # A document the Go produced (no stale mark) that says "No Record Found" ends
+            # the wait at once with 'empty' instead of running into the timeout.
+            _FRESH_ROOM_TABLE_JS = """
+                ({roomText, emptyPattern}) => {
+                    let fresh = null;
+                    for (const table of document.querySelectorAll('table')) {
+                        if (table.getAttribute('data-stale') === '1') continue;
+                        // The timetable typically has cells with class 'plum_fieldbig'
+                        if (table.querySelector('.plum_fieldbig') && table.querySelectorAll('tr').length > 2) {
+                            fresh = table;
+                            break;
                         }
+                    }
+                    if (!fresh) {
+                        const root = document.documentElement;
+                        if (root && root.getAttribute('data-stale') !== '1' && document.body
+                            && new RegExp(emptyPattern, 'i').test(document.body.innerText || ''))
+                            return 'empty';
                         return false;
                     }
-                """)
-                
-                if table_check:
-                    data_found = True
-                    print(f"✓ Loaded ({i+1}s)")
-                    # Give it 9 extra seconds to be absolutely sure JS rendering is done and data is correct
-                    # User requested 9 odd seconds because data of 5115 is being stored in 5116
-                    await asyncio.sleep(8)
-                    break
-                
-                # Double check for "No data found" ONLY after a few seconds to avoid catching old state
-                if i > 5 and ('No data found' in text or 'not available' in text.lower()):
-                    print("✗ No data")
-                    return None
+                    
+                    // If the timetable names a room, it must be the one we asked for
+                    const text = (fresh.innerText || '').toUpperCase();
+                    const want = String(roomText).toUpperCase();
+                    if (text.split(/[^A-Z0-9-]+/).includes(want)) return true;
+                    const m = text.match(/ROOM\\s*(?:NO\\.?|NAME)?\\s*:\\s*([A-Z0-9]+-?[A-Z0-9]*)/);
+                    return !m;
+                }
+            """
+            
+            print("   ⏳ Waiting for data to load...", end=" ")
+            data_found = False
+            
+            try:
+                handle = await target_frame.wait_for_function(
+                    _FRESH_ROOM_TABLE_JS, arg={'roomText': room_text, 'emptyPattern': EMPTY_RESULT_PATTERN},
+                    polling=100, timeout=self.pacing.timeout_ms
+                )
+                outcome = await handle.json_value()
+                data_found = True
+                latency = time.monotonic() - go_time
+                self.pacing.record_success(latency)
+                if outcome == 'empty':
+                    laps.lap("wait")
+                    print(f"📭 No record ({latency:.1f}s)")
+                    return 'empty', None
+                print(f"✓ Loaded ({latency:.1f}s)")
+            except Exception:
+                pass
+            laps.lap("wait")
             
             if not data_found:
+                self.pacing.record_timeout()
                 print("⚠️  Timeout waiting for data")
                 # Dump content for debugging if it times out
                 try:
@@ -487,95 +813,26 @@ class RoomTimetableScraper:
                     with open(os.path.expanduser(f"~/ims_scraper_outputs/timeout_{room_text}.html"), "w") as f:
                         f.write(debug_content)
                 except: pass
-                return None
+                return 'error', None
             
             await self.bypass_all_protections(page)
+            laps.lap("bypass")
             
-            # Extract timetable data
-            timetable_data = await target_frame.evaluate(f"""
-                () => {{
-                    const data = {{
-                        room: "{room_text}",
-                        semester: "{semester}",
-                        year: null,
-                        schedule: {{}}
-                    }};
-                    
-                    // Find the timetable table using the plum_fieldbig class
-                    let table = null;
-                    const tables = document.querySelectorAll('table');
-                    for (const t of tables) {{
-                        if (t.querySelector('.plum_fieldbig')) {{
-                            table = t;
-                            break;
-                        }}
-                    }}
-                    
-                    if (!table) return null;
-                    
-                    // Extract room info from title if available
-                    const title = document.querySelector('body')?.textContent || '';
-                    const yearMatch = title.match(/Year\\s*:\\s*([\\d-]+)/i);
-                    if (yearMatch) data.year = yearMatch[1];
-                    
-                    const rows = Array.from(table.querySelectorAll('tr'));
-                    
-                    // Header row (contains T1, T2...)
-                    // Based on screenshot, headers are in a row with purple-ish background
-                    const headerRow = rows.find(r => r.innerText.includes('T1') || r.innerText.includes('T2'));
-                    if (!headerRow) return null;
-                    
-                    const timeSlots = [];
-                    headerRow.querySelectorAll('td, th').forEach((cell, idx) => {{
-                        if (idx > 0) {{ // Skip first column (day names)
-                            timeSlots.push(cell.textContent.trim());
-                        }}
-                    }});
-                    
-                    // Body rows
-                    const bodyRows = rows.filter(r => 
-                        r.innerText.includes('Mon') || 
-                        r.innerText.includes('Tue') || 
-                        r.innerText.includes('Wed') || 
-                        r.innerText.includes('Thu') || 
-                        r.innerText.includes('Fri') || 
-                        r.innerText.includes('Sat')
-                    );
-                    
-                    for (const row of bodyRows) {{
-                        const cells = Array.from(row.querySelectorAll('td, th'));
-                        if (cells.length === 0) continue;
-                        
-                        const day = cells[0].textContent.trim();
-                        data.schedule[day] = [];
-                        
-                        // Remaining cells are time slots
-                        for (let j = 1; j < cells.length && (j-1) < timeSlots.length; j++) {{
-                            const cell = cells[j];
-                            const text = cell.textContent.trim().replace(/\\s+/g, ' ');
-                            
-                            data.schedule[day].push({{
-                                time_slot: timeSlots[j-1],
-                                content: text,
-                                is_occupied: text.length > 5 // Heuristic: valid class info is longer than empty space
-                            }});
-                        }}
-                    }}
-                    
-                    return data;
-                }}
-            """)
+            # Extract timetable data (parsed in Python, see timetable_parser.py)
+            html = await target_frame.content()
+            timetable_data = parse_room_timetable(html, room_text, semester)
+            laps.lap("extract")
             
             if timetable_data and timetable_data.get('schedule'):
-                return timetable_data
+                return 'ok', timetable_data
             else:
-                return None
+                return 'empty', None
                 
         except Exception as e:
             print(f"⚠️  Error scraping room {room_text}: {e}")
-            return None
+            return 'error', None
 
-    async def scrape_all_rooms(self, page, semester: str = "EVEN"):
+    async def scrape_all_rooms(self, page, semester: str = "EVEN", worker_pages=None, refresh_rooms=False):
         """
         Iterate through all discovered rooms
         """
@@ -584,7 +841,7 @@ class RoomTimetableScraper:
         print("="*60 + "\n")
         
         # 1. Discover rooms first
-        discovered_rooms = await self.get_room_list(page)
+        discovered_rooms = await self.get_room_list(page, refresh=refresh_rooms)
         
         if not discovered_rooms:
             print("⚠️  No rooms discovered dynamically. Falling back to configured ranges.")
@@ -611,50 +868,132 @@ class RoomTimetableScraper:
             
             print(f"🎯 Filtered to {len(rooms_to_scrape)} rooms in target ranges.")
 
-        all_rooms_data = []
-        total_rooms = len(rooms_to_scrape)
+        all_rooms_data = await self.scrape_rooms(page, rooms_to_scrape, semester, worker_pages)
+        
+        print("\n" + "="*60)
+        print(f"✅ Scraping complete!")
+        print(f"   Total rooms checked: {len(rooms_to_scrape)}")
+        print(f"   Rooms with data: {len(all_rooms_data)}")
+        print("="*60 + "\n")
+        
+        return all_rooms_data
+
+    async def scrape_specific_rooms(self, page, room_numbers: list, semester: str = "EVEN", worker_pages=None):
+        # Room numbers provided here are simple strings/ints, which scrape_room_timetable handles.
+        print(f"\n📊 Scraping {len(room_numbers)} specific rooms...")
+        return await self.scrape_rooms(page, [str(r) for r in room_numbers], semester, worker_pages)
+
+    async def scrape_rooms(self, page, rooms: list, semester: str = "EVEN", worker_pages=None):
+        """
+        Scrape a list of rooms, either serially on `page` or with a pool of worker pages.
+        Results are returned in the order of `rooms`, whatever the number of workers.
+        Rooms already in self.checkpoint are taken from the journal instead of re-scraped.
+        """
+        results = [None] * len(rooms)
+        pending = list(range(len(rooms)))
+        
+        if self.checkpoint is not None:
+            pending = []
+            for idx, room in enumerate(rooms):
+                room_label = room['text'] if isinstance(room, dict) else room
+                if self.checkpoint.is_done(room_label):
+                    self._store_result(results, idx, self.checkpoint.get(room_label))
+                else:
+                    pending.append(idx)
+            if len(pending) < len(rooms):
+                print(f"   ⏭️  Resuming: {len(rooms) - len(pending)} rooms already captured, "
+                      f"{len(pending)} to go")
+        
+        if not worker_pages or len(worker_pages) <= 1:
+            await self._scrape_rooms_serial(page, rooms, pending, results, semester)
+        else:
+            await self._scrape_rooms_pooled(worker_pages, rooms, pending, results, semester)
+        
+        if self.output_stream is not None:
+            # Records live on disk; iterating the stream yields them in room order
+            return self.output_stream
+        return [r for r in results if r]
+
+    def _store_result(self, results: list, idx: int, room_data):
+        """Keep a room result: streamed to disk when an output stream is open, else in memory"""
+        if room_data and self.output_stream is not None:
+            self.output_stream.write(room_data, key=idx)
+            results[idx] = True
+        else:
+            results[idx] = room_data
+
+    async def _scrape_one_room(self, page, room, semester: str):
+        """
+        Scrape one room and append the outcome to the checkpoint journal. Errors are
+        not journaled, so a resumed run tries those rooms again.
+        """
+        with self.timing.phase("room_total"):
+            status, room_data = await self.scrape_room(page, room, semester)
+        room_label = room['text'] if isinstance(room, dict) else room
+        if status == 'error':
+            self.failed_rooms.append(room_label)
+        elif self.checkpoint is not None:
+            self.checkpoint.record(room_label, room_data)
+        return room_data
+
+    async def _scrape_rooms_serial(self, page, rooms: list, pending: list, results: list, semester: str):
+        total_rooms = len(rooms)
         
-        for idx, room in enumerate(rooms_to_scrape, 1):
+        for idx in pending:
+            room = rooms[idx]
             room_label = room['text'] if isinstance(room, dict) else room
-            print(f"   [{idx}/{total_rooms}] Room {room_label}...", end=" ")
+            print(f"   [{idx + 1}/{total_rooms}] Room {room_label}...", end=" ")
             
-            room_data = await self.scrape_room_timetable(page, room, semester)
+            room_data = await self._scrape_one_room(page, room, semester)
+            self._store_result(results, idx, room_data)
             
             if room_data:
-                all_rooms_data.append(room_data)
                 print(f"✓ Found data")
             else:
                 print(f"✗ No data")
             
-            # Small delay to avoid overwhelming the server
-            await page.wait_for_timeout(200)
+            # Adaptive delay to avoid overwhelming the server
+            await self.pacing.pause()
+
+    async def _scrape_rooms_pooled(self, worker_pages: list, rooms: list, pending: list, results: list, semester: str):
+        """
+        Worker pool: every page pulls the next room from a shared queue.
+        Each result is stored at the room's original index, so the merged list
+        does not depend on which worker finished first.
+        Only the first self.pacing.workers pages take rooms at any time; the rest
+        wait until the controller allows more parallelism.
+        """
+        total_rooms = len(rooms)
+        self.pacing.max_workers = min(self.pacing.max_workers, len(worker_pages))
+        self.pacing.workers = min(self.pacing.workers, self.pacing.max_workers)
+        print(f"   🧵 Using {self.pacing.workers} of {len(worker_pages)} workers for {len(pending)} rooms")
         
-        print("\n" + "="*60)
-        print(f"✅ Scraping complete!")
-        print(f"   Total rooms checked: {total_rooms}")
-        print(f"   Rooms with data: {len(all_rooms_data)}")
-        print("="*60 + "\n")
+        queue = asyncio.Queue()
+        for idx in pending:
+            queue.put_nowait(idx)
         
-        return all_rooms_data
-
-    async def scrape_specific_rooms(self, page, room_numbers: list, semester: str = "EVEN"):
-        # ... logic is similar, just using the passed list directly ...
-        # For simplicity, we assume room_numbers provided here are simple strings/ints
-        # which scrape_room_timetable handles.
+        async def worker(worker_id, worker_page):
+            while True:
+                if not self.pacing.allows(worker_id) and not queue.empty():
+                    await asyncio.sleep(max(self.pacing.delay_s, 0.5))
+                    continue
+                try:
+                    idx = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                room = rooms[idx]
+                room_label = room['text'] if isinstance(room, dict) else room
+                
+                room_data = await self._scrape_one_room(worker_page, room, semester)
+                self._store_result(results, idx, room_data)
+                
+                status = "✓ Found data" if room_data else "✗ No data"
+                print(f"   [{idx + 1}/{total_rooms}] (w{worker_id}) Room {room_label}... {status}")
+                
+                # Adaptive delay to avoid overwhelming the server
+                await self.pacing.pause()
         
-        # Re-implementing simplified loop to match updated scrape_room_timetable signature
-        print(f"\n📊 Scraping {len(room_numbers)} specific rooms...")
-        all_rooms_data = []
-        for idx, room_num in enumerate(room_numbers, 1):
-            print(f"   [{idx}/{len(room_numbers)}] Room {room_num}...", end=" ")
-            room_data = await self.scrape_room_timetable(page, str(room_num), semester)
-            if room_data:
-                all_rooms_data.append(room_data)
-                print(f"✓")
-            else:
-                print(f"✗")
-            await page.wait_for_timeout(200)
-        return all_rooms_data
+        await asyncio.gather(*(worker(i, p) for i, p in enumerate(worker_pages)))
     
     async def analyze_availability(self, rooms_data):
         """
@@ -720,37 +1059,81 @@ class RoomTimetableScraper:
         
         return analysis
     
+    def output_path(self, filename):
+        # Use user's home directory
+        home_dir = os.path.expanduser("~")
+        return os.path.join(home_dir, "ims_scraper_outputs", filename)
+    
     async def save_data(self, rooms_data, analysis, filename='rooms_complete_data.json'):
-        """Save all scraped data and analysis"""
-        output = {
+        """
+        Save all scraped data and analysis.
+        rooms_data may be a list or the NDJSON output stream; records are copied
+        into the document one at a time, so the stream is never loaded whole.
+        """
+        header = {
             'timestamp': datetime.now().isoformat(),
             'user_id': self.user_id,
             'fin_year': self.fin_year,
             'total_rooms': len(rooms_data),
             'analysis': analysis,
-            'rooms': rooms_data
         }
         
-        # Use user's home directory
-        home_dir = os.path.expanduser("~")
-        output_path = os.path.join(home_dir, "ims_scraper_outputs", filename)
+        output_path = self.output_path(filename)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+            write_json_document(f, header, 'rooms', rooms_data)
         
         print(f"💾 Data saved to {output_path}")
         return output_path
     
-    async def run(self, mode='all', room_list=None, headless=False, semester="EVEN"):
+    async def setup_http_engine(self, page, concurrency: int = 8):
+        """Switch scrape_room_timetable to the browserless HTTP replay backend"""
+        from room_http_engine import RoomHttpEngine
+        
+        form_frame = await self.find_room_form_frame(page)
+        if not form_frame:
+            print("⚠️  Room form not found. Staying on the browser engine.")
+            return False
+        self.http_engine = await RoomHttpEngine.from_page(page, form_frame, concurrency=concurrency,
+                                                          pacing=self.pacing)
+        return self.http_engine is not None
+    
+    async def run(self, mode='all', room_list=None, headless=False, semester="EVEN", concurrency=1,
+                  max_concurrency=None, engine='browser', resume=True, retry_empty=False, resume_max_age_hours=24,
+                  refresh_rooms=False, block_resources=True, stream_output=True, fused_submit=True):
         """
         Main execution
         mode: 'all' to scrape all rooms, 'specific' to scrape room_list
+        concurrency: number of pages (or HTTP connections) scraping rooms in parallel (1 = serial)
+        max_concurrency: upper bound the pacing controller may grow the worker count to
+                         (defaults to concurrency; it shrinks it on timeouts either way)
+        engine: 'browser' to click Go in the page, 'http' to replay the form submit without rendering
+        resume: skip rooms already journaled for this fin_year + semester by an unfinished sweep
+        retry_empty: when resuming, scrape again rooms that previously returned no data
+        resume_max_age_hours: journal entries older than this are scraped again (None = no limit)
+        refresh_rooms: re-open the Picker popup even if the room catalog cache is fresh
+        block_resources: skip images, stylesheets, fonts and analytics (see resource_policy.py)
+        stream_output: append each room to rooms_complete_data.ndjson as soon as it is scraped
+        fused_submit: fill, submit and wait for each room in one in-page call (False = click Go step by step)
         """
         print("\n" + "="*60)
         print("🚀 IMS ROOM TIMETABLE SCRAPER")
         print("="*60 + "\n")
         
+        self.fused_submit = fused_submit
+        concurrency = max(1, concurrency)
+        pool_size = max(concurrency, max_concurrency or concurrency)
+        self.pacing.workers = concurrency
+        self.pacing.max_workers = pool_size
+        
+        if resume:
+            self.checkpoint = RoomCheckpoint(self.fin_year, semester, retry_empty=retry_empty,
+                                             max_age_hours=resume_max_age_hours)
+        if stream_output:
+            self.output_stream = NdjsonWriter(self.output_path('rooms_complete_data.ndjson'))
+            print(f"📝 Streaming room records to {self.output_stream.path}")
+        
         async with async_playwright() as p:
             browser = await p.chromium.launch(
                 headless=headless,
@@ -773,6 +1156,10 @@ class RoomTimetableScraper:
                 });
             """)
             
+            self.resource_policy = ResourcePolicy() if block_resources else None
+            if self.resource_policy:
+                await self.resource_policy.install(context)
+            
             page = await context.new_page()
             
             try:
@@ -784,11 +1171,17 @@ class RoomTimetableScraper:
                 # Navigate to room timetable
                 await self.navigate_to_room_timetable(page)
                 
+                # Extra pages (or HTTP connections) share the logged-in session
+                if engine == 'http' and await self.setup_http_engine(page, pool_size):
+                    worker_pages = [page] * pool_size
+                else:
+                    worker_pages = await self.open_worker_pages(page, pool_size)
+                
                 # Scrape based on mode
                 if mode == 'specific' and room_list:
-                    rooms_data = await self.scrape_specific_rooms(page, room_list, semester)
+                    rooms_data = await self.scrape_specific_rooms(page, room_list, semester, worker_pages)
                 else:
-                    rooms_data = await self.scrape_all_rooms(page, semester)
+                    rooms_data = await self.scrape_all_rooms(page, semester, worker_pages, refresh_rooms)
                 
                 # Analyze data
                 analysis = await self.analyze_availability(rooms_data)
@@ -796,6 +1189,18 @@ class RoomTimetableScraper:
                 # Save everything
                 await self.save_data(rooms_data, analysis)
                 
+                # A finished full sweep must not be served to the next run; a sweep with
+                # failed rooms keeps its journal so the next run retries only those
+                if self.failed_rooms:
+                    print(f"⚠️  {len(self.failed_rooms)} rooms failed (timeout, lost session...): "
+                          f"{', '.join(self.failed_rooms[:10])}{' ...' if len(self.failed_rooms) > 10 else ''}")
+                    if self.checkpoint is not None:
+                        print("   Re-run with resume=True to retry only those")
+                elif self.checkpoint is not None and not (mode == 'specific' and room_list):
+                    done_path = self.checkpoint.rotate()
+                    if done_path:
+                        print(f"📦 Sweep complete, checkpoint moved to {done_path}")
+                
                 # Print summary
                 print("\n" + "="*60)
                 print("📊 SUMMARY")
@@ -807,6 +1212,12 @@ class RoomTimetableScraper:
                 print(f"\nLeast available rooms:")
                 for room in analysis['least_available_rooms'][:5]:
                     print(f"  Room {room['room']}: {room['availability_percentage']}% available")
+                print()
+                self.timing.print_summary()
+                self.pacing.print_summary()
+                if self.resource_policy:
+                    await self.resource_policy.flush()
+                    self.resource_policy.print_summary()
                 print("="*60 + "\n")
                 
                 if not headless:
@@ -818,6 +1229,12 @@ class RoomTimetableScraper:
                 import traceback
                 traceback.print_exc()
             finally:
+                self.timing.write()
+                if self.http_engine:
+                    await self.http_engine.close()
+                    self.http_engine = None
+                if self.output_stream is not None:
+                    self.output_stream.close()
                 if headless:
                     await browser.close()
 
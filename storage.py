@@ -0,0 +1,569 @@
+"""
+storage.py  ─  On-disk persistence helpers for the IMS scrapers.
+
+Responsibilities
+────────────────
+1. RoomCheckpoint: an append-only NDJSON journal of per-room results so a
+   crashed room sweep can resume where it stopped.
+2. CatalogCache: a list crawled from a Picker popup (the {value, text} rooms,
+   or the {code, name} faculties, so faculties are submitted without opening
+   it), with a TTL and a version stamp.
+3. NdjsonWriter + write_json_document: stream one compact record per line while
+   scraping, then build the final summary document from that stream.
+4. ClassManifest: a SQLite index of finished class-timetable combinations, so
+   resume checks are dictionary lookups instead of one stat() per combination.
+5. ClassSlotStore: all class timetables in one SQLite table, one row per slot.
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import IO, Iterable, Iterator, Optional
+
+_OUTPUT_ROOT = os.path.expanduser("~/ims_scraper_outputs")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1.  Room checkpoint journal
+# ─────────────────────────────────────────────────────────────────────────────
+
+_DEFAULT_CHECKPOINT_DIR = os.path.join(_OUTPUT_ROOT, "checkpoints")
+
+
+class RoomCheckpoint:
+    """
+    One NDJSON file per (fin_year, semester). Every finished room appends one line:
+
+        {"fin_year": "2025-26", "semester": "EVEN", "room": "5115",
+         "status": "ok" | "empty", "scraped_at": "...", "data": {...} | null}
+
+    "empty" means the portal answered that the room has no timetable; rooms that
+    failed (timeout, lost session...) are never journaled, so a resumed run
+    retries them.
+
+    Lines are flushed and fsync'ed as they are written, so at most the room in
+    flight is lost on a crash. A truncated last line is ignored on load.
+
+    The journal only bridges interrupted sweeps: with max_age_hours set, older
+    lines are ignored on load, and rotate() moves the file aside once a sweep
+    has finished, so the next run starts from an empty journal.
+    """
+
+    def __init__(self, fin_year: str, semester: str,
+                 directory: str = _DEFAULT_CHECKPOINT_DIR, retry_empty: bool = False,
+                 max_age_hours: Optional[float] = None):
+        self.fin_year      = fin_year
+        self.semester      = semester
+        self.retry_empty   = retry_empty
+        self.max_age_hours = max_age_hours
+        self.path = os.path.join(directory, f"rooms_{fin_year}_{semester}.ndjson")
+        self._entries: dict[str, dict] = {}
+        self._load()
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        bad = expired = 0
+        with open(self.path, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    bad += 1   # partial line from an interrupted write
+                    continue
+                if entry.get("fin_year") != self.fin_year or entry.get("semester") != self.semester:
+                    continue
+                if self._is_expired(entry):
+                    expired += 1
+                    continue
+                self._entries[str(entry["room"])] = {"status": entry["status"], "offset": offset}
+        print(f"📖  Room checkpoint loaded: {len(self._entries)} rooms from {self.path}"
+              + (f" ({bad} unreadable lines skipped)" if bad else "")
+              + (f" ({expired} older than {self.max_age_hours}h ignored)" if expired else ""))
+
+    def _is_expired(self, entry: dict) -> bool:
+        if self.max_age_hours is None:
+            return False
+        try:
+            scraped_at = datetime.fromisoformat(entry["scraped_at"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return True
+        return time.time() - scraped_at > self.max_age_hours * 3600
+
+    def record(self, room: str, data: Optional[dict]):
+        """Append the result for one room (data=None means no timetable)."""
+        entry = {
+            "fin_year":   self.fin_year,
+            "semester":   self.semester,
+            "room":       str(room),
+            "status":     "ok" if data else "empty",
+            "scraped_at": datetime.now().isoformat(),
+            "data":       data,
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            if offset and not self._ends_with_newline():
+                f.write(b"\n")   # close a line truncated by a crash
+                offset += 1
+            f.write((json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        # Only the status and the line's offset are kept in memory; get() reads the data back
+        self._entries[str(room)] = {"status": entry["status"], "offset": offset}
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def rotate(self) -> Optional[str]:
+        """
+        Move the journal aside after a finished sweep (kept as
+        rooms_<fin_year>_<semester>.<timestamp>.done.ndjson) and forget its
+        entries. Returns the new path, or None when there was nothing to move.
+        """
+        self._entries.clear()
+        if not os.path.exists(self.path):
+            return None
+        done_path = f"{self.path[:-len('.ndjson')]}.{datetime.now():%Y%m%d-%H%M%S}.done.ndjson"
+        os.replace(self.path, done_path)
+        return done_path
+
+    # ── Querying ─────────────────────────────────────────────────────────────
+
+    def is_done(self, room: str) -> bool:
+        entry = self._entries.get(str(room))
+        if entry is None:
+            return False
+        return entry["status"] == "ok" or not self.retry_empty
+
+    def get(self, room: str) -> Optional[dict]:
+        """The stored timetable of `room`, read back from its journal line."""
+        entry = self._entries.get(str(room))
+        if entry is None or entry["status"] != "ok":
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(entry["offset"])
+            return json.loads(f.readline()).get("data")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2.  Picker catalog cache (rooms, faculties)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Bump when the shape of a catalog entry or the way it is extracted changes;
+# older files are then treated as stale.
+ROOM_CATALOG_VERSION    = 1
+FACULTY_CATALOG_VERSION = 1
+
+# kind → (label, default file, version); the kind is also the JSON key of the list
+_CATALOGS = {
+    "rooms":     ("Room",    "room_catalog.json",    ROOM_CATALOG_VERSION),
+    "faculties": ("Faculty", "faculty_catalog.json", FACULTY_CATALOG_VERSION),
+}
+
+
+class CatalogCache:
+    """
+    Persists a list crawled from a Picker popup so the popup only has to be
+    opened when the cache is missing, stale (older than ttl_hours), written by a
+    different catalog version, or for another fin_year:
+
+      • kind="rooms": the 'Pick Room' list;
+      • kind="faculties": the 'Pick Faculty' list. With it the scraper fills the
+        hidden faculty code and the visible name itself and clicks Proceed,
+        instead of opening the popup and searching once per faculty.
+
+    Schema
+    ──────
+    {
+      "version":  1,
+      "fin_year": "2025-26",
+      "saved_at": 1735689600.0,
+      "rooms":    [ {"value": "108", "text": "G-108"}, ... ]
+                  (or "faculties": [ {"code": "F001", "name": "DR. ANITA SHARMA"}, ... ])
+    }
+    """
+
+    def __init__(self, fin_year: str, kind: str, path: Optional[str] = None, ttl_hours: float = 24 * 7):
+        if kind not in _CATALOGS:
+            raise ValueError(f"Unknown catalog kind {kind!r}; expected one of {sorted(_CATALOGS)}")
+        self.label, filename, self.version = _CATALOGS[kind]
+        self.fin_year  = fin_year
+        self.kind      = kind
+        self.path      = path or os.path.join(_OUTPUT_ROOT, filename)
+        self.ttl_hours = ttl_hours
+
+    def load(self) -> Optional[list[dict]]:
+        """Return the cached entries, or None when the cache is missing or stale."""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️   Could not read {self.label.lower()} catalog cache: {e}")
+            return None
+
+        if data.get("version") != self.version or data.get("fin_year") != self.fin_year:
+            return None
+        age_h = (time.time() - data.get("saved_at", 0)) / 3600
+        if age_h > self.ttl_hours:
+            return None
+        entries = data.get(self.kind) or None
+        if entries:
+            print(f"📖  {self.label} catalog cache: {len(entries)} {self.kind} ({age_h:.1f}h old) from {self.path}")
+        return entries
+
+    def save(self, entries: list[dict]):
+        if not entries:
+            return   # never cache a failed discovery
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version":  self.version,
+                    "fin_year": self.fin_year,
+                    "saved_at": time.time(),
+                    self.kind:  entries,
+                }, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"⚠️   Could not save {self.label.lower()} catalog cache: {e}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3.  Streaming NDJSON output
+# ─────────────────────────────────────────────────────────────────────────────
+
+class NdjsonWriter:
+    """
+    Append-only NDJSON stream: one compact JSON record per line, flushed as it is
+    written so other processes (e.g. analyze_rooms.py) can tail it mid-run.
+
+    Only (key, byte offset) pairs stay in memory. Iterating the writer reads the
+    records back from disk ordered by key, so a pool of workers can write in
+    completion order while the final document keeps a deterministic order.
+    """
+
+    def __init__(self, path: str, truncate: bool = True):
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._f: IO[bytes] = open(self.path, "wb" if truncate else "ab")
+        self._index: list[tuple] = []
+
+    def write(self, record: dict, key=None):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        offset = self._f.tell()
+        self._f.write(line.encode("utf-8"))
+        self._f.flush()
+        self._index.append((len(self._index) if key is None else key, offset))
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[dict]:
+        if not self._f.closed:
+            self._f.flush()
+        with open(self.path, "rb") as f:
+            for _, offset in sorted(self._index, key=lambda kv: kv[0]):
+                f.seek(offset)
+                yield json.loads(f.readline())
+
+
+def read_ndjson(path: str) -> Iterator[dict]:
+    """Yield records from an NDJSON file, skipping a partially written last line."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def write_json_document(f: IO[str], header: dict, list_key: str, records: Iterable[dict]):
+    """
+    Write `{**header, list_key: [records...]}` to `f` without holding the records
+    in memory: the header is indented as before, each record is one compact line.
+    """
+    head = json.dumps(header, indent=2, ensure_ascii=False)
+    f.write(head[:-2] + ",\n" if header else "{\n")
+    f.write(f"  {json.dumps(list_key)}: [")
+    first = True
+    for record in records:
+        f.write("\n    " if first else ",\n    ")
+        f.write(json.dumps(record, ensure_ascii=False))
+        first = False
+    f.write("]\n}\n" if first else "\n  ]\n}\n")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 4.  Class timetable manifest
+# ─────────────────────────────────────────────────────────────────────────────
+
+_DEFAULT_MANIFEST_PATH = os.path.join(_OUTPUT_ROOT, "classes_manifest.sqlite")
+
+
+def content_hash(value) -> str:
+    """sha256 of the canonical JSON form of `value`."""
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ClassManifest:
+    """
+    One SQLite table of finished (semester, section, department, degree, spec)
+    combinations per fin_year. It is read into memory once; every save commits
+    its row in its own transaction, after the output file is in place.
+
+    Table
+    ─────
+    combos(fin_year, semester, section, department, degree, spec,   -- primary key
+           path, content_hash, scraped_at)                          -- scraped_at: epoch seconds
+
+    With max_age_hours set, entries older than that count as not done, so they
+    are scraped again (and their row replaced).
+    """
+
+    def __init__(self, fin_year: str, path: str = _DEFAULT_MANIFEST_PATH,
+                 max_age_hours: Optional[float] = None):
+        self.fin_year      = fin_year
+        self.path          = path
+        self.max_age_hours = max_age_hours
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS combos (
+                    fin_year     TEXT NOT NULL,
+                    semester     TEXT NOT NULL,
+                    section      TEXT NOT NULL,
+                    department   TEXT NOT NULL,
+                    degree       TEXT NOT NULL,
+                    spec         TEXT NOT NULL,
+                    path         TEXT,
+                    content_hash TEXT,
+                    scraped_at   REAL,
+                    PRIMARY KEY (fin_year, semester, section, department, degree, spec)
+                )
+            """)
+        self._entries: dict[tuple, tuple[Optional[str], float]] = {}
+        self._load()
+
+    @staticmethod
+    def key(sem, section, dept, degree, spec) -> tuple:
+        return (str(sem), str(section), str(dept), str(degree), str(spec))
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def _load(self):
+        rows = self._conn.execute(
+            "SELECT semester, section, department, degree, spec, content_hash, scraped_at "
+            "FROM combos WHERE fin_year = ?", (self.fin_year,)
+        )
+        for sem, section, dept, degree, spec, digest, scraped_at in rows:
+            self._entries[(sem, section, dept, degree, spec)] = (digest, scraped_at or 0.0)
+        if self._entries:
+            print(f"📖  Class manifest loaded: {len(self._entries)} combinations from {self.path}")
+
+    def _write(self, rows: list[tuple]):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO combos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def record(self, record: dict, path: str) -> str:
+        """Add / replace the entry for a saved class record; returns its content hash."""
+        key = self.key(record["semester"], record["section"],
+                       record["department"], record["degree"], record["spec"])
+        digest = content_hash(record.get("timetable"))
+        scraped_at = time.time()
+        self._write([(self.fin_year, *key, path, digest, scraped_at)])
+        self._entries[key] = (digest, scraped_at)
+        return digest
+
+    def import_directory(self, directory: str) -> int:
+        """
+        Index class JSON files saved before the manifest existed (one pass, one
+        transaction). Files from another fin_year are left out.
+        """
+        rows = []
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    record = json.load(f)
+                if record.get("fin_year", self.fin_year) != self.fin_year:
+                    continue
+                key = self.key(record["semester"], record["section"],
+                               record["department"], record["degree"], record["spec"])
+            except Exception:
+                continue
+            if key in self._entries:
+                continue
+            digest, scraped_at = content_hash(record.get("timetable")), os.path.getmtime(path)
+            rows.append((self.fin_year, *key, path, digest, scraped_at))
+            self._entries[key] = (digest, scraped_at)
+        if rows:
+            self._write(rows)
+            print(f"📖  Class manifest: indexed {len(rows)} existing files from {directory}")
+        return len(rows)
+
+    def close(self):
+        self._conn.close()
+
+    # ── Querying ─────────────────────────────────────────────────────────────
+
+    def is_done(self, sem, section, dept, degree, spec) -> bool:
+        entry = self._entries.get(self.key(sem, section, dept, degree, spec))
+        if entry is None:
+            return False
+        if self.max_age_hours is None:
+            return True
+        return (time.time() - entry[1]) / 3600 <= self.max_age_hours
+
+    def get_hash(self, sem, section, dept, degree, spec) -> Optional[str]:
+        entry = self._entries.get(self.key(sem, section, dept, degree, spec))
+        return entry[0] if entry else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 5.  Class timetable slot store
+# ─────────────────────────────────────────────────────────────────────────────
+
+_DEFAULT_SLOT_STORE_PATH = os.path.join(_OUTPUT_ROOT, "classes.sqlite")
+
+_SLOT_COLUMNS = (
+    "fin_year", "semester", "section", "department", "degree", "spec",
+    "block", "day", "slot", "time_range", "content", "is_free", "scraped_at",
+)
+
+
+class ClassSlotStore:
+    """
+    Every class timetable in one SQLite table with one normalized row per slot,
+    instead of one JSON file per combination:
+
+        class_slots(fin_year, semester, section, department, degree, spec,
+                    block, day, slot,                -- primary key
+                    time_range, content, is_free, scraped_at)
+
+    Indexed on (semester, section, department, degree, day, slot) and on
+    (day, slot), so "who is busy on Mon T3" across all classes is one scan.
+    A combination is replaced as a whole, in one transaction, when re-saved.
+
+        store = ClassSlotStore()
+        busy = store.iter_slots(day="Mon", slot="T3", is_free=0)
+    """
+
+    def __init__(self, path: str = _DEFAULT_SLOT_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS class_slots (
+                    fin_year   TEXT    NOT NULL,
+                    semester   INTEGER NOT NULL,
+                    section    INTEGER NOT NULL,
+                    department TEXT    NOT NULL,
+                    degree     TEXT    NOT NULL,
+                    spec       TEXT    NOT NULL,
+                    block      TEXT    NOT NULL,
+                    day        TEXT    NOT NULL,
+                    slot       TEXT    NOT NULL,
+                    time_range TEXT,
+                    content    TEXT,
+                    is_free    INTEGER NOT NULL,
+                    scraped_at TEXT,
+                    PRIMARY KEY (fin_year, semester, section, department, degree, spec, block, day, slot)
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_class_slots_class "
+                "ON class_slots (semester, section, department, degree, day, slot)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_class_slots_day_slot ON class_slots (day, slot)"
+            )
+
+    @staticmethod
+    def rows_for(record: dict) -> list[tuple]:
+        """Flatten one class record (as saved to JSON) into class_slots rows."""
+        head = (record.get("fin_year"), int(record["semester"]), int(record["section"]),
+                record["department"], record["degree"], record["spec"])
+        rows = []
+        for block, data in (record.get("timetable") or {}).items():
+            for day, slots in data.get("schedule", {}).items():
+                for s in slots:
+                    rows.append(head + (block, day, s["slot"], s.get("time_range"),
+                                        s.get("content"), int(bool(s.get("is_free"))),
+                                        record.get("scraped_at")))
+        return rows
+
+    def write(self, record: dict) -> int:
+        """Replace the rows of this record's combination; returns the number of rows written."""
+        rows = self.rows_for(record)
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM class_slots WHERE fin_year = ? AND semester = ? AND section = ? "
+                "AND department = ? AND degree = ? AND spec = ?",
+                (record.get("fin_year"), int(record["semester"]), int(record["section"]),
+                 record["department"], record["degree"], record["spec"]),
+            )
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO class_slots VALUES ({', '.join('?' * len(_SLOT_COLUMNS))})",
+                rows,
+            )
+        return len(rows)
+
+    def import_directory(self, directory: str) -> int:
+        """Load the per-combination JSON files of `directory`; returns the number of files."""
+        count = 0
+        for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.write(json.load(f))
+                count += 1
+            except Exception as e:
+                print(f"⚠️   Skipped {os.path.basename(path)}: {e}")
+        return count
+
+    def iter_slots(self, **where) -> Iterator[dict]:
+        """Rows matching column=value filters, e.g. iter_slots(day="Mon", is_free=0)."""
+        unknown = set(where) - set(_SLOT_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown class_slots column(s): {sorted(unknown)}")
+        sql = f"SELECT {', '.join(_SLOT_COLUMNS)} FROM class_slots"
+        if where:
+            sql += " WHERE " + " AND ".join(f"{col} = ?" for col in where)
+        for row in self._conn.execute(sql, tuple(where.values())):
+            yield dict(zip(_SLOT_COLUMNS, row))
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,191 @@
+import asyncio
+import re
+
+from class_timetable_scraper import ClassTimetableScraper
+from heuristics import Blacklist, HeuristicsCache, OptionTreeCache
+
+# sem → degree → dept → specs
+TREE = {"2": {"BT": {"IT": [], "CS": []}}, "4": {"BT": {"IT": [], "CS": []}}}
+TEXT = {"BT": "B.Tech", "IT": "INFORMATION TECHNOLOGY", "CS": "COMPUTER SCIENCE AND ENGINEERING"}
+CASCADE = {"sem": ("degree", "dept", "spec"), "degree": ("dept", "spec"), "dept": ("spec",)}
+
+
+class _Frame:
+    """The class form: dependent dropdowns filled from TREE."""
+
+    def __init__(self):
+        self.v = {"sem": "", "sec": "1", "degree": "", "dept": "", "spec": "", "day": "All"}
+
+    def options(self, name):
+        if name == "sem":
+            return list(TREE)
+        if name in ("sec", "day"):
+            return [self.v[name]]
+        branch = TREE.get(self.v["sem"], {})
+        for key in ("degree", "dept"):
+            if name == key:
+                return list(branch)
+            branch = branch.get(self.v[key], {})
+        return list(branch)
+
+    async def evaluate(self, js, arg=None):
+        if "timeoutMs" in js:
+            return "options"
+        if "__imsCascade" in js:
+            return True
+        if isinstance(arg, dict):
+            return {k: {"value": self.v[n], "text": TEXT.get(self.v[n], self.v[n])}
+                    for k, n in arg.items() if n in self.v}
+        name = re.search(r'select\[name="(\w+)"\]', js).group(1)
+        return [{"value": o, "text": TEXT.get(o, o)} for o in self.options(name)]
+
+    async def select_option(self, selector, value, timeout=None):
+        name = re.search(r'name="(\w+)"', selector).group(1)
+        if value not in self.options(name):
+            raise Exception(f"no option {value}")
+        self.v[name] = value
+        for dependent in CASCADE.get(name, ()):
+            self.v[dependent] = ""
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+
+class _Scraper(ClassTimetableScraper):
+    """Every IT request comes back empty; the rest return a timetable."""
+
+    def __init__(self, tmp_path):
+        super().__init__(user_id="u", password="p")
+        self.cache     = HeuristicsCache(path=str(tmp_path / "heuristics_cache.json"))
+        self.blacklist = Blacklist(persist_threshold=3, skip_threshold=1, path=str(tmp_path / "blacklist.json"))
+        self.option_tree = OptionTreeCache(self.fin_year, path=str(tmp_path / "option_tree_cache.json"))
+        self.target_sems, self.target_sections, self.skip_degrees = [2, 4], [1], set()
+        self.sel = {"sem": "sem", "section": "sec", "degree": "degree",
+                    "dept": "dept", "spec": "spec", "day": "day"}
+        self.pacing.pause = lambda: asyncio.sleep(0)
+        self.requested = []
+
+    async def _click_go_and_wait(self, page, frame, timeout_s=None):
+        self.requested.append((frame.v["sem"], frame.v["dept"]))
+        return frame.v["dept"] != "IT", frame
+
+    async def _bypass(self, page):
+        pass
+
+    async def _parse_timetable(self, frame):
+        return {"Monday": [dict(frame.v)]}
+
+
+def test_serial_run_prunes_later_semesters_with_what_it_learned(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    scraper = _Scraper(tmp_path)
+
+    stats = asyncio.run(scraper._scrape_all(None, _Frame()))
+
+    # IT came back empty in semester 2, so semester 4 never asks for it
+    assert scraper.requested == [("2", "IT"), ("2", "CS"), ("4", "CS")]
+    assert stats["saved"] == 2 and stats["empty"] == 1
+
+
+class _CascadeFrame:
+    def __init__(self, answer=None):
+        self.answer = answer
+        self.load_states = []
+
+    async def evaluate(self, js, arg=None):
+        if self.answer is None:
+            await asyncio.Event().wait()   # a page whose timers never fire
+        return self.answer
+
+    async def wait_for_load_state(self, state, timeout=None):
+        self.load_states.append(state)
+
+
+def _cascade(frame):
+    scraper = ClassTimetableScraper(user_id="u", password="p")
+    scraper.cascade_timeout_ms = 200
+    return asyncio.run(scraper._wait_for_cascade(frame, "sem"))
+
+
+def test_cascade_wait_is_bounded_when_the_page_never_answers():
+    assert _cascade(_CascadeFrame()) == "timeout"
+
+
+def test_unarmed_cascade_waits_for_the_new_document():
+    frame = _CascadeFrame("unarmed")
+    assert _cascade(frame) == "navigation"
+    assert frame.load_states == ["domcontentloaded"]
+
+
+class _ResultFrame:
+    """A frame still showing the previous Go's no-record message until it gets a table."""
+
+    def __init__(self, name):
+        self.name, self.child_frames = name, []
+        self.stale = self.table = False
+
+    async def evaluate(self, js, arg=None):
+        if "data-stale', '1'" in js:
+            self.stale = True
+            return None
+        if self.table:
+            return "table"
+        return None if self.stale else "empty"
+
+
+class _GoFrame(_ResultFrame):
+    def __init__(self, result):
+        super().__init__("form")
+        self.result = result
+
+    async def query_selector(self, selector):
+        return self
+
+    async def get_attribute(self, name):
+        return "Go"
+
+    async def click(self):
+        # The answer arrives after the first poll
+        asyncio.get_running_loop().call_later(0.7, setattr, self.result, "table", True)
+
+
+def test_go_marks_every_frame_before_polling():
+    result = _ResultFrame("result")
+    form = _GoFrame(result)
+    page = type("Page", (), {"frames": [form, result]})()
+    scraper = ClassTimetableScraper(user_id="u", password="p")
+    scraper._table_watch = False
+
+    # The result frame's old "No Record Found" is not taken for this Go's answer
+    assert asyncio.run(scraper._click_go_and_wait(page, form, timeout_s=2)) == (True, result)
+
+
+class _Planned(_Scraper):
+    """A fixed plan; each combination answers with OUTCOMES[spec] after `delay` seconds."""
+
+    OUTCOMES = {"A": ("empty", 0.05), "B": ("done", 0.2), "C": ("saved", 0.0)}
+
+    async def _plan(self, frame, stats, exclude=frozenset()):
+        return [{"key": spec, "sem": 2, "section": 1, "degree": {"text": "B.Tech"},
+                 "dept": {"text": spec}, "spec": {"text": spec}, "cached": False,
+                 "score": 1.0, "order": (i,)}
+                for i, spec in enumerate(self.OUTCOMES) if spec not in exclude]
+
+    async def _scrape_combo(self, page, frame, sem, section, degree, dept, spec, stats, verify=False):
+        outcome, delay = self.OUTCOMES[spec["text"]]
+        await asyncio.sleep(delay)
+        if spec["text"] == "A":
+            self.pacing.workers = 1   # a timeout elsewhere halved the pool
+        self.requested.append(spec["text"])
+        return outcome
+
+
+def test_budget_held_by_a_returned_reservation_is_still_spent(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    scraper = _Planned(tmp_path)
+    scraper.pacing.max_workers = scraper.pacing.workers = 2
+    workers = [(scraper, None, None), (scraper, None, None)]
+
+    # B is handed back after worker 0 saw the budget of 2 as taken
+    asyncio.run(asyncio.wait_for(scraper._scrape_planned(workers, budget=2), timeout=5))
+    assert scraper.requested == ["A", "B", "C"]
@@ -0,0 +1,80 @@
+import pytest
+
+from faculty_resolver import FacultyResolver, name_key, trigrams
+
+CATALOG = [
+    {"code": "F001", "name": "DR. ANITA SHARMA"},
+    {"code": "F002", "name": "DR. RAJESH GUPTA"},
+    {"code": "F003", "name": "PROF. PRIYA SINGH"},
+    {"code": "F004", "name": "DR. AMIT KUMAR"},
+    {"code": "F005", "name": "MR. AMIT KUMAR"},       # namesake of F004
+    {"code": "F006", "name": "DR. ANITA SHARMAN"},
+    {"code": "F007", "name": "MS. NEHA VERMA"},
+    {"code": "F002", "name": "DR. RAJESH GUPTA"},     # listed twice under one code
+]
+
+
+@pytest.fixture(scope="module")
+def resolver():
+    return FacultyResolver(CATALOG)
+
+
+@pytest.mark.parametrize("name, key", [
+    ("DR. ANITA SHARMA", "ANITA SHARMA"),
+    ("Dr Anita Sharma", "ANITA SHARMA"),
+    ("PROF. A. SHARMA", "A SHARMA"),
+    ("Ms.  Neha   Verma", "NEHA VERMA"),
+    ("SHRI RAJESH GUPTA; F002", "RAJESH GUPTA"),
+    ("DR.", ""),
+])
+def test_name_key_drops_titles_and_code(name, key):
+    assert name_key(name) == key
+
+
+def test_trigrams_are_padded_per_word():
+    assert trigrams("ANITA") == {"$AN", "ANI", "NIT", "ITA", "TA$"}
+    assert trigrams("A SHARMA") == {"$A$", "$SH", "SHA", "HAR", "ARM", "RMA", "MA$"}
+
+
+@pytest.mark.parametrize("query, code, confident", [
+    ("Anita Sharma",             "F001", True),    # exact after titles are dropped
+    ("PROF. ANITA SHARMA; F001", "F001", True),
+    ("Dr Sharma Anita",          "F001", True),    # word-order swap: the only perfect score
+    ("Gupta Rajesh",             "F002", True),
+    ("Sharman Anita",            "F006", True),
+    ("Rajesh Gupt",              "F002", True),    # F002 twice in the catalog is no tie
+    ("Priya Sing",               "F003", True),
+    ("Anita Sharm",              "F001", False),   # F006 scores within the margin
+    ("Zed Q",                    None,   False),   # no shared trigram
+])
+def test_resolve(resolver, query, code, confident):
+    result = resolver.resolve(query)
+    assert (result["code"], result["confident"]) == (code, confident)
+
+
+def test_namesakes_are_never_confident(resolver):
+    result = resolver.resolve("Amit Kumar")
+    assert result["score"] == 1.0 and result["runner_up"]["score"] == 1.0
+    assert not result["confident"]
+    assert resolver.lookup("Dr Amit Kumar") is None
+
+
+def test_threshold_and_margin():
+    # "Neha" alone scores 0.615 against NEHA VERMA, with no other candidate
+    assert FacultyResolver(CATALOG).resolve("Neha")["confident"]
+    assert not FacultyResolver(CATALOG, threshold=0.7).resolve("Neha")["confident"]
+
+    # "Anita Sharm": 0.857 vs 0.818 for ANITA SHARMAN
+    assert not FacultyResolver(CATALOG, margin=0.1).resolve("Anita Sharm")["confident"]
+    assert FacultyResolver(CATALOG, margin=0.03).resolve("Anita Sharm")["confident"]
+
+
+def test_lookup_and_report(resolver, capsys):
+    assert resolver.lookup("Neha Verma") == {"code": "F007", "name": "MS. NEHA VERMA"}
+    assert len(resolver) == len(CATALOG)
+
+    resolver.print_report(resolver.resolve_all(["Neha Verma", "Amit Kumar", "Zed Q"]))
+    out = capsys.readouterr().out
+    assert "1/3 confident" in out
+    assert "'Amit Kumar'" in out and "'Zed Q' → no candidate" in out
+    assert "'Neha Verma'" not in out
@@ -0,0 +1,168 @@
+import asyncio
+
+from faculty_scraper import FacultyTimetableScraper
+from storage import NdjsonWriter
+
+NAMES = ["DR. ANITA SHARMA", "DR. RAJESH GUPTA", "DR. PRIYA SINGH", "DR. SANJAY VERMA", "DR. NEHA KUMAR"]
+
+# Seconds each faculty takes: later names finish first
+DELAYS = {name: 0.01 * (len(NAMES) - i) for i, name in enumerate(NAMES)}
+
+
+class _Scraper(FacultyTimetableScraper):
+    def load_faculties_from_excel(self, file_path):
+        return list(NAMES)
+
+    async def scrape_faculty_timetable(self, page, faculty_name, semester="EVEN"):
+        await asyncio.sleep(DELAYS[faculty_name])
+        self.completed.append(faculty_name)
+        return {"faculty": faculty_name, "page": page}
+
+
+def _pooled(output, stream_output):
+    scraper = _Scraper(user_id="u", password="p")
+    scraper.completed = []
+    scraper.pacing.delay_s = scraper.pacing.base_delay_s = 0
+    scraper.pacing.workers = scraper.pacing.max_workers = 3
+    asyncio.run(scraper._scrape_faculties_pooled(["p0", "p1", "p2"], "EVEN", output, stream_output))
+    return scraper
+
+
+def test_pooled_stream_is_read_back_in_excel_order(tmp_path):
+    writer = NdjsonWriter(str(tmp_path / "faculties_data.ndjson"))
+    scraper = _pooled(writer, stream_output=True)
+    writer.close()
+
+    assert scraper.completed != NAMES                 # workers really finished out of order
+    assert [r["faculty"] for r in writer] == NAMES
+
+
+def test_pooled_list_is_in_excel_order():
+    output = []
+    _pooled(output, stream_output=False)
+    assert [r["faculty"] for r in output] == NAMES
+
+
+class _Frame:
+    def __init__(self, answer):
+        self.answer, self.calls = answer, 0
+
+    async def evaluate(self, js, arg=None):
+        self.calls += 1
+        if isinstance(self.answer, Exception):
+            raise self.answer
+        return self.answer
+
+
+class _Page(_Frame):
+    def __init__(self, frames):
+        super().__init__(False)
+        self.frames = frames
+
+
+def test_half_found_faculty_form_falls_back_to_the_picker():
+    entry = {"code": "F001", "name": "DR. ANITA SHARMA"}
+    scraper = _Scraper(user_id="u", password="p")
+
+    form = _Frame(True)
+    page = _Page([_Frame(Exception("Execution context was destroyed")), form])
+    assert asyncio.run(scraper._fill_faculty_from_catalog(page, entry)) is form
+
+    broken = _Frame(Exception("Error: faculty form field not found: txtfaculty"))
+    page = _Page([broken, form])
+    assert asyncio.run(scraper._fill_faculty_from_catalog(page, entry)) is None
+    assert not scraper.direct_fill
+    assert asyncio.run(scraper._fill_faculty_from_catalog(page, entry)) is None
+    assert broken.calls == 1
+
+
+class _Link:
+    def __init__(self, popup, text):
+        self.popup, self.text = popup, text
+
+    async def inner_text(self):
+        return self.text
+
+    async def click(self):
+        self.popup.clicked = self.text
+        self.popup.closed = True
+
+
+class _Popup:
+    def __init__(self, names):
+        self.frames = []
+        self.links = [_Link(self, t) for t in ["Search", *names, "Close"]]
+        self.clicked, self.closed = None, False
+
+    async def wait_for_load_state(self, state):
+        pass
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+    async def fill(self, selector, value):
+        pass
+
+    async def click(self, selector):
+        pass
+
+    async def query_selector_all(self, selector):
+        return self.links
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class _PopupInfo:
+    def __init__(self, popup):
+        self.popup = popup
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def value(self):
+        return asyncio.sleep(0, self.popup)
+
+
+class _Opener:
+    def __init__(self, popup):
+        self.popup = popup
+
+    def expect_popup(self, timeout=None):
+        return _PopupInfo(self.popup)
+
+
+class _Button:
+    async def click(self):
+        pass
+
+
+class _Laps:
+    def lap(self, phase):
+        pass
+
+
+def _pick(names, fac_text):
+    scraper = _Scraper(user_id="u", password="p")
+    popup = _Popup(names)
+    picked = asyncio.run(scraper._pick_faculty_in_popup(_Opener(popup), _Button(), fac_text, _Laps()))
+    return picked, popup
+
+
+def test_popup_picks_only_a_confident_match():
+    names = ["DR. ANITA SHARMA; F001", "DR. ANITA SINGH; F002"]
+    picked, popup = _pick(names, "ANITA SHARMA")
+    assert picked and popup.clicked == "DR. ANITA SHARMA; F001"
+
+
+def test_popup_substring_hit_is_not_picked():
+    # "DR. ANITA" is inside both names: close the popup rather than guess
+    picked, popup = _pick(["DR. ANITA SHARMA; F001", "DR. ANITA SINGH; F002"], "DR. ANITA")
+    assert not picked and popup.clicked is None and popup.closed
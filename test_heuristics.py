@@ -0,0 +1,67 @@
+from heuristics import Blacklist, HeuristicsCache, rescore_combinations, score_combination
+
+CSE, IT = "COMPUTER SCIENCE AND ENGINEERING", "INFORMATION TECHNOLOGY"
+
+
+def _combo(degree, dept, spec, order, cache, blacklist):
+    return {
+        "degree": {"text": degree}, "dept": {"text": dept}, "spec": {"text": spec},
+        "score": score_combination(degree, dept, spec, cache, blacklist), "order": order,
+    }
+
+
+def _learning(tmp_path):
+    cache = HeuristicsCache(path=str(tmp_path / "heuristics_cache.json"))
+    blacklist = Blacklist(persist_threshold=3, skip_threshold=6, path=str(tmp_path / "blacklist.json"))
+    return cache, blacklist
+
+
+def test_failed_pair_moves_down_the_plan(tmp_path):
+    cache, blacklist = _learning(tmp_path)
+    plan = [
+        _combo("B.Tech", CSE, "N_A", (0, 0, 1), cache, blacklist),
+        _combo("B.Tech", CSE, "ARTIFICIAL INTELLIGENCE", (0, 0, 2), cache, blacklist),
+        _combo("B.Tech", IT,  "N_A", (0, 0, 3), cache, blacklist),
+    ]
+    plan.sort(key=lambda c: (-c["score"], c["order"]))
+    assert plan[0]["dept"]["text"] == CSE and plan[0]["score"] == plan[2]["score"]
+
+    # The first CSE combination comes back empty
+    done = plan.pop(0)
+    blacklist.record_failure(done["dept"]["text"], done["degree"]["text"])
+    assert rescore_combinations(plan, "B.Tech", CSE, cache, blacklist) == 1
+
+    assert [c["dept"]["text"] for c in plan] == [IT, CSE]
+    assert plan[1]["score"] == plan[0]["score"] / 2
+
+
+def test_success_restores_the_pair(tmp_path):
+    cache, blacklist = _learning(tmp_path)
+    blacklist.record_failure(CSE, "B.Tech")
+    plan = [
+        _combo("B.Tech", IT,  "N_A", (0, 0, 1), cache, blacklist),
+        _combo("B.Tech", CSE, "N_A", (0, 0, 2), cache, blacklist),
+    ]
+    assert plan[1]["score"] < plan[0]["score"]
+
+    blacklist.record_success(CSE, "B.Tech")
+    cache.record_success(CSE, "B.Tech", "")
+    rescore_combinations(plan, "B.Tech", CSE, cache, blacklist)
+    assert plan[0]["dept"]["text"] == CSE and plan[0]["score"] == 0.9
+
+
+def test_fork_learns_without_seeing_siblings(tmp_path):
+    cache, blacklist = _learning(tmp_path)
+    start = (cache.snapshot(), blacklist.snapshot())
+    a_cache, a_black = cache.fork(start[0]), blacklist.fork(start[1])
+    b_cache, b_black = cache.fork(start[0]), blacklist.fork(start[1])
+
+    for _ in range(3):
+        a_black.record_failure(CSE, "B.Tech")
+        a_cache.record_dimension(CSE, "B.Tech", "section", True)
+
+    assert a_black.is_blacklisted(CSE, "B.Tech") and a_cache.is_collapsed(CSE, "B.Tech", "section")
+    assert not b_black.is_blacklisted(CSE, "B.Tech") and not b_cache.is_collapsed(CSE, "B.Tech", "section")
+    # ...but everything was recorded for the next run
+    assert cache.is_collapsed(CSE, "B.Tech", "section")
+    assert Blacklist(path=str(tmp_path / "blacklist.json")).is_blacklisted(CSE, "B.Tech")
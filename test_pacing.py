@@ -0,0 +1,100 @@
+import pytest
+
+import pacing
+from pacing import PacingController
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake time.monotonic the tests move by hand."""
+    now = [1000.0]
+    monkeypatch.setattr(pacing.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_healthy_answers_shorten_the_delay_and_add_workers(clock):
+    p = PacingController(base_delay_s=0.2, delay_step_s=0.05, workers=1, max_workers=3, increase_every=2)
+    for _ in range(3):
+        p.record_success(0.5)
+    assert p.delay_s == pytest.approx(0.05)
+    assert p.workers == 2
+
+    for _ in range(10):
+        p.record_success(0.5)
+    assert p.delay_s == 0.0                      # floored at min_delay_s
+    assert p.workers == p.peak_workers == 3      # capped at max_workers
+
+
+def test_timeout_doubles_the_delay_and_halves_the_workers(clock):
+    p = PacingController(base_delay_s=0.2, workers=4, max_workers=4)
+    p.record_timeout()
+    assert (p.delay_s, p.workers) == (0.4, 2)
+    assert p.counts["backoff_timeout"] == 1
+
+    p = PacingController(base_delay_s=0.2, max_delay_s=0.3, workers=1)
+    p.record_error()
+    assert (p.delay_s, p.workers) == (0.3, 1)    # clamped to max_delay_s, never below one worker
+
+
+def test_slow_answer_counts_as_congestion(clock):
+    p = PacingController(workers=2, max_workers=2, slow_latency_s=8.0)
+    p.record_success(9.0)
+    assert p.workers == 1 and p.counts["backoff_slow"] == 1
+
+
+def test_one_decrease_per_cooldown(clock):
+    p = PacingController(base_delay_s=0.2, workers=8, max_workers=8, cooldown_s=2.0)
+    p.record_timeout()
+    clock[0] += 1.0
+    p.record_timeout()
+    p.record_error()
+    assert (p.delay_s, p.workers) == (0.4, 4)
+
+    clock[0] += 1.5
+    p.record_timeout()
+    assert (p.delay_s, p.workers) == (0.8, 2)
+    assert p.counts["backoff_timeout"] == 2 and p.counts["timeout"] == 3
+
+
+def test_increase_holds_while_timeout_rate_is_high(clock):
+    p = PacingController(base_delay_s=0.2, workers=1, max_workers=4, increase_every=1,
+                         max_timeout_rate=0.1, window=10)
+    p.record_timeout()                           # delay 0.4, 1 of 1 outcomes failed
+    for _ in range(8):
+        p.record_success(0.5)
+    assert p.timeout_rate == pytest.approx(1 / 9)
+    assert (p.delay_s, p.workers) == (0.4, 1)
+
+    p.record_success(0.5)                        # 1 of 10: back under the limit
+    assert p.timeout_rate == pytest.approx(0.1)
+    assert p.delay_s == pytest.approx(0.35) and p.workers == 2
+
+
+def test_timeout_follows_latency_within_bounds(clock):
+    p = PacingController(timeout_s=15.0, min_timeout_s=3.0, max_timeout_s=30.0)
+    assert p.timeout_s == 15.0                   # nothing measured yet
+    p.record_success(1.5)
+    assert p.timeout_s == pytest.approx(4 * 1.5 + 1)
+    assert p.timeout_ms == 7000
+
+    fast = PacingController(min_timeout_s=3.0)
+    fast.record_success(0.1)
+    assert fast.timeout_s == 3.0
+
+    slow = PacingController(max_timeout_s=30.0, slow_latency_s=100.0)
+    slow.record_success(20.0)
+    assert slow.timeout_s == 30.0
+
+
+def test_timeouts_feed_the_latency_estimate(clock):
+    p = PacingController(timeout_s=15.0)
+    p.record_success(2.0)                        # ewma 2.0 → timeout 9.0
+    p.record_timeout()                           # observes 9.0
+    assert p.latency_ewma == pytest.approx(2.0 + 0.2 * (9.0 - 2.0))
+
+
+def test_allows_only_the_first_workers(clock):
+    p = PacingController(workers=2, max_workers=4)
+    assert [p.allows(i) for i in range(4)] == [True, True, False, False]
+    p.record_timeout()
+    assert [p.allows(i) for i in range(4)] == [True, False, False, False]
@@ -1,5 +1,18 @@
 import asyncio
-from playwright.async_api import async_playwright
+import json
+
+import pytest
+
+from timetable_parser import (
+    EMPTY_RESULT_PATTERN,
+    EMPTY_RESULT_RE,
+    _parse_grid,
+    is_empty_result,
+    parse_class_timetable,
+    parse_faculty_timetable,
+    parse_html,
+    parse_room_timetable,
+)
 
 html = """
 <table>
@@ -42,125 +55,276 @@ html = """
 </table>
 """
 
-js_code = """
+
+def test_parse_core_and_electives():
+    res = parse_class_timetable(html)
+
+    assert list(res) == ["CORE", "ELECTIVES"]
+    core = res["CORE"]
+    assert core["time_slots"][0] == {"slot": "T1", "time_range": "08:00-09:00"}
+    assert list(core["schedule"]) == ["Mon", "Tue", "Sat"]
+    assert core["schedule"]["Mon"][1]["content"] == "Math"
+    assert core["schedule"]["Sat"][0]["is_free"] is True
+    assert core["legend"] == ["Legend - Something / Guy"]
+    assert res["ELECTIVES"]["schedule"]["Mon"][0]["content"] == "Elec1"
+
+
+# ── Room / faculty grid ──────────────────────────────────────────────────────
+
+room_html = """
+<html><body>
+<table data-stale="1"><tr><td class="plum_fieldbig">T1</td></tr><tr><td>Mon</td><td>OLD ROOM</td></tr></table>
+<table class="plum_table" border="1">
+  <tr><td colspan="4" class="plum_head">Room Time Table ( Year : 2025-26 )  ROOM : 5115</td></tr>
+  <tr><td class="plum_fieldbig">Day</td><td class="plum_fieldbig">T1</td>
+      <td class="plum_fieldbig">T2</td><td class="plum_fieldbig">T3</td></tr>
+  <tr><td class="plum_fieldbig">Mon</td><td>CS301 (L) 2022U12</td><td>&nbsp;</td>
+      <td>MA201   (T)
+          2022U40</td></tr>
+  <tr><td class="plum_fieldbig">Tue</td><td>&nbsp;</td><td>&nbsp;</td><td>&nbsp;</td></tr>
+</table>
+</body></html>
+"""
+
+faculty_html = """
+<html><body>
+<table class="plum_table" border="1">
+  <tr><td colspan="3" class="plum_head">Faculty Time Table ( Year : 2025-26 )  DR. ANITA SHARMA</td></tr>
+  <tr><th>Day</th><th>T1</th><th>T2</th></tr>
+  <tr><td>MON</td><td>&nbsp;</td><td>PH101 (P) 2023U07</td></tr>
+  <tr><td>Wed</td><td>PH101 (L) 2023U07</td><td>&nbsp;&nbsp;</td></tr>
+</table>
+</body></html>
+"""
+
+no_record_html = "<html><body><form><input name='room'></form><p>No Record Found</p></body></html>"
+
+
+def test_parse_room_grid():
+    res = parse_room_timetable(room_html, "5115", "EVEN")
+
+    assert (res["room"], res["semester"], res["year"]) == ("5115", "EVEN", "2025-26")
+    assert list(res["schedule"]) == ["Mon", "Tue"]          # the stale table is skipped
+    mon = res["schedule"]["Mon"]
+    assert [c["time_slot"] for c in mon] == ["T1", "T2", "T3"]
+    assert mon[0] == {"time_slot": "T1", "content": "CS301 (L) 2022U12", "is_occupied": True}
+    assert mon[1] == {"time_slot": "T2", "content": "", "is_occupied": False}      # &nbsp;
+    assert mon[2]["content"] == "MA201 (T) 2022U40"
+    assert not any(c["is_occupied"] for c in res["schedule"]["Tue"])
+
+
+def test_parse_faculty_grid():
+    res = parse_faculty_timetable(faculty_html, "DR. ANITA SHARMA", "EVEN")
+
+    assert (res["faculty"], res["semester"]) == ("DR. ANITA SHARMA", "EVEN")
+    assert list(res["schedule"]) == ["MON", "Wed"]          # day match is case-insensitive
+    assert res["schedule"]["MON"][1] == {"time_slot": "T2", "content": "PH101 (P) 2023U07", "is_occupied": True}
+    assert res["schedule"]["Wed"][1] == {"time_slot": "T2", "content": "", "is_occupied": False}
+
+
+def test_parse_grid_needs_a_slot_header():
+    table = parse_html("<table><tr><td>Day</td><td>Slot</td></tr><tr><td>Mon</td><td>X</td></tr></table>").find(".//table")
+    assert _parse_grid(table, lambda text: "Mon" in text) is None
+
+    table = parse_html("<table><tr><td></td><td>T1</td></tr><tr><td>Mon</td><td>X</td><td>spill</td></tr></table>").find(".//table")
+    assert _parse_grid(table, lambda text: "Mon" in text) == {
+        "Mon": [{"time_slot": "T1", "content": "X", "is_occupied": False}],   # extra cells are dropped
+    }
+
+
+def test_no_record_page():
+    assert parse_room_timetable(no_record_html, "5115", "EVEN") is None
+    assert parse_faculty_timetable(no_record_html, "DR. ANITA SHARMA", "EVEN") is None
+    assert parse_class_timetable(no_record_html) == {}
+    assert is_empty_result(no_record_html)
+    assert not is_empty_result(room_html)
+    assert not is_empty_result("")
+
+
+@pytest.mark.parametrize("text, empty", [
+    ("No Record Found", True),
+    ("no  records\nfound", True),
+    ("No data found.", True),
+    ("No Time Table is available", True),
+    ("No timetable exists", True),
+    ("Records not found", True),
+    ("Know data found", False),          # needs a word boundary before "no"
+    ("No records were found", False),
+    ("CS301 (L) Notes found in room", False),
+])
+def test_empty_result_pattern(text, empty):
+    assert bool(EMPTY_RESULT_RE.search(text)) is empty
+
+
+# ── Parity with the in-page extractors the parsers replaced ──────────────────
+
+CLASS_JS = r"""
 () => {
     const result = {};
     const dayNames = ['Mon','Tue','Wed','Thu','Fri','Sat','Sun'];
-
     const tables = Array.from(document.querySelectorAll('table'));
-    
     for (let table of tables) {
         const fullText = table.innerText || '';
         if (!fullText.includes('T1') && !fullText.includes('T 1') && !fullText.includes('T2')) continue;
-
         const rows = Array.from(table.querySelectorAll('tr'));
         let headerRowIndices = [];
-        
         for (let i = 0; i < rows.length; i++) {
-            const row = rows[i];
-            const cells = Array.from(row.querySelectorAll('td,th'));
-            const texts = cells.map(c => c.innerText.trim());
-            // Need to match headers like T1, T2
-            if (texts.some(t => /^T\\s*\\d+/.test(t) || t === 'T1' || t === 'T 1' || t.includes('T1') || t.includes('T2'))) {
-                if (texts.length > 2) {
-                    headerRowIndices.push(i);
-                }
+            const texts = Array.from(rows[i].querySelectorAll('td,th')).map(c => c.innerText.trim());
+            if (texts.some(t => /^T\s*\d+/.test(t) || t === 'T1' || t === 'T 1' || t.includes('T1') || t.includes('T2'))) {
+                if (texts.length > 2) headerRowIndices.push(i);
             }
         }
-        
         for (let h = 0; h < headerRowIndices.length; h++) {
             const hIdx = headerRowIndices[h];
             const headerRow = rows[hIdx];
             const nextHIdx = (h + 1 < headerRowIndices.length) ? headerRowIndices[h + 1] : rows.length;
-            
             let label = 'CORE';
             for (let back = hIdx - 1; back >= 0; back--) {
                 if (h > 0 && back <= headerRowIndices[h-1]) break;
                 const txt = rows[back].innerText.trim();
                 if (txt.includes('Time Table')) {
-                    const m = txt.match(/Time Table\\s*\\(([^)]+)\\)/i);
-                    label = m ? m[1].trim() : txt.slice(0,40).replace(/\\s+/g,' ');
+                    const m = txt.match(/Time Table\s*\(([^)]+)\)/i);
+                    label = m ? m[1].trim() : txt.slice(0,40).replace(/\s+/g,' ');
                     break;
                 }
             }
-            if (result[label]) {
-                label += '_' + h;
-            }
-            
-            const cells = Array.from(headerRow.querySelectorAll('td,th'));
-            const texts = cells.map(c => c.innerText.trim());
-            
+            if (result[label]) label += '_' + h;
+            const texts = Array.from(headerRow.querySelectorAll('td,th')).map(c => c.innerText.trim());
             let slotMeta = [];
             for (let j = 1; j < texts.length; j++) {
-                const parts = texts[j].split(/[\\n\\r]+/);
-                const slot = parts[0].trim();
-                const time_range = parts.length > 1 ? parts.slice(1).join(' ').trim() : null;
-                slotMeta.push({ slot, time_range });
+                const parts = texts[j].split(/[\n\r]+/);
+                slotMeta.push({ slot: parts[0].trim(), time_range: parts.length > 1 ? parts.slice(1).join(' ').trim() : null });
             }
-            
             let blockStart = hIdx + 1;
             if (blockStart < nextHIdx && slotMeta.every(s => !s.time_range)) {
-                const nxtCells = Array.from(rows[blockStart].querySelectorAll('td,th'))
-                                .map(c => c.innerText.trim());
+                const nxtCells = Array.from(rows[blockStart].querySelectorAll('td,th')).map(c => c.innerText.trim());
                 if (nxtCells.some(t => t.includes(':'))) {
-                    for(let j = 1; j < nxtCells.length && (j-1) < slotMeta.length; j++) {
-                        slotMeta[j-1].time_range = nxtCells[j];
-                    }
+                    for (let j = 1; j < nxtCells.length && (j-1) < slotMeta.length; j++) slotMeta[j-1].time_range = nxtCells[j];
                     blockStart++;
                 }
             }
-            
             const schedule = {};
             const legend = [];
             let pastLastDay = false;
-            
             for (let i = blockStart; i < nextHIdx; i++) {
                 const row = rows[i];
                 const rCells = Array.from(row.querySelectorAll('td,th'));
                 if (!rCells.length) continue;
                 const first = rCells[0].innerText.trim();
-                
                 if (pastLastDay) {
-                    const txt = row.innerText.trim().replace(/\\s+/g,' ');
+                    const txt = row.innerText.trim().replace(/\s+/g,' ');
                     if (txt.includes(' - ') && txt.includes('/')) legend.push(txt);
                     continue;
                 }
-                
-                if (!dayNames.some(d => first.startsWith(d))) {
-                    continue;
-                }
-                
+                if (!dayNames.some(d => first.startsWith(d))) continue;
                 if (first.startsWith('Sat') || first.startsWith('Sun')) pastLastDay = true;
-                
                 schedule[first] = [];
                 for (let j = 1; j < rCells.length && (j-1) < slotMeta.length; j++) {
-                    const content = (rCells[j] ? rCells[j].innerText.trim().replace(/\\s+/g,' ') : '');
-                    schedule[first].push({
-                        slot: slotMeta[j-1].slot,
-                        time_range: slotMeta[j-1].time_range,
-                        content,
-                        is_free: content.length <= 2
-                    });
+                    const content = rCells[j].innerText.trim().replace(/\s+/g,' ');
+                    schedule[first].push({ slot: slotMeta[j-1].slot, time_range: slotMeta[j-1].time_range,
+                                           content, is_free: content.length <= 2 });
                 }
             }
-            
-            if (Object.keys(schedule).length > 0) {
-                result[label] = { time_slots: slotMeta, schedule, legend };
-            }
+            if (Object.keys(schedule).length > 0) result[label] = { time_slots: slotMeta, schedule, legend };
         }
     }
     return result;
 }
 """
 
-async def run():
+# Shared by the room and faculty extractors: they differed only in how the table
+# and the day rows were found
+_GRID_JS = r"""
+    const rows = Array.from(table.querySelectorAll('tr'));
+    const headerRow = rows.find(r => r.innerText.includes('T1') || r.innerText.includes('T2'));
+    if (!headerRow) return null;
+    const timeSlots = [];
+    headerRow.querySelectorAll('td, th').forEach((cell, idx) => { if (idx > 0) timeSlots.push(cell.textContent.trim()); });
+    for (const row of rows.filter(isDayRow)) {
+        const cells = Array.from(row.querySelectorAll('td, th'));
+        if (cells.length === 0) continue;
+        const day = cells[0].textContent.trim();
+        data.schedule[day] = [];
+        for (let j = 1; j < cells.length && (j-1) < timeSlots.length; j++) {
+            const text = cells[j].textContent.trim().replace(/\s+/g, ' ');
+            data.schedule[day].push({ time_slot: timeSlots[j-1], content: text, is_occupied: text.length > 5 });
+        }
+    }
+    return data;
+"""
+
+ROOM_JS = r"""
+({room, semester}) => {
+    const data = { room, semester, year: null, schedule: {} };
+    let table = null;
+    for (const t of document.querySelectorAll('table')) {
+        if (t.getAttribute('data-stale') === '1') continue;
+        if (t.querySelector('.plum_fieldbig')) { table = t; break; }
+    }
+    if (!table) return null;
+    const title = document.querySelector('body')?.textContent || '';
+    const yearMatch = title.match(/Year\s*:\s*([\d-]+)/i);
+    if (yearMatch) data.year = yearMatch[1];
+    const isDayRow = r => ['Mon','Tue','Wed','Thu','Fri','Sat'].some(d => r.innerText.includes(d));
+""" + _GRID_JS + "}"
+
+FACULTY_JS = r"""
+({faculty, semester}) => {
+    const data = { faculty, semester, schedule: {} };
+    let table = null;
+    for (const t of document.querySelectorAll('table')) {
+        if (t.getAttribute('data-stale') === '1') continue;   // added with the stale marking, as for rooms
+        const txt = t.innerText;
+        if (txt.includes('T1') || txt.includes('T2') || t.querySelector('.plum_fieldbig')) { table = t; break; }
+    }
+    if (!table) return null;
+    const isDayRow = r => /Mon|Tue|Wed|Thu|Fri|Sat/i.test(r.innerText);
+""" + _GRID_JS + "}"
+
+EMPTY_JS = "(pattern) => new RegExp(pattern, 'i').test(document.body.innerText)"
+
+
+async def _in_browser(checks):
+    from playwright.async_api import async_playwright
+
     async with async_playwright() as p:
-        browser = await p.chromium.launch()
+        try:
+            browser = await p.chromium.launch()
+        except Exception as e:
+            pytest.skip(f"Chromium not available: {str(e).splitlines()[0]}")
         page = await browser.new_page()
-        await page.set_content(html)
-        res = await page.evaluate(js_code)
-        import json
-        print(json.dumps(res, indent=2))
+        results = []
+        for html, js, arg in checks:
+            await page.set_content(html)
+            results.append(await page.evaluate(js, arg))
         await browser.close()
+        return results
+
+
+def test_parsers_match_the_original_js_extractors():
+    pytest.importorskip("playwright")
+    room_arg = {"room": "5115", "semester": "EVEN"}
+    faculty_arg = {"faculty": "DR. ANITA SHARMA", "semester": "EVEN"}
+    checks = [
+        (html, CLASS_JS, None),
+        (room_html, ROOM_JS, room_arg),
+        (faculty_html, FACULTY_JS, faculty_arg),
+        (no_record_html, ROOM_JS, room_arg),
+        (no_record_html, FACULTY_JS, faculty_arg),
+        (no_record_html, EMPTY_JS, EMPTY_RESULT_PATTERN),
+        (room_html, EMPTY_JS, EMPTY_RESULT_PATTERN),
+    ]
+    expected = [
+        parse_class_timetable(html),
+        parse_room_timetable(room_html, **room_arg),
+        parse_faculty_timetable(faculty_html, **faculty_arg),
+        None,
+        None,
+        True,
+        False,
+    ]
+    assert asyncio.run(_in_browser(checks)) == expected
+
 
-asyncio.run(run())
+if __name__ == "__main__":
+    print(json.dumps(parse_class_timetable(html), indent=2))
@@ -0,0 +1,49 @@
+import asyncio
+
+from resource_policy import ResourcePolicy
+
+PORTAL = "https://ims.example.edu"
+
+
+class _Request:
+    def __init__(self, url, resource_type):
+        self.url, self.resource_type = url, resource_type
+
+
+class _Route:
+    def __init__(self):
+        self.outcome = None
+
+    async def continue_(self):
+        self.outcome = "continue"
+
+    async def fulfill(self, **kwargs):
+        self.outcome = "fulfill"
+
+    async def abort(self):
+        self.outcome = "abort"
+
+
+def _send(policy, url, resource_type):
+    route = _Route()
+    asyncio.run(policy._handle(route, _Request(url, resource_type)))
+    return route.outcome
+
+
+def test_portal_css_loads_and_everything_else_is_blocked():
+    policy = ResourcePolicy()
+    assert _send(policy, f"{PORTAL}/ims/index.php", "document") == "continue"
+    assert _send(policy, f"{PORTAL}/ims/css/style.css", "stylesheet") == "continue"
+    assert _send(policy, "https://cdn.example.com/theme.css", "stylesheet") == "abort"
+    assert _send(policy, f"{PORTAL}/ims/img/logo.png", "image") == "fulfill"
+    assert _send(policy, "https://www.google-analytics.com/collect", "script") == "abort"
+    assert _send(policy, f"{PORTAL}/ims/class_timetable.php", "document") == "continue"
+    assert policy.blocked_by_type == {"stylesheet": 1, "image": 1, "tracker": 1}
+
+
+def test_no_head_requests_unless_measuring():
+    policy = ResourcePolicy()
+    _send(policy, f"{PORTAL}/ims/index.php", "document")
+    _send(policy, f"{PORTAL}/ims/img/logo.png", "image")
+    assert policy._size_tasks == {} and policy.bytes_saved is None
+    assert "bytes_saved" in policy.stats()
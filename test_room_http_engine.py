@@ -0,0 +1,70 @@
+import asyncio
+
+from mock_portal import MockPortal
+from room_http_engine import RoomHttpEngine
+
+
+class _Context:
+    """Stands in for the browser context: holds the session cookies the browser has now."""
+
+    def __init__(self, token):
+        self.token = token
+
+    async def cookies(self, url=None):
+        return [{"name": "PHPSESSID", "value": self.token}]
+
+
+def _engine(portal, token, context=None):
+    snapshot = {
+        "action":     portal.base_url + "RoomTimetable.php",
+        "method":     "POST",
+        "fields":     [["semcmb", "EVEN"], ["room", ""], ["roomcode", ""]],
+        "room_field": "room",
+        "code_field": "roomcode",
+        "sem_field":  "semcmb",
+        "submit":     ["go", "Go"],
+        "referer":    portal.base_url + "RoomTimetable.php",
+        "user_agent": "test",
+    }
+    return RoomHttpEngine(snapshot, [{"name": "PHPSESSID", "value": token}],
+                          concurrency=2, timeout_s=5, context=context)
+
+
+def _scrape(engine, room):
+    async def run():
+        try:
+            return await engine.scrape_room(room, "EVEN")
+        finally:
+            await engine.close()
+    return asyncio.run(run())
+
+
+def _rooms(portal):
+    empty = [r for r in portal.rooms if portal._is_empty("room", r["text"], "EVEN")]
+    full  = [r for r in portal.rooms if r not in empty]
+    return full[0], empty[0]
+
+
+def test_engine_tells_a_timetable_from_a_no_record_answer():
+    with MockPortal(latency_ms=0, jitter_ms=0, empty_ratio=0.3) as portal:
+        full, empty = _rooms(portal)
+        token = portal.new_session("u")
+
+        status, data = _scrape(_engine(portal, token), full)
+        assert status == "ok" and data["schedule"]
+        assert _scrape(_engine(portal, token), empty) == ("empty", None)
+
+
+def test_expired_session_re_reads_the_browser_cookies():
+    with MockPortal(latency_ms=0, jitter_ms=0, empty_ratio=0.3) as portal:
+        full, _ = _rooms(portal)
+        old = portal.new_session("u")
+        portal.end_session(old)
+
+        # The browser has logged in again since the engine was built
+        status, _ = _scrape(_engine(portal, old, _Context(portal.new_session("u"))), full)
+        assert status == "ok"
+
+        # ...or it has not: the room is an error, never "empty"
+        assert _scrape(_engine(portal, old, _Context(old)), full) == ("error", None)
+        assert _scrape(_engine(portal, old), full) == ("error", None)
@@ -0,0 +1,81 @@
+import asyncio
+
+from room_scraper import RoomTimetableScraper
+from storage import RoomCheckpoint
+
+
+class _Frame:
+    def __init__(self, counts):
+        self.counts = iter(counts)
+        self.last = 0
+
+    async def evaluate(self, js, arg=None):
+        self.last = next(self.counts, self.last)
+        return self.last
+
+
+class _Popup:
+    def __init__(self, *frames):
+        self.frames = list(frames)
+
+
+def _stable(popup, **kwargs):
+    scraper = RoomTimetableScraper(user_id="u", password="p")
+    return asyncio.run(scraper._wait_for_stable_links(popup, **kwargs))
+
+
+def test_room_popup_waits_for_the_list_to_stop_growing():
+    # 3 links at DOMContentLoaded, the rest filled in asynchronously
+    assert _stable(_Popup(_Frame([3, 40, 120, 250])), quiet_s=0.5, timeout_s=5)
+
+
+def test_room_popup_still_growing_is_not_stable():
+    assert not _stable(_Popup(_Frame(range(1, 1000))), quiet_s=0.5, timeout_s=1)
+    assert not _stable(_Popup(_Frame([0])), quiet_s=0.1, timeout_s=0.5)   # never any link
+
+
+class _FusedFrame:
+    """Answers the fused submit: a timeout for the rooms in `slow`, else a result page."""
+
+    def __init__(self, slow=(), empty=()):
+        self.slow, self.empty, self.submitted = set(slow), set(empty), []
+
+    def is_detached(self):
+        return False
+
+    async def evaluate(self, js, arg=None):
+        room = arg["roomText"]
+        self.submitted.append(room)
+        if room in self.slow:
+            return {"status": "timeout", "html": ""}
+        if room in self.empty:
+            return {"status": "empty", "html": "<p>No Record Found</p>", "elapsed_ms": 50}
+        html = (f'<table><tr><td class="plum_fieldbig">Day</td><td class="plum_fieldbig">T1</td></tr>'
+                f'<tr><td class="plum_fieldbig">Mon</td><td>CS301 (L) {room}</td></tr></table>')
+        return {"status": "ok", "html": html, "elapsed_ms": 50}
+
+
+def _sweep(tmp_path, frame, rooms):
+    scraper = RoomTimetableScraper(user_id="u", password="p")
+    scraper.fused_submit = True
+    scraper.pacing.delay_s = 0
+    scraper.checkpoint = RoomCheckpoint("2025-26", "EVEN", directory=str(tmp_path))
+    scraper._form_frames["page"] = frame
+    data = asyncio.run(scraper.scrape_rooms("page", rooms, "EVEN"))
+    return scraper, data
+
+
+def test_timed_out_room_is_retried_on_resume(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    rooms = ["5115", "5116", "5117"]
+
+    scraper, data = _sweep(tmp_path, _FusedFrame(slow={"5116"}, empty={"5117"}), rooms)
+    assert [d["room"] for d in data] == ["5115"]
+    assert scraper.failed_rooms == ["5116"]
+    assert not scraper.checkpoint.is_done("5116") and scraper.checkpoint.is_done("5117")
+
+    frame = _FusedFrame(empty={"5117"})
+    scraper, data = _sweep(tmp_path, frame, rooms)
+    assert frame.submitted == ["5116"]                  # 5117 really had no record
+    assert [d["room"] for d in data] == ["5115", "5116"]
+    assert scraper.failed_rooms == []
@@ -0,0 +1,189 @@
+import json
+import os
+
+import pytest
+
+import storage
+from storage import CatalogCache, ClassManifest, ClassSlotStore, RoomCheckpoint
+
+
+def _checkpoint(tmp_path, **kwargs):
+    return RoomCheckpoint("2025-26", "EVEN", directory=str(tmp_path), **kwargs)
+
+
+def test_checkpoint_keeps_only_status_in_memory_and_reads_data_back(tmp_path):
+    cp = _checkpoint(tmp_path)
+    cp.record("5115", {"room": "5115", "schedule": {"Mon": ["CS301"]}})
+    cp.record("5116", None)
+
+    resumed = _checkpoint(tmp_path)
+    for checkpoint in (cp, resumed):
+        assert all(set(entry) == {"status", "offset"} for entry in checkpoint._entries.values())
+        assert checkpoint.get("5115") == {"room": "5115", "schedule": {"Mon": ["CS301"]}}
+        assert checkpoint.get("5116") is None
+        assert checkpoint.is_done("5116")
+    assert not _checkpoint(tmp_path, retry_empty=True).is_done("5116")
+
+
+def test_checkpoint_survives_a_truncated_last_line(tmp_path):
+    cp = _checkpoint(tmp_path)
+    cp.record("5115", {"room": "5115"})
+    with open(cp.path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"fin_year": "2025-26", "semester": "EVEN", "room": "5116"})[:20])
+
+    resumed = _checkpoint(tmp_path)
+    assert len(resumed) == 1
+    resumed.record("5117", {"room": "5117"})
+    assert _checkpoint(tmp_path).get("5117") == {"room": "5117"}
+
+
+def test_checkpoint_ignores_entries_older_than_max_age(tmp_path):
+    cp = _checkpoint(tmp_path)
+    cp.record("5115", {"room": "5115"})
+    with open(cp.path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"fin_year": "2025-26", "semester": "EVEN", "room": "5116", "status": "ok",
+                            "scraped_at": "2020-01-01T00:00:00", "data": {"room": "5116"}}) + "\n")
+
+    assert _checkpoint(tmp_path).is_done("5116")
+    fresh = _checkpoint(tmp_path, max_age_hours=24)
+    assert fresh.is_done("5115") and not fresh.is_done("5116")
+
+
+def test_rotated_checkpoint_starts_the_next_run_empty(tmp_path):
+    cp = _checkpoint(tmp_path)
+    cp.record("5115", {"room": "5115"})
+    done_path = cp.rotate()
+
+    assert done_path.endswith(".done.ndjson") and not os.path.exists(cp.path)
+    assert len(cp) == 0 and len(_checkpoint(tmp_path)) == 0
+    assert _checkpoint(tmp_path).rotate() is None
+
+
+# ── Picker catalogs ──────────────────────────────────────────────────────────
+
+def test_catalog_cache_round_trip_per_kind(tmp_path, monkeypatch):
+    rooms = CatalogCache("2025-26", "rooms", path=str(tmp_path / "room_catalog.json"))
+    faculties = CatalogCache("2025-26", "faculties", path=str(tmp_path / "faculty_catalog.json"))
+    rooms.save([{"value": "108", "text": "G-108"}])
+    faculties.save([{"code": "F001", "name": "DR. ANITA SHARMA"}])
+    faculties.save([])                                                   # a failed crawl is not cached
+
+    with open(rooms.path, encoding="utf-8") as f:
+        assert set(json.load(f)) == {"version", "fin_year", "saved_at", "rooms"}
+    assert rooms.load() == [{"value": "108", "text": "G-108"}]
+    assert faculties.load() == [{"code": "F001", "name": "DR. ANITA SHARMA"}]
+    assert CatalogCache("2024-25", "rooms", path=rooms.path).load() is None
+
+    later = storage.time.time() + 8 * 24 * 3600
+    monkeypatch.setattr(storage.time, "time", lambda: later)
+    assert rooms.load() is None
+
+
+def test_catalog_cache_kinds():
+    assert CatalogCache("2025-26", "rooms").path.endswith("room_catalog.json")
+    assert CatalogCache("2025-26", "faculties").path.endswith("faculty_catalog.json")
+    with pytest.raises(ValueError):
+        CatalogCache("2025-26", "classes")
+
+
+# ── Class manifest ───────────────────────────────────────────────────────────
+
+CSE = "COMPUTER SCIENCE AND ENGINEERING"
+
+
+def _class_record(semester=6, section=1, fin_year="2025-26", content="CS301"):
+    return {
+        "fin_year": fin_year, "semester": semester, "section": section,
+        "department": CSE, "degree": "B.Tech", "spec": "N_A", "scraped_at": "2026-01-05T10:00:00",
+        "timetable": {"CORE": {"schedule": {"Mon": [
+            {"slot": "T1", "time_range": "08:00-09:00", "content": content, "is_free": False},
+            {"slot": "T2", "time_range": "09:00-10:00", "content": "", "is_free": True},
+        ]}}},
+    }
+
+
+def test_manifest_round_trip(tmp_path):
+    path = str(tmp_path / "manifest.sqlite")
+    manifest = ClassManifest("2025-26", path=path)
+    digest = manifest.record(_class_record(), "/out/6_1.json")
+    manifest.close()
+
+    reopened = ClassManifest("2025-26", path=path)
+    assert len(reopened) == 1
+    assert reopened.is_done("6", "1", CSE, "B.Tech", "N_A") and reopened.is_done(6, 1, CSE, "B.Tech", "N_A")
+    assert reopened.get_hash(6, 1, CSE, "B.Tech", "N_A") == digest
+    assert not reopened.is_done(6, 2, CSE, "B.Tech", "N_A")
+    assert len(ClassManifest("2024-25", path=path)) == 0
+
+    # Re-recording replaces the row rather than adding one
+    new_digest = reopened.record(_class_record(content="CS302"), "/out/6_1.json")
+    reopened.close()
+    assert new_digest != digest
+    assert ClassManifest("2025-26", path=path).get_hash(6, 1, CSE, "B.Tech", "N_A") == new_digest
+
+
+def test_manifest_entries_expire_after_max_age(tmp_path, monkeypatch):
+    path = str(tmp_path / "manifest.sqlite")
+    ClassManifest("2025-26", path=path).record(_class_record(), "/out/6_1.json")
+
+    later = storage.time.time() + 73 * 3600
+    monkeypatch.setattr(storage.time, "time", lambda: later)
+    assert ClassManifest("2025-26", path=path).is_done(6, 1, CSE, "B.Tech", "N_A")
+    assert not ClassManifest("2025-26", path=path, max_age_hours=72).is_done(6, 1, CSE, "B.Tech", "N_A")
+    assert ClassManifest("2025-26", path=path, max_age_hours=74).is_done(6, 1, CSE, "B.Tech", "N_A")
+
+
+def test_manifest_imports_existing_files_once(tmp_path):
+    classes = tmp_path / "classes"
+    classes.mkdir()
+    for name, record in {"a.json": _class_record(section=1), "b.json": _class_record(section=2),
+                         "old.json": _class_record(fin_year="2024-25")}.items():
+        (classes / name).write_text(json.dumps(record), encoding="utf-8")
+    (classes / "broken.json").write_text("{", encoding="utf-8")
+
+    path = str(tmp_path / "manifest.sqlite")
+    assert ClassManifest("2025-26", path=path).import_directory(str(classes)) == 2
+    manifest = ClassManifest("2025-26", path=path)
+    assert len(manifest) == 2 and manifest.is_done(6, 2, CSE, "B.Tech", "N_A")
+    assert manifest.import_directory(str(classes)) == 0
+
+
+# ── Class slot store ─────────────────────────────────────────────────────────
+
+def test_slot_store_replaces_a_combination_as_a_whole(tmp_path):
+    store = ClassSlotStore(path=str(tmp_path / "classes.sqlite"))
+    assert store.write(_class_record(semester="6", section="1")) == 2
+    assert store.write(_class_record(semester=6, section=2)) == 2
+
+    # Re-saved with one slot fewer: the stale T2 row must go, section 2 must stay
+    record = _class_record(semester=6, section="1", content="CS399")
+    del record["timetable"]["CORE"]["schedule"]["Mon"][1]
+    assert store.write(record) == 1
+
+    rows = list(store.iter_slots(section=1))
+    assert [(r["slot"], r["content"], r["is_free"]) for r in rows] == [("T1", "CS399", 0)]
+    assert (rows[0]["semester"], rows[0]["section"]) == (6, 1)           # stored as integers
+    assert len(list(store.iter_slots(semester=6))) == 3
+    store.close()
+
+    reopened = ClassSlotStore(path=str(tmp_path / "classes.sqlite"))
+    assert [r["time_range"] for r in reopened.iter_slots(section=2, is_free=1)] == ["09:00-10:00"]
+
+
+def test_slot_store_rejects_unknown_columns(tmp_path):
+    store = ClassSlotStore(path=str(tmp_path / "classes.sqlite"))
+    with pytest.raises(ValueError, match="room"):
+        list(store.iter_slots(day="Mon", room="5115"))
+
+
+def test_slot_store_imports_a_directory(tmp_path):
+    classes = tmp_path / "classes"
+    classes.mkdir()
+    (classes / "a.json").write_text(json.dumps(_class_record(section=1)), encoding="utf-8")
+    (classes / "b.json").write_text(json.dumps(_class_record(section=2)), encoding="utf-8")
+    (classes / "broken.json").write_text(json.dumps({"semester": "six"}), encoding="utf-8")
+
+    store = ClassSlotStore(path=str(tmp_path / "classes.sqlite"))
+    assert store.import_directory(str(classes)) == 2
+    assert store.import_directory(str(classes)) == 2                     # idempotent
+    assert len(list(store.iter_slots(day="Mon", slot="T1", is_free=0))) == 2
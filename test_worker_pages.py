@@ -0,0 +1,40 @@
+import asyncio
+
+from worker_pages import open_worker_pages
+
+
+class _Page:
+    def __init__(self, context, n):
+        self.context, self.n, self.url, self.closed = context, n, None, False
+
+    async def goto(self, url, wait_until=None):
+        if self.n == 2:
+            raise TimeoutError("navigation timed out")
+        self.url = url
+
+    async def close(self):
+        self.closed = True
+
+
+class _Context:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        self.pages.append(_Page(self, len(self.pages) + 1))
+        return self.pages[-1]
+
+
+def test_keeps_only_pages_with_a_usable_form():
+    context = _Context()
+    main = _Page(context, 0)
+
+    async def ready(worker_page):
+        return None if worker_page.n == 3 else f"frame{worker_page.n}"
+
+    extra = asyncio.run(open_worker_pages(main, "https://ims/form.php", 5, ready))
+
+    assert [(p.n, value) for p, value in extra] == [(1, "frame1"), (4, "frame4")]
+    assert all(p.url == "https://ims/form.php" for p, _ in extra)
+    assert [p.n for p in context.pages if p.closed] == [2, 3]
+    assert asyncio.run(open_worker_pages(main, "https://ims/form.php", 1, ready)) == []
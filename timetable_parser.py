@@ -0,0 +1,417 @@
+"""
+timetable_parser.py  ─  Pure-Python parsing of IMS timetable HTML.
+
+Responsibilities
+────────────────
+1. Turn raw timetable HTML (an HTTP response body, a `frame.content()` snapshot,
+   or a frame dump saved by the scrapers) into the schedule dicts used by all
+   three scrapers:
+       parse_room_timetable     → RoomTimetableScraper
+       parse_class_timetable    → ClassTimetableScraper  (multi-block CORE/ELECTIVES)
+       parse_faculty_timetable  → FacultyTimetableScraper
+2. Provide an innerText approximation so text checks behave like the browser's.
+   EMPTY_RESULT_PATTERN is the portal's explicit "No Record Found" answer; the
+   scrapers reuse it in-page to stop waiting as soon as it appears.
+3. An offline benchmark over the `timeout_*.html` / `frame_*.html` dumps:
+
+       python timetable_parser.py                 # ~/ims_scraper_outputs dumps
+       python timetable_parser.py a.html b.html   # explicit files
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import re
+import sys
+import time
+from typing import Optional
+
+import lxml.html
+from lxml import etree
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1.  DOM helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+_BLOCK_TAGS = frozenset({
+    "tr", "table", "tbody", "thead", "tfoot", "caption",
+    "div", "p", "li", "ul", "ol", "form", "center",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+})
+_SKIP_TAGS = frozenset({"script", "style", "noscript"})
+
+_WS_RE       = re.compile(r"[ \t\r\f\v\n]+")     # collapsible HTML whitespace
+_JS_SPACE_RE = re.compile(r"\s+")                 # JS /\s+/ (includes &nbsp;)
+_LINE_PAD_RE = re.compile(r"[ ]*\n[ ]*")
+_YEAR_RE     = re.compile(r"Year\s*:\s*([\d-]+)", re.I)
+
+
+def parse_html(html: str):
+    """Parse an HTML document or fragment; returns the root element or None."""
+    if not html or not html.strip():
+        return None
+    try:
+        return lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def inner_text(el) -> str:
+    """
+    Approximate the browser's `element.innerText`:
+    whitespace runs collapse, <br> and block elements break lines,
+    table cells are separated by tabs.
+    """
+    parts: list[str] = []
+
+    def walk(node):
+        tag = node.tag if isinstance(node.tag, str) else None
+        if tag is None or tag in _SKIP_TAGS:
+            return
+        if tag == "br":
+            parts.append("\n")
+            return
+        if node.text:
+            parts.append(_WS_RE.sub(" ", node.text))
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(_WS_RE.sub(" ", child.tail))
+        if tag in ("td", "th"):
+            parts.append("\t")
+        elif tag in _BLOCK_TAGS:
+            parts.append("\n")
+
+    walk(el)
+    return _LINE_PAD_RE.sub("\n", "".join(parts))
+
+
+def text_content(el) -> str:
+    """`element.textContent` — raw concatenated text, no layout."""
+    return el.text_content()
+
+
+def _has_class(el, cls: str) -> bool:
+    return bool(el.xpath(
+        f'.//*[contains(concat(" ", normalize-space(@class), " "), " {cls} ")]'
+    ))
+
+
+def _is_stale(el) -> bool:
+    return el.get("data-stale") == "1"
+
+
+def _cells(row) -> list:
+    return [c for c in row.iter("td", "th")]
+
+
+# The portal's explicit empty answer ("No Record Found", "No data found"...).
+# Kept JS-compatible: the scrapers pass it to `new RegExp(pattern, 'i')` in-page.
+EMPTY_RESULT_PATTERN = (
+    r"\bno\s+(?:records?|data|timetable|time\s*table)\s+(?:is\s+)?(?:found|available|exists?)"
+    r"|\brecords?\s+not\s+found"
+)
+EMPTY_RESULT_RE = re.compile(EMPTY_RESULT_PATTERN, re.I)
+
+
+def is_empty_result(html: str) -> bool:
+    """True when the page shows the portal's no-record message."""
+    root = parse_html(html)
+    return root is not None and bool(EMPTY_RESULT_RE.search(text_content(root)))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2.  Room timetable  (mirrors the extractor in RoomTimetableScraper)
+# ─────────────────────────────────────────────────────────────────────────────
+
+_ROOM_DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat")
+
+
+def find_plum_table(root):
+    """First non-stale table containing a `.plum_fieldbig` cell, or None."""
+    for table in root.iter("table"):
+        if _is_stale(table):
+            continue
+        if _has_class(table, "plum_fieldbig"):
+            return table
+    return None
+
+
+def parse_room_timetable(html: str, room: str, semester: str) -> Optional[dict]:
+    """
+    Parse a RoomTimetable result page.
+
+    Returns {"room", "semester", "year", "schedule"} with
+    schedule = { day: [{time_slot, content, is_occupied}, ...] },
+    or None when the page holds no timetable.
+    """
+    root = parse_html(html)
+    if root is None:
+        return None
+
+    table = find_plum_table(root)
+    if table is None:
+        return None
+
+    data = {
+        "room":     room,
+        "semester": semester,
+        "year":     None,
+        "schedule": {},
+    }
+
+    body = root.find("body")
+    title = text_content(body if body is not None else root)
+    year_match = _YEAR_RE.search(title)
+    if year_match:
+        data["year"] = year_match.group(1)
+
+    schedule = _parse_grid(table, lambda text: any(d in text for d in _ROOM_DAYS))
+    if schedule is None:
+        return None
+    data["schedule"] = schedule
+    return data
+
+
+def _parse_grid(table, is_day_row) -> Optional[dict]:
+    """
+    Single-block grid shared by the room and faculty layouts:
+    first row mentioning T1/T2 is the header, every row passing
+    `is_day_row(innerText)` becomes one day of slots.
+    """
+    rows = list(table.iter("tr"))
+    row_texts = [inner_text(r) for r in rows]
+
+    # Header row (contains T1, T2...)
+    header_idx = next(
+        (i for i, t in enumerate(row_texts) if "T1" in t or "T2" in t), None
+    )
+    if header_idx is None:
+        return None
+
+    time_slots = [
+        text_content(cell).strip()
+        for idx, cell in enumerate(_cells(rows[header_idx]))
+        if idx > 0   # Skip first column (day names)
+    ]
+
+    schedule: dict = {}
+    for row, row_text in zip(rows, row_texts):
+        if not is_day_row(row_text):
+            continue
+        cells = _cells(row)
+        if not cells:
+            continue
+
+        day = text_content(cells[0]).strip()
+        schedule[day] = []
+
+        for j in range(1, min(len(cells), len(time_slots) + 1)):
+            text = _JS_SPACE_RE.sub(" ", text_content(cells[j]).strip())
+            schedule[day].append({
+                "time_slot":   time_slots[j - 1],
+                "content":     text,
+                "is_occupied": len(text) > 5,   # valid class info is longer than empty space
+            })
+
+    return schedule
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3.  Faculty timetable  (single block, looser table detection)
+# ─────────────────────────────────────────────────────────────────────────────
+
+_FACULTY_DAY_RE = re.compile(r"Mon|Tue|Wed|Thu|Fri|Sat", re.I)
+
+
+def parse_faculty_timetable(html: str, faculty: str, semester: str) -> Optional[dict]:
+    """
+    Parse a Faculty Timetable result page.
+
+    Returns {"faculty", "semester", "schedule"} or None when no timetable is present.
+    """
+    root = parse_html(html)
+    if root is None:
+        return None
+
+    table = None
+    for t in root.iter("table"):
+        if _is_stale(t):
+            continue
+        txt = inner_text(t)
+        if "T1" in txt or "T2" in txt or _has_class(t, "plum_fieldbig"):
+            table = t
+            break
+    if table is None:
+        return None
+
+    schedule = _parse_grid(table, lambda text: bool(_FACULTY_DAY_RE.search(text)))
+    if schedule is None:
+        return None
+    return {
+        "faculty":  faculty,
+        "semester": semester,
+        "schedule": schedule,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 4.  Class timetable  (multi-block: CORE, ELECTIVES, ...)
+# ─────────────────────────────────────────────────────────────────────────────
+
+_CLASS_DAYS       = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_SLOT_HEADER_RE   = re.compile(r"^T\s*\d+")
+_BLOCK_LABEL_RE   = re.compile(r"Time Table\s*\(([^)]+)\)", re.I)
+_LINE_SPLIT_RE    = re.compile(r"[\n\r]+")
+
+
+def _is_slot_header(texts: list[str]) -> bool:
+    return len(texts) > 2 and any(
+        _SLOT_HEADER_RE.match(t) or "T1" in t or "T2" in t for t in texts
+    )
+
+
+def parse_class_timetable(html: str) -> dict:
+    """
+    Parse a ClassTimetable result page into
+        { "<BLOCK LABEL>": {"time_slots": [...], "schedule": {...}, "legend": [...]}, ... }
+
+    Each header row (T1, T2, …) starts a block; its label comes from the nearest
+    preceding "Time Table (LABEL)" row, defaulting to CORE. Rows after Sat/Sun are
+    scanned for legend lines ("CODE - Name / Faculty"). Returns {} when nothing matches.
+    """
+    result: dict = {}
+    root = parse_html(html)
+    if root is None:
+        return result
+
+    for table in root.iter("table"):
+        if _is_stale(table):
+            continue
+        full_text = inner_text(table)
+        if "T1" not in full_text and "T 1" not in full_text and "T2" not in full_text:
+            continue
+
+        rows = list(table.iter("tr"))
+        row_cells = [_cells(r) for r in rows]
+        row_cell_texts = [[inner_text(c).strip() for c in cells] for cells in row_cells]
+
+        header_idx = [i for i, texts in enumerate(row_cell_texts) if _is_slot_header(texts)]
+
+        for h, h_idx in enumerate(header_idx):
+            next_h_idx = header_idx[h + 1] if h + 1 < len(header_idx) else len(rows)
+
+            # Block label from the nearest "Time Table (...)" row above this header
+            label = "CORE"
+            prev_header = (header_idx[h - 1] or -1) if h > 0 else -1
+            for back in range(h_idx - 1, -1, -1):
+                if h > 0 and back <= prev_header:
+                    break
+                txt = inner_text(rows[back]).strip()
+                if "Time Table" in txt:
+                    m = _BLOCK_LABEL_RE.search(txt)
+                    label = m.group(1).strip() if m else _JS_SPACE_RE.sub(" ", txt[:40])
+                    break
+            if label in result:
+                label += f"_{h}"
+
+            slot_meta = []
+            for text in row_cell_texts[h_idx][1:]:
+                parts = _LINE_SPLIT_RE.split(text)
+                time_range = " ".join(parts[1:]).strip() if len(parts) > 1 else None
+                slot_meta.append({"slot": parts[0].strip(), "time_range": time_range})
+
+            # Time ranges may sit in their own row right below the header
+            block_start = h_idx + 1
+            if block_start < next_h_idx and all(not s["time_range"] for s in slot_meta):
+                nxt = row_cell_texts[block_start]
+                if any(":" in t for t in nxt):
+                    for j in range(1, min(len(nxt), len(slot_meta) + 1)):
+                        slot_meta[j - 1]["time_range"] = nxt[j]
+                    block_start += 1
+
+            schedule: dict = {}
+            legend: list[str] = []
+            past_last_day = False
+
+            for i in range(block_start, next_h_idx):
+                cells = row_cells[i]
+                if not cells:
+                    continue
+                first = row_cell_texts[i][0]
+
+                if past_last_day:
+                    txt = _JS_SPACE_RE.sub(" ", inner_text(rows[i]).strip())
+                    if " - " in txt and "/" in txt:
+                        legend.append(txt)
+                    continue
+
+                if not first.startswith(_CLASS_DAYS):
+                    continue
+                if first.startswith(("Sat", "Sun")):
+                    past_last_day = True
+
+                schedule[first] = []
+                for j in range(1, min(len(cells), len(slot_meta) + 1)):
+                    content = _JS_SPACE_RE.sub(" ", row_cell_texts[i][j])
+                    schedule[first].append({
+                        "slot":       slot_meta[j - 1]["slot"],
+                        "time_range": slot_meta[j - 1]["time_range"],
+                        "content":    content,
+                        "is_free":    len(content) <= 2,
+                    })
+
+            if schedule:
+                result[label] = {"time_slots": slot_meta, "schedule": schedule, "legend": legend}
+
+    return result
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 5.  Offline benchmark over saved dumps
+# ─────────────────────────────────────────────────────────────────────────────
+
+_DUMP_DIR = os.path.expanduser("~/ims_scraper_outputs")
+
+
+def benchmark(paths: list[str], repeat: int = 20) -> list[dict]:
+    """Time every parser on every file; returns one row per file."""
+    rows = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        row = {"file": os.path.basename(path), "kb": round(len(html) / 1024, 1)}
+        for name, fn in (
+            ("room",    lambda: parse_room_timetable(html, "?", "?")),
+            ("class",   lambda: parse_class_timetable(html)),
+            ("faculty", lambda: parse_faculty_timetable(html, "?", "?")),
+        ):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                out = fn()
+            row[f"{name}_ms"] = round((time.perf_counter() - start) * 1000 / repeat, 2)
+            row[f"{name}_found"] = bool(out)
+        rows.append(row)
+    return rows
+
+
+def main():
+    paths = sys.argv[1:] or sorted(
+        glob.glob(os.path.join(_DUMP_DIR, "timeout_*.html"))
+        + glob.glob(os.path.join(_DUMP_DIR, "frame_*.html"))
+    )
+    if not paths:
+        print(f"⚠️  No dumps found in {_DUMP_DIR} (timeout_*.html / frame_*.html).")
+        return
+
+    print(f"⏱️  Parsing {len(paths)} file(s)…\n")
+    print(f"{'file':40} {'KB':>7} {'room ms':>9} {'class ms':>9} {'fac ms':>9}")
+    for r in benchmark(paths):
+        flags = "".join(k[0].upper() if r[f"{k}_found"] else "·" for k in ("room", "class", "faculty"))
+        print(f"{r['file'][:40]:40} {r['kb']:>7} {r['room_ms']:>9} {r['class_ms']:>9} "
+              f"{r['faculty_ms']:>9}  {flags}")
+
+
+if __name__ == "__main__":
+    main()
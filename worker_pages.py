@@ -0,0 +1,53 @@
+"""
+worker_pages.py  ─  Extra logged-in pages for parallel scraping.
+
+The room, class and faculty scrapers all parallelise the same way: open a few
+more pages in the context the main page logged in with (so they share its
+session cookies), load the form URL in each, and keep the pages on which the
+form is usable. What "usable" means, and what each scraper keeps from a page,
+is passed in as `ready`.
+
+Usage
+─────
+    async def ready(worker_page):
+        await bypass(worker_page)
+        return await find_form_frame(worker_page)     # None drops the page
+
+    extra = await open_worker_pages(page, form_frame.url, count, ready, form="room form")
+    pages = [page] + [worker_page for worker_page, _ in extra]
+"""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+
+
+async def open_worker_pages(page, form_url: str, count: int,
+                            ready: Callable[[Any], Awaitable[Any]],
+                            form: str = "form", noun: str = "worker page") -> list[tuple]:
+    """
+    Open `count - 1` extra pages on `form_url` in the context of `page` and hand
+    each to `ready(worker_page)`. Pages for which it returns a value are kept;
+    the others (and any that fail to load) are closed.
+
+    Returns [(worker_page, value), ...] for the extra pages only.
+    """
+    workers = []
+    if count <= 1:
+        return workers
+
+    print(f"\n🧵 Opening {count - 1} extra {noun}(s) on {form_url}")
+    for i in range(1, count):
+        worker_page = await page.context.new_page()
+        try:
+            await worker_page.goto(form_url, wait_until="domcontentloaded")
+            value = await ready(worker_page)
+            if value:
+                workers.append((worker_page, value))
+                print(f"   ✓ {noun.capitalize()} {i} ready")
+                continue
+            print(f"   ⚠️  {noun.capitalize()} {i} did not load the {form}. Dropping it.")
+        except Exception as e:
+            print(f"   ⚠️  {noun.capitalize()} {i} failed to open: {e}")
+        await worker_page.close()
+    return workers